@@ -1,60 +1,330 @@
-from flask import Flask, render_template
+import math
+import os
+from datetime import date
+import time
+from flask import Flask, Response, abort, g, jsonify, request
+import compact
 import events_feed as feed
-from datetime import datetime
+import ical
+import metrics
+import pages
+import payloads
+from event_entry import EventEntry
+from locations import EventLocator
+from event_store import EventIndex, decode_cursor, sort_key
+from event_times import campus_now
+from refresher import FeedRefresher
+from shared_snapshot import SharedSnapshot
+from datetime import datetime, timezone
 
 app = Flask(__name__)
+app.jinja_env.globals["fragment"] = pages.fragments.render
 
-feed.add_feed()
+if metrics.ENABLED:
+  @app.before_request
+  def start_timer():
+    g.started = time.perf_counter()
+
+  @app.after_request
+  def observe_request(response):
+    started = g.pop("started", None)
+    if started is not None:
+      metrics.REQUEST_SECONDS.observe(time.perf_counter() - started, request.endpoint or "unknown")
+    return response
+
+APP_VERSION = "2.0"
+
+# Run as `python app.py`, this module is imported again as __mp_main__ by the worker processes that
+# parse large batches (see events_feed.parse_entries); only the serving process sets up the feed
+SERVING = __name__ != "__mp_main__"
+
+if SERVING:
+  feed.add_feed() # Requests are served from the entries already stored in db.sqlite until the first refresh lands
+
+# Seconds between background feed refreshes; 0 turns the refresher off
+refresher = FeedRefresher(feed.refresh, interval=float(os.environ.get("MACEVENTS_REFRESH_INTERVAL", 900)))
+# Seconds without a successful refresh after which the feed counts as stale: requests then start a
+# background refresh (still answered from the last snapshot) and readiness reports "degraded"
+STALE_AFTER = float(os.environ.get("MACEVENTS_STALE_AFTER", 2 * refresher.interval))
+if refresher.interval > 0:
+  feed.STALE_AFTER = STALE_AFTER
+
+# Snapshot file through which the workers of a host share one refresher; "" makes every worker refresh on its own
+SNAPSHOT_PATH = os.environ.get("MACEVENTS_SNAPSHOT", "events.snapshot")
 
 @app.route("/")
 def index():
-  """An HTML webpage primarily used to test that event attributes are formatted correctly."""
+  """An HTML webpage primarily used to test that event attributes are formatted correctly.
+  Like /coord and /times, it is rendered once per feed generation from cached event rows."""
   events = feed.get_events()
-  return render_template('index.html', events=events)
+  return payloads.send_payload(pages.render_page(events, 'index.html'))
+
+def event_to_dict(event):
+  return {
+    "id" : event.id,
+    "title" : event.title,
+    "location" : event.location,
+    "date" : event.date,
+    "time" : event.time,
+    "starttime" : event.start_time,
+    "endtime" : event.end_time,
+    "link" : event.link,
+    "coord" : event.coord,
+    "description" : event.desc
+  }
+
+def build_events_payload(events):
+  with metrics.STAGE_SECONDS.time("dicts"):
+    event_data = [event_to_dict(event) for event in get_index(events).events] # Chronological order, kept sorted by the feed
+  return payloads.json_payload(event_data, getattr(events, "updated_at", None))
+
+def events_payload(events):
+  return payloads.snapshot_payload(events, "events.json", lambda: build_events_payload(events))
+
+FILTER_ARGS = ("from", "to", "location", "q", "limit", "cursor", "upcoming")
+MAX_LIMIT = 500 # Largest page a filtered /events request can ask for
+
+def flag_arg(name):
+  return request.args.get(name, "").lower() in ("1", "true", "yes")
+
+def response_format():
+  """The representation the client asked for with its Accept header: application/json (the default),
+  newline-delimited JSON (also chosen by ?stream=1) or one of the compact formats in compact.MIMETYPES."""
+  if flag_arg("stream"):
+    return payloads.NDJSON
+  return request.accept_mimetypes.best_match(["application/json", payloads.NDJSON, *compact.MIMETYPES],
+                                             default="application/json")
+
+def build_compact_payload(events, mimetype):
+  with metrics.STAGE_SECONDS.time("encode"):
+    data = compact.encode(get_index(events).events)
+  with metrics.STAGE_SECONDS.time("serialize"):
+    body = compact.dumps(data, mimetype)
+  return payloads.Payload(body, mimetype, getattr(events, "updated_at", None))
+
+def get_index(events):
+  return feed.derived(events, "index", lambda: EventIndex(events, EventEntry.location_resolver))
+
+def parse_date_arg(name):
+  value = request.args.get(name)
+  if value is None:
+    return None
+  try:
+    return date.fromisoformat(value)
+  except ValueError:
+    abort(400, f"'{name}' must be a YYYY-MM-DD date")
 
 @app.route("/events")
 def events():
-  """The URL path used to retrieve the event data in JSON format."""
+  """The URL path used to retrieve the event data in JSON format.
+  The body is serialized once per feed generation and revalidated with its ETag.
+
+  Events are in chronological order. With any of ?from=&to= (YYYY-MM-DD, inclusive),
+  ?location=, ?q=, ?upcoming=1 (only events that have not ended), ?limit= or ?cursor=,
+  only matching events are returned. When more remain, the X-Next-Cursor header holds
+  the cursor for the next page.
+
+  With ?stream=1 or Accept: application/x-ndjson, events are sent as newline-delimited
+  JSON, each one serialized only as it is written out. With Accept: application/vnd.macevents.columnar+json
+  (or application/x-msgpack when msgpack is installed), they are sent in the dictionary-encoded
+  columnar layout of compact.encode()."""
   events = feed.get_events()
+  mimetype = response_format()
+  stream = mimetype == payloads.NDJSON
+  if not any(arg in request.args for arg in FILTER_ARGS):
+    if stream:
+      response = payloads.stream_ndjson(event_to_dict(event) for event in get_index(events).events)
+    elif mimetype in compact.MIMETYPES:
+      payload = payloads.snapshot_payload(events, f"events/{mimetype}", lambda: build_compact_payload(events, mimetype))
+      response = payloads.send_payload(payload)
+    else:
+      response = payloads.send_payload(events_payload(events))
+    response.vary.add("Accept")
+    return response
 
-  event_data = []
-
-  for event in events:
-    event_dict = {
-      "id" : event.id,
-      "title" : event.title,
-      "location" : event.location,
-      "date" : event.date,
-      "time" : event.time,
-      "starttime" : event.start_time,
-      "endtime" : event.end_time,
-      "link" : event.link,
-      "coord" : event.coord,
-      "description" : event.desc
-    }
-    event_data.append(event_dict)
+  start, end = parse_date_arg("from"), parse_date_arg("to")
+  limit = request.args.get("limit", type=int)
+  if "limit" in request.args and (limit is None or not 1 <= limit <= MAX_LIMIT):
+    abort(400, f"'limit' must be between 1 and {MAX_LIMIT}")
+  after = None
+  if request.args.get("cursor"):
+    try:
+      after = decode_cursor(request.args["cursor"])
+    except ValueError:
+      abort(400, "'cursor' is not valid")
 
-  return event_data[::-1] # To have events in (mostly) chronological order
+  now = campus_now() if flag_arg("upcoming") else None
+
+  found, next_cursor = get_index(events).query(start, end, request.args.get("location"), request.args.get("q"),
+                                               limit, after, now)
+  if stream:
+    response = payloads.stream_ndjson(event_to_dict(event) for event in found)
+  elif mimetype in compact.MIMETYPES:
+    response = Response(compact.dumps(compact.encode(found), mimetype), mimetype=mimetype)
+  else:
+    response = jsonify([event_to_dict(event) for event in found])
+  response.vary.add("Accept")
+  if next_cursor is not None:
+    response.headers["X-Next-Cursor"] = next_cursor
+  return response
+
+def build_changes_payload(events, token, changes):
+  if changes is None:
+    body = {"token": token, "resync": True, "events": [event_to_dict(event) for event in get_index(events).events]}
+  else:
+    current = sorted((event for event in events if changes.get(event.id) in ("added", "updated")), key=sort_key)
+    body = {"token": token, "resync": False,
+            "added": [event_to_dict(event) for event in current if changes[event.id] == "added"],
+            "updated": [event_to_dict(event) for event in current if changes[event.id] == "updated"],
+            "removed": sorted(entry_id for entry_id, change in changes.items() if change == "removed")}
+  return payloads.json_payload(body, getattr(events, "updated_at", None))
+
+@app.route("/events/changes")
+def event_changes():
+  """The events added, updated and removed since the feed generation named by ?since=<token>.
+  Every response has the token to send next time. A missing, unknown or expired token
+  (tokens are only kept for a bounded number of refreshes) gets "resync": true and every event."""
+  events = feed.get_events()
+  token = feed.change_token(events)
+  found = feed.changes_since(events, request.args.get("since"))
+  if found is None:
+    name, changes = "changes/resync", None
+  else:
+    name, changes = f"changes/{found[0]}", found[1]
+  payload = payloads.snapshot_payload(events, name, lambda: build_changes_payload(events, token, changes))
+  return payloads.send_payload(payload)
+
+SEARCH_LIMIT = 20 # Results /events/search returns without ?limit=
+
+@app.route("/events/search")
+def search_events():
+  """Events whose title, location or description contain every word of ?q=, best matches first.
+  The last word also matches the words it starts, so partial queries find results as they are typed.
+  ?limit= caps the results (default 20). Each event has its relevance as "score"."""
+  query = request.args.get("q", "").strip()
+  if not query:
+    abort(400, "'q' is required")
+  limit = request.args.get("limit", type=int) if "limit" in request.args else SEARCH_LIMIT
+  if limit is None or not 1 <= limit <= MAX_LIMIT:
+    abort(400, f"'limit' must be between 1 and {MAX_LIMIT}")
+  found = feed.search_index(feed.get_events()).search(query, limit)
+  return jsonify([dict(event_to_dict(event), score=round(score, 4)) for score, event in found])
+
+def get_calendar(events):
+  return feed.derived(events, "calendar",
+                      lambda: ical.CalendarFeed(events, EventEntry.location_resolver, getattr(events, "updated_at", None)))
+
+@app.route("/events.ics")
+def events_calendar():
+  """The events as an iCalendar feed for calendar subscriptions and signage.
+  ?location= (a building or one of its aliases) and ?date= (YYYY-MM-DD) narrow it to one building
+  and/or one day. Each calendar is rendered once per feed generation and revalidated with its ETag."""
+  day = parse_date_arg("date")
+  building = None
+  if request.args.get("location"):
+    building = EventEntry.location_resolver.building(request.args["location"])
+    if building is None:
+      abort(404, f"No campus building is called '{request.args['location']}'")
+  calendar = get_calendar(feed.get_events())
+  return payloads.send_payload(calendar.payload(building.name if building is not None else None, day))
+
+def get_locator(events):
+  return feed.derived(events, "locator", lambda: EventLocator(events, EventEntry.location_resolver))
+
+@app.route("/events/nearby")
+def nearby_events():
+  """Events within `radius` meters (default 250) of the point `lat`, `lon`, closest first."""
+  lat = request.args.get("lat", type=float)
+  lon = request.args.get("lon", type=float)
+  radius = request.args.get("radius", 250.0, type=float)
+  if lat is None or lon is None or not all(math.isfinite(value) for value in (lat, lon, radius)) or radius < 0:
+    abort(400) # float() also reads "nan" and "inf", which the locator cannot measure from
+  if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+    abort(400)
+
+  found = get_locator(feed.get_events()).nearby([lat, lon], radius)
+  return [dict(event_to_dict(event), distance=round(distance, 1)) for distance, event in found]
+
+@app.route("/events/building/<path:name>")
+def building_events(name):
+  """Events held in the campus building called `name` (or one of its aliases)."""
+  if EventEntry.location_resolver.building(name) is None:
+    abort(404)
+  return [event_to_dict(event) for event in get_locator(feed.get_events()).in_building(name)]
 
 @app.route("/coord")
 def coord():
   events = feed.get_events()
-  return render_template('coordinates.html', events=events)
+  return payloads.send_payload(pages.render_page(events, 'coordinates.html'))
 
 @app.route("/times")
 def times():
   events = feed.get_events()
-  return render_template('startendtimes.html', events=events)
+  return payloads.send_payload(pages.render_page(events, 'startendtimes.html'))
 
 @app.route("/health")
+@app.route("/health/live")
 def health():
-    """Health check endpoint to verify deployment and app status"""
+    """Liveness check: the process is up and answering requests, whatever state the feed is in."""
     return {
         "status": "healthy",
         "message": "MacEvents API is running",
-        "version": "2.0",
+        "version": APP_VERSION,
         "timestamp": datetime.now().isoformat()
     }
 
+@app.route("/health/ready")
+def readiness():
+    """Readiness check: 200 once this worker has events to serve, 503 while it is still cold.
+    A worker whose feed has not refreshed successfully for STALE_AFTER seconds stays ready,
+    serving its last snapshot, but reports "degraded"."""
+    events = feed.current()
+    status = feed.status
+    age = None
+    if status.last_success is not None:
+      age = (datetime.now(timezone.utc) - status.last_success).total_seconds()
+    stale = age > STALE_AFTER if age is not None else status.failures > 0 # Never refreshed counts once one failed
+    if events is None:
+      feed.warm_up() # Build from the stored entries in the background rather than in the probe
+      state = "starting"
+    elif STALE_AFTER > 0 and stale:
+      state = "degraded"
+    else:
+      state = "ready"
+    body = {
+        "status": state,
+        "version": APP_VERSION,
+        "entries": len(events) if events is not None else 0,
+        "generation": getattr(events, "generation", None),
+        "last_refresh": status.last_success.isoformat() if status.last_success is not None else None,
+        "last_refresh_age_seconds": round(age, 1) if age is not None else None,
+        "refresh_seconds": round(status.last_duration, 3) if status.last_duration is not None else None,
+        "refresh_failures": status.failures,
+        "feed_errors": status.feed_errors,
+        "last_error": status.last_error,
+    }
+    return body, 503 if events is None else 200
+
+@app.route("/metrics")
+def prometheus_metrics():
+  """Stage timings, cache hit rates and refresh outcomes in the Prometheus text format.
+  Not found when metrics are turned off with MACEVENTS_METRICS=0."""
+  if not metrics.ENABLED:
+    abort(404)
+  return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+def start_refresher():
+  if refresher.interval > 0:
+    refresher.start()
+
+# Started once the routes and payload builders above exist, as the first refresh may publish right away
+shared = SharedSnapshot(SNAPSHOT_PATH, {"events.json": events_payload}, on_lead=start_refresher) \
+  if SNAPSHOT_PATH and SERVING else None
+if shared is not None:
+  feed.use_shared(shared)
+  shared.lead() # Only the worker that wins the host's lock refreshes; the others follow its snapshots
+elif SERVING:
+  start_refresher()
+
 if (__name__ == "__main__"):
   app.run()
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""Measures the size and server-side encoding time of /events as JSON objects and in the
+dictionary-encoded formats, and the memory saved by interning repeated EventEntry fields.
+
+Run from the repository root:  python -m benchmarks.bench_compact [entries]"""
+import gzip
+import json
+import pickle
+import sys
+import time
+import tracemalloc
+from unittest.mock import patch
+
+from benchmarks import synthetic
+import compact
+from event_entry import EventEntry, parse_rows
+
+
+def encode_json(events):
+  return json.dumps([{key: getattr(event, attribute) for key, attribute in compact.COLUMNS} for event in events],
+                    separators=(",", ":")).encode("utf-8")
+
+def best_ms(run, repeat=5):
+  best = None
+  for _ in range(repeat):
+    started = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - started
+    best = elapsed if best is None else min(best, elapsed)
+  return best * 1000, result
+
+def traced_bytes(build):
+  tracemalloc.start()
+  kept = build()
+  size = tracemalloc.get_traced_memory()[0]
+  tracemalloc.stop()
+  del kept
+  return size
+
+def main(count=10000):
+  entries = synthetic.entries(count)
+  events = [EventEntry(*entry) for entry in entries]
+  for event in events:
+    event.desc # Parsed lazily; every encoding needs it
+
+  print(f"/events with {count} synthetic events")
+  rows = [("json objects", lambda: encode_json(events))]
+  rows += [(mimetype, lambda mimetype=mimetype: compact.dumps(compact.encode(events), mimetype))
+           for mimetype in compact.MIMETYPES]
+  for name, encode in rows:
+    ms, body = best_ms(encode)
+    print(f"  {name:<42} {len(body):>10} bytes  {len(gzip.compress(body)):>9} gzipped  {ms:8.1f} ms to encode")
+
+  # Rows as they arrive from ingest workers or the parsed database: every string a separate copy
+  rows = pickle.loads(pickle.dumps(parse_rows(entries)))
+  rebuild = lambda: [EventEntry.from_parsed(*pickle.loads(pickle.dumps(row))) for row in rows]
+  interned = traced_bytes(rebuild)
+  with patch("event_entry.intern_text", lambda value: value), patch("event_entry.intern_field", lambda value: value), \
+       patch("event_entry.intern_coord", lambda coord: coord):
+    copied = traced_bytes(rebuild)
+  print(f"  {count} entries rebuilt from worker rows: {copied / 2**20:.1f} MiB, "
+        f"{interned / 2**20:.1f} MiB with interned fields")
+
+if __name__ == "__main__":
+  main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,47 @@
+"""Measures bytes on the wire and CPU per /events request, uncompressed, gzipped on every request,
+and with the compressed body cached per feed generation.
+
+Run from the repository root:  python -m benchmarks.bench_compression [entries]"""
+import gzip
+import os
+import sys
+import time
+from unittest.mock import patch
+
+os.environ.setdefault("MACEVENTS_REFRESH_INTERVAL", "0") # Importing app must not start fetching the live feed
+os.environ.setdefault("MACEVENTS_PARSED_DB", "")
+os.environ.setdefault("MACEVENTS_SNAPSHOT", "") # Nor take the snapshot lock and write events.snapshot in the working tree
+
+from benchmarks import synthetic
+import events_feed
+import payloads
+from app import app
+from event_entry import EventEntry
+
+
+def cpu_per_request_us(client, headers, requests=200, after=None):
+  response = client.get("/events", headers=headers) # Warm up, so cached bodies exist before timing
+  started = time.process_time()
+  for _ in range(requests):
+    response = client.get("/events", headers=headers)
+    if after is not None:
+      after(response)
+  return (time.process_time() - started) / requests * 1e6, len(response.data)
+
+def main(count=1000):
+  snapshot = events_feed.EventSnapshot([EventEntry(*entry) for entry in synthetic.entries(count)], generation=1)
+  client = app.test_client()
+  rows = []
+  with patch("app.feed.get_events", return_value=snapshot):
+    rows.append(("uncompressed", *cpu_per_request_us(client, {})))
+    gzip_every_time = lambda response: response.set_data(gzip.compress(response.data, compresslevel=6))
+    rows.append(("gzip on every request", *cpu_per_request_us(client, {}, after=gzip_every_time)))
+    for encoding in payloads.ENCODERS:
+      rows.append((f"{encoding}, cached per generation", *cpu_per_request_us(client, {"Accept-Encoding": encoding})))
+
+  print(f"/events with {count} synthetic events")
+  for name, us, size in rows:
+    print(f"  {name:<30} {size:>10} bytes  {us:9.1f} us CPU/request")
+
+if __name__ == "__main__":
+  main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,32 @@
+"""Compares the original per-fragment re.sub chain with description.clean_description.
+
+Run from the repository root:  python -m benchmarks.bench_description [entries]"""
+import sys
+import timeit
+from benchmarks import legacy, synthetic
+from description import clean_description
+from event_entry import EventEntry
+
+
+def description_body(summary):
+  fragments = summary.split(">")
+  return ">".join(sub for sub in fragments if not (sub.endswith("strong") and sub != fragments[0]))
+
+def per_entry_us(function, summaries, repeat=5):
+  best = min(timeit.repeat(lambda: [function(summary) for summary in summaries], number=1, repeat=repeat))
+  return best / len(summaries) * 1e6
+
+def main(count=1000):
+  summaries = [entry[3] for entry in synthetic.entries(count)]
+  rows = [
+    ("legacy re.sub chain", per_entry_us(legacy.parse_summary_desc, summaries)),
+    ("clean_description", per_entry_us(lambda summary: clean_description(description_body(summary)), summaries)),
+    ("EventEntry.parse_summary", per_entry_us(lambda summary: EventEntry("id", "title", "link", summary), summaries)),
+  ]
+  baseline = rows[0][1]
+  print(f"{count} synthetic summaries")
+  for name, us in rows:
+    print(f"  {name:<26} {us:8.1f} us/entry  {baseline / us:5.1f}x")
+
+if __name__ == "__main__":
+  main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,38 @@
+"""Measures events_feed.parse_entries serially and across a process pool, counting every derived field.
+
+Run from the repository root:  python -m benchmarks.bench_ingest [entries ...] [--workers N ...]"""
+import os
+import sys
+import time
+from benchmarks import synthetic
+import events_feed
+
+
+def seconds(entries, workers, repeat=3):
+  best = None
+  for _ in range(repeat):
+    started = time.perf_counter()
+    for event in events_feed.parse_entries(entries, workers=workers):
+      event.desc, event.coord, event.start_time # Serial parsing leaves these for first access; workers build them all
+    elapsed = time.perf_counter() - started
+    best = elapsed if best is None else min(best, elapsed)
+  return best
+
+def main(counts=(10000, 100000), worker_counts=None):
+  cores = os.cpu_count() or 1
+  worker_counts = worker_counts or sorted({1, 2, 4, cores})
+  for count in counts:
+    entries = synthetic.entries(count)
+    baseline = seconds(entries, 1)
+    print(f"{count} synthetic entries, {cores} cores")
+    for workers in worker_counts:
+      elapsed = baseline if workers == 1 else seconds(entries, workers)
+      print(f"  {workers:>3} workers  {elapsed:8.2f} s  {count / elapsed:9.0f} entries/s  {baseline / elapsed:5.1f}x")
+
+if __name__ == "__main__":
+  args = sys.argv[1:]
+  workers = None
+  if "--workers" in args:
+    workers = [int(arg) for arg in args[args.index("--workers") + 1:]]
+    args = args[:args.index("--workers")]
+  main([int(arg) for arg in args] or (10000, 100000), workers)
@@ -0,0 +1,42 @@
+"""Compares the original linear location scan with locations.LocationResolver.
+
+Run from the repository root:  python -m benchmarks.bench_locations [entries]"""
+import random
+import sys
+import timeit
+from benchmarks import legacy, synthetic
+from event_entry import EventEntry
+from locations import EventLocator, LocationResolver
+
+
+def per_call_us(function, values, repeat=5):
+  best = min(timeit.repeat(lambda: [function(value) for value in values], number=1, repeat=repeat))
+  return best / len(values) * 1e6
+
+def main(count=10000):
+  rng = random.Random(494)
+  locations = [rng.choice(synthetic.LOCATIONS) for _ in range(count)]
+  unique = [f"{location} (room {number})" for number, location in enumerate(locations)] # Defeats the memo
+  table = EventEntry.location_coords
+  resolver = LocationResolver(table, memo_size=0)
+  memoized = LocationResolver(table)
+
+  print(f"{count} location lookups")
+  baseline = per_call_us(lambda location: legacy.get_location_coords(table, location), locations)
+  for name, us in [("legacy linear scan", baseline),
+                   ("Aho-Corasick, no memo", per_call_us(resolver.coords, unique)),
+                   ("Aho-Corasick, memoized", per_call_us(memoized.coords, locations))]:
+    print(f"  {name:<24} {us:7.2f} us/lookup  {baseline / us:5.1f}x")
+
+  class Place:
+    def __init__(self, location):
+      self.location = location
+  locator = EventLocator([Place(location) for location in locations], memoized)
+  point = [44.93855, -93.16822]
+  build_us = per_call_us(lambda _: EventLocator([Place(location) for location in locations], memoized), [0], repeat=3)
+  print(f"  EventLocator build       {build_us / 1000:7.2f} ms for {count} events")
+  print(f"  nearby(250m)             {per_call_us(lambda _: locator.nearby(point, 250), range(100)):7.2f} us/query")
+  print(f"  in_building              {per_call_us(lambda _: locator.in_building('Library'), range(100)):7.2f} us/query")
+
+if __name__ == "__main__":
+  main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
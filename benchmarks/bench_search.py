@@ -0,0 +1,54 @@
+"""Measures /events/search query latency against the substring scan behind /events?q=, and the
+cost of building and updating the index.
+
+Run from the repository root:  python -m benchmarks.bench_search [entries]"""
+import sys
+import time
+
+from benchmarks import synthetic
+from event_entry import EventEntry
+from event_store import EventIndex
+from search import SearchIndex
+
+QUERIES = [
+  "parasite", # A word in a few titles
+  "chemistry seminar", # Two words, intersected
+  "music evening", # Two common description words
+  "fieldh", # A prefix
+  "the", # A word in almost every description
+  "parasite volleyball", # Two words never in the same event
+  "the and of to is parasite volleyball", # Many common words around two that never meet, the worst case
+]
+
+
+def best_ms(run, repeat=5):
+  best = None
+  for _ in range(repeat):
+    started = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - started
+    best = elapsed if best is None else min(best, elapsed)
+  return best * 1000
+
+def main(count=100000):
+  events = [EventEntry(*entry) for entry in synthetic.entries(count)]
+  for event in events:
+    event.desc # Parsed lazily; both searches need it, so neither pays for it below
+
+  started = time.perf_counter()
+  index = SearchIndex(events)
+  build_ms = (time.perf_counter() - started) * 1000
+  changed = [EventEntry(*entry) for entry in synthetic.entries(count // 100, seed=1)]
+  update_ms = best_ms(lambda: (index.update(added=changed), index.update(removed=changed)), repeat=1)
+  scan = EventIndex(events, EventEntry.location_resolver)
+
+  print(f"Search over {count} synthetic events: index built in {build_ms:.0f} ms, "
+        f"1% of the events re-indexed in {update_ms:.1f} ms")
+  for query in QUERIES:
+    matches = len(index.search(query, limit=None))
+    indexed = best_ms(lambda: index.search(query, limit=20))
+    scanned = best_ms(lambda: scan.query(text=query, limit=20), repeat=1)
+    print(f"  {query!r:<40} {matches:>7} matches  index {indexed:8.2f} ms  substring scan {scanned:8.2f} ms")
+
+if __name__ == "__main__":
+  main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,28 @@
+"""Compares the original strptime-based time_start_end with event_times.parse_time_range.
+
+Run from the repository root:  python -m benchmarks.bench_times [calls]"""
+import random
+import sys
+import timeit
+from benchmarks import legacy, synthetic
+from event_times import parse_time_range
+
+
+def per_call_us(function, values, repeat=5):
+  best = min(timeit.repeat(lambda: [function(value) for value in values], number=1, repeat=repeat))
+  return best / len(values) * 1e6
+
+def main(count=10000):
+  rng = random.Random(494)
+  times = [rng.choice(synthetic.TIMES).replace("&#8211;", " -") for _ in range(count)]
+  unmemoized = parse_time_range.__wrapped__
+
+  print(f"{count} time ranges ({len(set(times))} distinct)")
+  baseline = per_call_us(legacy.time_start_end, times)
+  for name, us in [("legacy strptime", baseline),
+                   ("fast parser, no memo", per_call_us(unmemoized, times)),
+                   ("fast parser, memoized", per_call_us(parse_time_range, times))]:
+    print(f"  {name:<22} {us:7.2f} us/range  {baseline / us:6.1f}x")
+
+if __name__ == "__main__":
+  main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,83 @@
+"""Pre-optimization implementations kept as baselines for the benchmarks and the golden-output tests."""
+import re
+from datetime import datetime
+
+
+def parse_summary_desc(summary):
+  """The original EventEntry.parse_summary description cleanup: about 22 uncompiled re.sub calls
+  per '>'-separated fragment, with header detection through list.index()."""
+  sum_split = summary.split(">")
+
+  desc = ""
+  for sub in sum_split:
+    if sub.endswith("strong") and sum_split.index(sub) > 0:
+      continue
+    sub = re.sub(r'/[a-z]+', "", sub)
+    sub = re.sub(r'\bp\b(?!\.)', '\n\n', sub)
+    sub = re.sub(r'span', "", sub)
+    sub = re.sub(r' em ', "", sub)
+    sub = re.sub(r'nbsp;', "", sub)
+    sub = re.sub(r' b ', "", sub)
+    sub = re.sub(r'<[a-z]+', "", sub)
+    sub = re.sub(r'>', "", sub)
+    sub = re.sub(r'<', "", sub)
+    sub = re.sub(r' br ', "", sub)
+    sub = re.sub(r'span', "", sub)
+    sub = re.sub(r' i ', "", sub)
+
+    sub = re.sub(r'\bli\b', '•', sub)
+    sub = re.sub(r'\bul\b', '\n', sub)
+    sub = re.sub(r'\b/ul\b', '\n', sub)
+    sub = re.sub(r'\b/li\b', '\n', sub)
+    sub = re.sub(r'Sponsored by:\s*(.+)', r'\n\n Sponsored by: \1\n\n', sub)
+
+    sub = re.sub(r'\s*href\s*=\s*["\'][^"\']*["\']', '', sub)
+    sub = re.sub(r'\n{2,}', '\n\n', sub)
+    sub = re.sub(r'[ \t]+', ' ', sub)
+    sub = re.sub(r' *\n *', '\n', sub)
+    sub = sub.strip()
+
+    desc += sub
+
+  return desc.strip().replace("amp;", "&")
+
+
+def get_location_coords(location_coords, location):
+  """The original EventEntry.get_location_coords: lowercases every key and scans them in order."""
+  if not location:
+    return None
+  location = location.lower()
+  for key, coord in location_coords.items():
+    if isinstance(key, tuple):
+      if any(name.lower() in location for name in key):
+        return coord
+    elif isinstance(key, str):
+      if key.lower() in location:
+        return coord
+  return None
+
+
+def time_start_end(time):
+  """The original EventEntry.time_start_end: up to four strptime attempts for each end of the range."""
+  if not time:
+      return None, None
+
+  parts = time.split("-")
+
+  if len(parts) != 2:
+      return None, None
+
+  start_str = parts[0].strip()
+  end_str = parts[1].strip()
+
+  formats = ["%I:%M %p", "%I %p", "%I:%M%p", "%I%p"]
+
+  def format_24_hour(t):
+      for fmt in formats:
+          try:
+              return datetime.strptime(t, fmt).strftime("%H:%M")
+          except ValueError:
+              continue
+      return None
+
+  return format_24_hour(start_str), format_24_hour(end_str)
@@ -0,0 +1,174 @@
+"""Benchmarks the ingest-parse-serve pipeline on synthetic feeds and writes the results as JSON.
+
+Run from the repository root:
+  python -m benchmarks.run [--sizes 100 1000 10000 100000] [--output results.json]
+                           [--compare baseline.json] [--tolerance 0.25]
+
+Each case is timed over synthetic feeds of every size, keeping the best of a few runs. With
+--compare, cases more than --tolerance slower per entry than in an earlier results file are
+listed and the exit status is 1, so two commits can be compared."""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import patch
+
+os.environ.setdefault("MACEVENTS_REFRESH_INTERVAL", "0") # Importing app must not start fetching the live feed
+os.environ.setdefault("MACEVENTS_PARSED_DB", "")
+os.environ.setdefault("MACEVENTS_SNAPSHOT", "") # Nor take the snapshot lock and write events.snapshot in the working tree
+
+from benchmarks import synthetic
+import events_feed
+import pages
+from app import app
+from event_entry import EventEntry
+from event_times import parse_time_range
+
+SIZES = (100, 1000, 10000, 100000)
+
+
+def best_seconds(run, setup=None, repeat=3):
+  best = None
+  for _ in range(repeat):
+    if setup is not None:
+      setup()
+    started = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - started
+    best = elapsed if best is None else min(best, elapsed)
+  return best
+
+def feed_entries(entries):
+  return [SimpleNamespace(id=entry_id, title=title, link=link, summary=summary) for entry_id, title, link, summary in entries]
+
+def new_feed():
+  events_feed.clear_cache()
+  pages.fragments.clear()
+
+
+def bench_entry_init(entries):
+  return best_seconds(lambda: [EventEntry(*entry) for entry in entries])
+
+def bench_parse_summary(entries):
+  events = [EventEntry(*entry) for entry in entries]
+  return best_seconds(lambda: [event.parse_summary() for event in events])
+
+def bench_all_fields(entries):
+  """EventEntry plus every lazily derived field, i.e. what serving an event needs."""
+  def run():
+    for event in [EventEntry(*entry) for entry in entries]:
+      event.desc, event.coord, event.start_time
+  return best_seconds(run)
+
+def bench_time_start_end(entries):
+  times = [event.time for event in (EventEntry(*entry) for entry in entries)]
+  event = EventEntry()
+  return best_seconds(lambda: [event.time_start_end(value) for value in times], setup=parse_time_range.cache_clear)
+
+def bench_get_location_coords(entries):
+  locations = [event.location for event in (EventEntry(*entry) for entry in entries)]
+  event = EventEntry()
+  return best_seconds(lambda: [event.get_location_coords(location) for location in locations],
+                      setup=EventEntry.location_resolver.resolve.cache_clear)
+
+def bench_get_events_cold(entries):
+  with patch.object(events_feed.reader, "get_entries", return_value=feed_entries(entries)):
+    return best_seconds(events_feed.get_events, setup=new_feed)
+
+def bench_get_events_refresh(entries):
+  """A feed update where 1% of the entries changed."""
+  changed = feed_entries(entries)
+  for entry in changed[::100]:
+    entry.summary += "<p>Updated</p>"
+  with patch.object(events_feed.reader, "get_entries", return_value=feed_entries(entries)) as get_entries:
+    def setup():
+      new_feed()
+      get_entries.return_value = feed_entries(entries)
+      events_feed.get_events()
+      get_entries.return_value = changed
+      events_feed.invalidate()
+    return best_seconds(events_feed.get_events, setup=setup)
+
+def bench_events_route(entries, first_request):
+  client = app.test_client()
+  with patch.object(events_feed.reader, "get_entries", return_value=feed_entries(entries)):
+    def setup():
+      if first_request or events_feed._events is None:
+        new_feed()
+        events_feed.get_events() # Parsed, but with the lazy fields and the body still to build
+    return best_seconds(lambda: client.get("/events"), setup=setup)
+
+CASES = {
+  "EventEntry.__init__": bench_entry_init,
+  "EventEntry.parse_summary": bench_parse_summary,
+  "EventEntry all fields": bench_all_fields,
+  "time_start_end": bench_time_start_end,
+  "get_location_coords": bench_get_location_coords,
+  "get_events (cold)": bench_get_events_cold,
+  "get_events (1% changed)": bench_get_events_refresh,
+  "/events (first request)": lambda entries: bench_events_route(entries, True),
+  "/events (cached)": lambda entries: bench_events_route(entries, False),
+}
+
+
+def commit():
+  try:
+    return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+  except (OSError, subprocess.CalledProcessError):
+    return None
+
+def run(sizes, cases=CASES):
+  results = []
+  for size in sizes:
+    entries = synthetic.entries(size)
+    for name, case in cases.items():
+      seconds = case(entries)
+      results.append({"case": name, "entries": size, "seconds": seconds, "us_per_entry": seconds / size * 1e6})
+      print(f"  {name:<26} {size:>7} entries  {seconds * 1000:10.2f} ms  {seconds / size * 1e6:9.2f} us/entry",
+            flush=True)
+  new_feed()
+  return {
+    "commit": commit(),
+    "python": platform.python_version(),
+    "machine": platform.machine(),
+    "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    "results": results,
+  }
+
+def regressions(report, baseline, tolerance):
+  """Returns (case, entries, baseline us/entry, us/entry) for every case slower than baseline by more than tolerance."""
+  before = {(result["case"], result["entries"]): result["us_per_entry"] for result in baseline["results"]}
+  found = []
+  for result in report["results"]:
+    previous = before.get((result["case"], result["entries"]))
+    if previous is not None and result["us_per_entry"] > previous * (1 + tolerance):
+      found.append((result["case"], result["entries"], previous, result["us_per_entry"]))
+  return found
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+  parser.add_argument("--output", help="write the results to this JSON file")
+  parser.add_argument("--compare", help="an earlier results file to check for regressions")
+  parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown per entry (default 0.25 = 25%%)")
+  args = parser.parse_args(argv)
+
+  report = run(args.sizes)
+  if args.output:
+    with open(args.output, "w") as file:
+      json.dump(report, file, indent=2)
+  if args.compare:
+    with open(args.compare) as file:
+      slower = regressions(report, json.load(file), args.tolerance)
+    for case, size, previous, current in slower:
+      print(f"REGRESSION {case} at {size} entries: {previous:.2f} -> {current:.2f} us/entry")
+    return 1 if slower else 0
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main())
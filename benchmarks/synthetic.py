@@ -0,0 +1,84 @@
+"""Generators for synthetic Macalester-style feed entries used by the benchmarks and golden tests."""
+import random
+from datetime import date, timedelta
+
+LOCATIONS = [
+  "Library", "Humanities 401", "Old Main 002", "Carnegie Hall 06B", "Olin-Rice Science Center 250",
+  "Markim Hall", "Kagin Commons Ballroom", "Ruth Stricker Dayton Campus Center, Room 214",
+  "John B Davis Lecture Hall", "Music Building Mairs Concert Hall", "Janet Wallace Fine Arts Center",
+  "Law Warschaw Gallery", "Weyerhaeuser Memorial Chapel", "Leonard Center Fieldhouse", "Shaw Field",
+  "Theater and Dance Building", "Weyerhaeuser Hall", "College Admissions Office", "Great Lawn",
+  "Macalester Stadium", "Online", "Minneapolis Institute of Art",
+]
+
+TIMES = [
+  "9:00 AM &#8211; 10:00 AM", "11:30 AM &#8211; 1:00 PM", "12 PM &#8211; 1 PM", "4:30 PM &#8211; 6:00 PM",
+  "7:00 PM &#8211; 9:30 PM", "7:30PM &#8211; 9PM", "10:00 AM &#8211; 4:00 PM",
+]
+
+TITLES = [
+  "Fall Concert", "Career Fair", "Study Abroad Info Session", "Chemistry Seminar", "Open Mic Night",
+  "Volleyball vs. St. Olaf", "Art Exhibit Opening", "Yoga in the Chapel", "Alumni Panel amp; Reception",
+  "Election Watch Party", "Writing Center Workshop", "Film Screening: Parasite",
+]
+
+SENTENCES = [
+  "Join us for an evening of music and conversation.",
+  "All students, faculty, and staff are welcome to attend.",
+  "Refreshments will be provided &amp; seating is limited.",
+  "Bring your questions for the panel of alumni in the field.",
+  "The event is free and open to the public.",
+  "Registration is required by Friday at noon.",
+  "Learn how to apply for summer research p. 12 of the handbook.",
+  "Light snacks provided&nbsp;while supplies last.",
+  "This talk explores climate policy across the Twin Cities.",
+  "Participants should wear comfortable clothing.",
+]
+
+SPONSORS = ["Music Department", "Career Exploration", "Institute for Global Citizenship", "Program Board",
+            "Department of Chemistry &amp; Biochemistry"]
+
+
+def summary(rng, paragraphs=3):
+  """Returns one summary in the shape the Mac RSS feed uses: a bold date/time/location header
+  followed by an HTML description."""
+  day = date(2025, 9, 1) + timedelta(days=rng.randrange(240))
+  header = [f"{day:%B} {day.day}, {day.year}"]
+  if rng.random() < 0.85:
+    header.append(rng.choice(TIMES))
+  header.append(rng.choice(LOCATIONS))
+  parts = [f"<strong>{' | '.join(header)}</strong>"]
+
+  for _ in range(paragraphs):
+    shape = rng.random()
+    text = " ".join(rng.sample(SENTENCES, rng.randint(1, 3)))
+    if shape < 0.45:
+      parts.append(f"<p>{text}</p>")
+    elif shape < 0.6:
+      parts.append(f"<p><span style=\"font-weight: 400;\">{text}</span></p>")
+    elif shape < 0.72:
+      items = "".join(f"<li>{sentence}</li>" for sentence in rng.sample(SENTENCES, 3))
+      parts.append(f"<ul>{items}</ul>")
+    elif shape < 0.82:
+      parts.append(f"<p>{text} <a href=\"https://www.macalester.edu/events/{rng.randrange(1000)}\">Learn more</a></p>")
+    elif shape < 0.9:
+      parts.append(f"<p><em>{text}</em><br />{rng.choice(SENTENCES)}</p>")
+    else:
+      parts.append(f"<p><b>Note:</b> {text}&nbsp;</p>")
+  if rng.random() < 0.5:
+    parts.append(f"<p>Sponsored by: {rng.choice(SPONSORS)}</p>")
+  return "".join(parts)
+
+
+def entries(count, seed=494, paragraphs=3):
+  """Returns count (id, title, link, summary) tuples with deterministic content for the given seed."""
+  rng = random.Random(seed)
+  result = []
+  for number in range(count):
+    if rng.random() < 0.05:
+      title = f"Library hours: {rng.choice(['8am-10pm', '7:30am-2am', '10am-6pm'])}"
+    else:
+      title = rng.choice(TITLES)
+    link = f"https://webapps.macalester.edu/eventscalendar/event/{number}"
+    result.append((link, title, link, summary(rng, paragraphs)))
+  return result
@@ -0,0 +1,93 @@
+import json
+import sys
+
+try:
+  import msgpack
+except ImportError: # Optional; without it only the columnar JSON layout is offered
+  msgpack = None
+
+COLUMNAR = "application/vnd.macevents.columnar+json"
+MSGPACK = "application/x-msgpack"
+FORMAT_VERSION = 1
+
+# Compact representations offered, in order of preference
+MIMETYPES = [MSGPACK, COLUMNAR] if msgpack is not None else [COLUMNAR]
+
+# (key in the /events JSON, EventEntry attribute), in the order of event_to_dict
+COLUMNS = (("id", "id"), ("title", "title"), ("location", "location"), ("date", "date"), ("time", "time"),
+           ("starttime", "start_time"), ("endtime", "end_time"), ("link", "link"), ("coord", "coord"),
+           ("description", "desc"))
+INLINE_COLUMNS = ("id", "link") # Unique to each event, so a table would only add indexes
+
+_coords = {} # (lat, lon) -> the one list shared by every event at that point
+_texts = {} # Title or description -> the one copy shared by every event carrying it, see retain_texts
+
+
+def intern_field(value):
+  """Returns the interpreter-wide copy of a short field drawn from a small vocabulary (location,
+  date, times), so repeated values are held once however many events (or pickled worker results)
+  carry them."""
+  return sys.intern(value) if type(value) is str else value
+
+def intern_text(value):
+  """Returns the shared copy of a free text field (title or description). These are kept in a
+  table of this module rather than with sys.intern, whose strings are never freed (they are
+  immortal on Python 3.12), so edited and removed texts can be dropped by retain_texts."""
+  return _texts.setdefault(value, value) if type(value) is str else value
+
+def retain_texts(texts):
+  """Drops the shared copies of every text not in texts, e.g. of entries that left the feed or were edited."""
+  live = set(texts)
+  for text in list(_texts):
+    if text not in live:
+      _texts.pop(text, None)
+
+def intern_coord(coord):
+  """Returns the shared [lat, lon] list equal to coord. Coordinates come from the campus building
+  table, so the table of shared ones stays that small."""
+  if coord is None:
+    return None
+  return _coords.setdefault(tuple(coord), coord)
+
+def encode(events):
+  """Returns events (in the order given) as a dictionary-encoded, columnar dict.
+
+  Every column holds one value per event, under the same keys as the /events JSON. id and link
+  are stored as they are; coord holds indexes into "coords" and the other columns indexes into
+  "strings", each distinct value appearing in its table once. None stays None."""
+  strings, coords = {}, {}
+  columns = {}
+  for name, attribute in COLUMNS:
+    values = [getattr(event, attribute) for event in events]
+    if name in INLINE_COLUMNS:
+      columns[name] = values
+    elif name == "coord":
+      columns[name] = [coords.setdefault(tuple(value), len(coords)) if value is not None else None for value in values]
+    else:
+      columns[name] = [strings.setdefault(value, len(strings)) if value is not None else None for value in values]
+  return {"version": FORMAT_VERSION, "count": len(events), "strings": list(strings),
+          "coords": [list(coord) for coord in coords], "columns": columns}
+
+def decode(data):
+  """Returns the list of /events JSON objects encoded in a dict made by encode()."""
+  strings, coords, columns = data["strings"], data["coords"], data["columns"]
+  resolved = []
+  for name, _ in COLUMNS:
+    values = columns[name]
+    if name not in INLINE_COLUMNS:
+      table = coords if name == "coord" else strings
+      values = [table[value] if value is not None else None for value in values]
+    resolved.append(values)
+  keys = [name for name, _ in COLUMNS]
+  return [dict(zip(keys, row)) for row in zip(*resolved)]
+
+def dumps(data, mimetype):
+  """Serializes a dict made by encode() in mimetype, one of MIMETYPES."""
+  if mimetype == MSGPACK:
+    return msgpack.packb(data, use_bin_type=True)
+  return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+def loads(body, mimetype):
+  if mimetype == MSGPACK:
+    return msgpack.unpackb(body, raw=False)
+  return json.loads(body)
@@ -0,0 +1,10 @@
+import os
+
+# Keep the background feed refresher from fetching the live feed while the tests import app.py
+os.environ.setdefault("MACEVENTS_REFRESH_INTERVAL", "0")
+
+# Parse entries afresh in every test instead of loading them from a parsed.sqlite left by another run
+os.environ.setdefault("MACEVENTS_PARSED_DB", "")
+
+# Every test process refreshes on its own instead of following a snapshot file shared with other runs
+os.environ.setdefault("MACEVENTS_SNAPSHOT", "")
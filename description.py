@@ -0,0 +1,40 @@
+import re
+
+# Cleans the HTML description of a Mac RSS summary. This gives the same text as the chain of
+# re.sub calls EventEntry.parse_summary used to run on every '>'-separated fragment, but each rule
+# runs once over the whole description: the fragments stay joined by their '>' separators, which
+# no rule below can match across, and the per-fragment strip() happens when they are rejoined.
+# The rules keep their original order, since earlier removals decide what later rules see.
+# Fixed strings use str.replace, and patterns are written to start with a literal so the regex
+# engine can skip ahead to candidate positions (e.g. "li\b(?<!\wli)" for "\bli\b").
+
+_CLOSING_TAGS = re.compile(r"/[a-z]+")
+_PARAGRAPHS = re.compile(r"p\b(?!\.)(?<!\wp)")
+_TAG_NAMES = re.compile(r"<[a-z]+")
+_BULLETS = re.compile(r"li\b(?<!\wli)")
+_LIST_BREAKS = re.compile(r"ul\b(?<!\wul)")
+_SPONSORED = re.compile(r"Sponsored by:\s*([^\n>]+)")
+_HREF = re.compile(r"\s*href\s*=\s*[\"'][^\"'>]*[\"']")
+_BLANK_LINES = re.compile(r"\n\n+")
+_SPACES = re.compile(r"  +")
+_LINE_EDGES = re.compile(r" *\n *")
+
+
+def clean_description(body):
+  """Returns the readable description for body, the '>'-joined fragments of a summary
+  that are not part of its date/time/location header."""
+  text = _CLOSING_TAGS.sub("", body)
+  text = _PARAGRAPHS.sub("\n\n", text)
+  text = text.replace("span", "").replace(" em ", "").replace("nbsp;", "").replace(" b ", "")
+  text = _TAG_NAMES.sub("", text)
+  text = text.replace("<", "").replace(" br ", "").replace("span", "").replace(" i ", "")
+  text = _BULLETS.sub("•", text)
+  text = _LIST_BREAKS.sub("\n", text) # "/ul" and "/li" are gone by now, the old rules for them never matched
+  if "Sponsored by:" in text:
+    text = _SPONSORED.sub(r"\n\n Sponsored by: \1\n\n", text)
+  if "href" in text:
+    text = _HREF.sub("", text)
+  text = _BLANK_LINES.sub("\n\n", text)
+  text = _SPACES.sub(" ", text.replace("\t", " "))
+  text = _LINE_EDGES.sub("\n", text)
+  return "".join(fragment.strip() for fragment in text.split(">")).strip().replace("amp;", "&")
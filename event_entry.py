@@ -1,9 +1,25 @@
-from datetime import datetime
-import re
+from compact import intern_coord, intern_field, intern_text
+from description import clean_description
+from datetime import datetime, time
+from event_times import parse_event_date, parse_time_range, start_key
+from locations import LocationResolver
+
+
+_PENDING = object() # Marks a derived field that has not been computed yet
+
+PARSER_VERSION = 1 # Bump whenever parsing changes, so persisted parsed events are parsed again
 
 
 class EventEntry():
-  """A class that formats the data in the reader library's Entry object for clearer use."""
+  """A class that formats the data in the reader library's Entry object for clearer use.
+
+  Entries are slotted, and the derived fields (desc, coord, start_time, end_time and start_key)
+  are computed on first access and then kept. The raw summary is only held until desc is built
+  from it. Any of them can also be assigned directly. Repeated strings and coordinates are
+  interned (see compact.intern_text and intern_field), so entries that share them hold one copy."""
+
+  __slots__ = ("id", "title", "link", "summary", "time", "location", "date",
+               "_desc", "_coord", "_start_time", "_end_time", "_start_key")
 
   def __init__(self, event_id=None, title=None, link=None, summary=None):
     self.summary = summary if summary is not None else "Summary unavailable"
@@ -15,90 +31,135 @@ class EventEntry():
                  .replace("-", " - ").replace("P", " P")
                  if self.title.lower().startswith("library hours")
                  else None)
-    self.start_time, self.end_time = self.time_start_end(self.time)
-    self.coord = None
-    self.desc = "Unavailable"
+    self._start_time = self._end_time = _PENDING
+    self._coord = None
+    self._desc = _PENDING
+    self._start_key = _PENDING
     self.location = "Location unavailable"
     self.date = "Date unavailable"
     self.parse_summary()
 
+  @classmethod
+  def from_parsed(cls, event_id, title, link, time, location, date, start_time, end_time, coord, desc,
+                  summary=None, pending=()):
+    """Rebuilds an entry from fields that were already parsed, without parsing a summary.
+    The derived fields named in pending are computed on first access instead, desc from summary."""
+    event = cls.__new__(cls)
+    event.id, event.title, event.link, event.summary = event_id, intern_text(title), link, None
+    event.time, event.location, event.date = intern_field(time), intern_field(location), intern_field(date)
+    event._start_time, event._end_time = intern_field(start_time), intern_field(end_time)
+    event._coord, event._desc = intern_coord(coord), intern_text(desc)
+    event._start_key = _PENDING
+    for field in pending:
+      setattr(event, "_" + field, _PENDING)
+    if "desc" in pending:
+      event.summary = summary
+    return event
+
+  def computed(self, field):
+    """Whether the derived field (desc, coord, start_time or end_time) was computed or assigned yet."""
+    return getattr(self, "_" + field) is not _PENDING
+
   def parse_summary(self):
-    summary = self.summary
-    sum_split = summary.split(">")
+    """Reads the date, time and location from the bold header of the summary.
+    The description is left for the desc property to build when it is first read."""
+    sum_split = self.summary.split(">")
 
-    desc = ""
-    for sub in sum_split:
-      if sub.endswith("strong") and sum_split.index(sub) > 0:
+    for sub in sum_split[1:]:
+      if sub.endswith("strong") and sub != sum_split[0]: # Bold header after the first fragment
         details_split = sub.split("|")
         self.date = details_split[0].strip()
         if len(details_split) > 2:
           self.time = details_split[1].strip().replace("&#8211;", " -")
-          self.start_time, self.end_time = self.time_start_end(self.time)
-        self.location = details_split[len(details_split) - 1].strip("</strong").strip()
-        self.coord = self.get_location_coords(self.location)
-        self.location = self.location.replace("amp;", "")
-      else:
-        sub = re.sub(r'/[a-z]+', "", sub)
-        sub = re.sub(r'\bp\b(?!\.)', '\n\n', sub)
-        sub = re.sub(r'span', "", sub)
-        sub = re.sub(r' em ', "", sub)
-        sub = re.sub(r'nbsp;', "", sub)
-        sub = re.sub(r' b ', "", sub)
-        sub = re.sub(r'<[a-z]+', "", sub)
-        sub = re.sub(r'>', "", sub)
-        sub = re.sub(r'<', "", sub)
-        sub = re.sub(r' br ', "", sub)
-        sub = re.sub(r'span', "", sub)
-        sub = re.sub(r' i ', "", sub)
-
-        sub = re.sub(r'\bli\b', '•', sub)
-        sub = re.sub(r'\bul\b', '\n', sub)
-        sub = re.sub(r'\b/ul\b', '\n', sub)
-        sub = re.sub(r'\b/li\b', '\n', sub)
-        sub = re.sub(r'Sponsored by:\s*(.+)', r'\n\n Sponsored by: \1\n\n', sub)
-
-        sub = re.sub(r'\s*href\s*=\s*["\'][^"\']*["\']', '', sub)
-        sub = re.sub(r'\n{2,}', '\n\n', sub)
-        sub = re.sub(r'[ \t]+', ' ', sub)
-        sub = re.sub(r' *\n *', '\n', sub)
-        sub = sub.strip()
-
-
-
-        desc += sub
-
-    self.desc = desc.strip().replace("amp;", "&")
+          self._start_time = self._end_time = _PENDING
+        location = details_split[len(details_split) - 1].strip("</strong").strip()
+        self.location = location.replace("amp;", "")
+        # Coordinates are matched against the location before "amp;" is removed
+        self._coord = _PENDING if location == self.location else self.get_location_coords(location)
+
+    self.title, self.time = intern_text(self.title), intern_field(self.time)
+    self.location, self.date = intern_field(self.location), intern_field(self.date)
+    self._desc = _PENDING
+    self._start_key = _PENDING
+
+  @property
+  def desc(self):
+    desc = self._desc
+    if desc is _PENDING:
+      summary = self.summary
+      if summary is None: # Another thread parsed it since; it sets _desc before dropping the summary
+        return self._desc
+      sum_split = summary.split(">")
+      body = [sub for sub in sum_split if not (sub.endswith("strong") and sub != sum_split[0])]
+      desc = self._desc = intern_text(clean_description(">".join(body)))
+      self.summary = None # Only desc is needed from here on
+    return desc
+
+  @desc.setter
+  def desc(self, value):
+    self._desc = value
+
+  @property
+  def coord(self):
+    coord = self._coord
+    if coord is _PENDING:
+      coord = self._coord = self.get_location_coords(self.location)
+    return coord
+
+  @coord.setter
+  def coord(self, value):
+    self._coord = value
+
+  @property
+  def start_time(self):
+    if self._start_time is _PENDING:
+      self._parse_times()
+    return self._start_time
+
+  @start_time.setter
+  def start_time(self, value):
+    self._start_time = value
+
+  @property
+  def end_time(self):
+    if self._end_time is _PENDING:
+      self._parse_times()
+    return self._end_time
+
+  @end_time.setter
+  def end_time(self, value):
+    self._end_time = value
+
+  @property
+  def start_key(self):
+    """The (date ordinal, start minute, id) tuple events are ordered by, see event_times.start_key."""
+    key = getattr(self, "_start_key", _PENDING) # Entries made with object.__new__ (e.g. in tests) start unset
+    if key is _PENDING:
+      key = self._start_key = start_key(self.date, self.start_time, self.id)
+    return key
+
+  @property
+  def starts_at(self):
+    """The start of the event as a naive campus-time datetime (midnight for untimed events), or None if undated."""
+    date = parse_event_date(self.date)
+    if date is None:
+      return None
+    hours, minutes = divmod(max(self.start_key[1], 0), 60)
+    return datetime.combine(date, time(hours, minutes))
+
+  def _parse_times(self):
+    start_time, end_time = self.time_start_end(self.time)
+    if self._start_time is _PENDING:
+      self._start_time = start_time
+    if self._end_time is _PENDING:
+      self._end_time = end_time
 
   """A function that converts a time string to a 24 hour time format.
   Args: time str
   Returns: start time, end time or None, None tuple"""
 
   def time_start_end(self, time):
-    if not time:
-        return None, None
-
-    parts = time.split("-")
-
-    if len(parts) != 2:
-        return None, None
-
-    start_str = parts[0].strip()
-    end_str = parts[1].strip()
-
-    formats = ["%I:%M %p", "%I %p", "%I:%M%p", "%I%p"]
-
-    def format_24_hour(t):
-        for fmt in formats:
-            try:
-                return datetime.strptime(t, fmt).strftime("%H:%M")
-            except ValueError:
-                continue
-        return None
-
-    start_24 = format_24_hour(start_str)
-    end_24 = format_24_hour(end_str)
-
-    return start_24, end_24
+    return parse_time_range(time) # Memoized, and only falls back to strptime for unusual input
 
   location_coords = {
       "Library": [44.93855, -93.16822],
@@ -121,23 +182,15 @@ class EventEntry():
       "Macalester Stadium": [44.93523, 93.16734]
   }
 
-  """A function thatatches location str to campus building and returns
+  location_resolver = LocationResolver(location_coords) # Built once; matches all building names in one pass
+
+  """A function that matches location str to campus building and returns
   the coordinates of the building, latitude and longitude.
     Args: location str
     Returns: coordinates or None if no match found."""
 
   def get_location_coords(self, location: str):
-    if not location:
-      return None
-    location = location.lower()
-    for key, coord in self.location_coords.items():
-      if isinstance(key, tuple):
-        if any(name.lower() in location for name in key):
-          return coord
-      elif isinstance(key, str):
-        if key.lower() in location:
-          return coord
-    return None
+    return self.location_resolver.coords(location)
 
   def __str__(self):
     return (f"Title: {self.title}\n\n" +
@@ -147,4 +200,15 @@ class EventEntry():
             f"Time: {self.time}\n\n" +
             f"Start Time: {self.start_time}\n\n" +
             f"End Time: {self.end_time}\n\n" +
-            f"Link: {self.link}")
\ No newline at end of file
+            f"Link: {self.link}")
+
+
+def parse_rows(entries):
+  """Parses (id, title, link, summary) tuples into tuples of EventEntry.from_parsed arguments.
+  Ingest worker processes run this, so it sends back plain tuples that are cheap to pickle."""
+  rows = []
+  for entry in entries:
+    event = EventEntry(*entry)
+    rows.append((event.id, event.title, event.link, event.time, event.location, event.date,
+                 event.start_time, event.end_time, event.coord, event.desc))
+  return rows
@@ -0,0 +1,147 @@
+import base64
+import binascii
+import json
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from event_times import UNDATED, clock_minutes
+
+
+def sort_key(event):
+  """Returns the key that orders event chronologically, computed once per EventEntry."""
+  return event.start_key
+
+def encode_cursor(key):
+  return base64.urlsafe_b64encode(json.dumps(key, separators=(",", ":")).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor):
+  """Returns the sort key encoded in cursor, raising ValueError if it is malformed."""
+  try:
+    ordinal, minutes, event_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    return (int(ordinal), int(minutes), str(event_id))
+  except (binascii.Error, UnicodeDecodeError, TypeError, ValueError, OverflowError) as error: # int(Infinity) overflows
+    raise ValueError(f"Invalid cursor: {cursor!r}") from error
+
+
+class SortedEvents():
+  """Events kept in sort_key() order with bisect, alongside a parallel list of their keys.
+
+  The feed keeps one of these across refreshes and only inserts and removes the entries
+  that changed, so ordered output never needs a full sort."""
+
+  def __init__(self, events=()):
+    pairs = sorted(((sort_key(event), event) for event in events), key=lambda pair: pair[0])
+    self.keys = [key for key, _ in pairs]
+    self.events = [event for _, event in pairs]
+
+  def __len__(self):
+    return len(self.events)
+
+  def __iter__(self):
+    return iter(self.events)
+
+  def add(self, event):
+    key = sort_key(event)
+    position = bisect_right(self.keys, key)
+    self.keys.insert(position, key)
+    self.events.insert(position, event)
+
+  def remove(self, event):
+    """Removes event (matched by identity), returning whether it was present."""
+    key = sort_key(event)
+    position = bisect_left(self.keys, key)
+    while position < len(self.keys) and self.keys[position] == key:
+      if self.events[position] is event:
+        del self.keys[position]
+        del self.events[position]
+        return True
+      position += 1
+    return False
+
+  def copy(self):
+    copied = SortedEvents()
+    copied.keys = list(self.keys)
+    copied.events = list(self.events)
+    return copied
+
+
+class EventIndex():
+  """Chronologically ordered view of one events snapshot, with indexes for filtered queries.
+
+  Events are kept sorted by sort_key() with the keys in a parallel list, so a date range is
+  two bisections. Each building keeps the sorted positions of its events, so a building query
+  only visits that building's events. Cursors encode the sort key of the last event returned
+  rather than a position, so a page boundary stays put when a feed refresh adds or removes events."""
+
+  def __init__(self, events, resolver):
+    self.resolver = resolver
+    ordered = getattr(events, "ordered", None) # Snapshots come already sorted
+    if ordered is None:
+      ordered = SortedEvents(events)
+    self.keys = ordered.keys
+    self.events = ordered.events
+    self.by_building = defaultdict(list)
+    for position, event in enumerate(self.events):
+      building = resolver.resolve(event.location)
+      if building is not None:
+        self.by_building[building.name].append(position)
+
+  def __len__(self):
+    return len(self.events)
+
+  def query(self, start=None, end=None, location=None, text=None, limit=None, after=None, now=None):
+    """Returns (events, next cursor or None) for the events matching every given filter, in order.
+
+    start and end are inclusive dates, location names a building (or is matched as a substring
+    of the event location when it names none), text is matched case-insensitively against the
+    title, location and description, and after is a decoded cursor. With now (a naive campus
+    datetime), only dated events that have not ended yet are returned, including events from
+    the day before that run past midnight."""
+    lo = bisect_left(self.keys, (start.toordinal(),)) if start is not None else 0
+    hi = bisect_left(self.keys, (end.toordinal() + 1,)) if end is not None else len(self.keys)
+    if after is not None:
+      lo = max(lo, bisect_right(self.keys, after))
+    today = None
+    if now is not None:
+      today = now.toordinal()
+      lo = max(lo, bisect_left(self.keys, (today - 1,))) # Yesterday's events may still run past midnight
+      hi = min(hi, bisect_left(self.keys, (UNDATED,)))
+      now_minutes = now.hour * 60 + now.minute
+
+    building = self.resolver.building(location) if location else None
+    if building is not None:
+      positions = self.by_building.get(building.name, [])
+      candidates = positions[bisect_left(positions, lo):bisect_left(positions, hi)]
+    else:
+      candidates = range(lo, hi)
+
+    needle = location.lower() if location and building is None else None
+    text = text.lower() if text else None
+    found = []
+    last = None
+    for position in candidates:
+      event = self.events[position]
+      if today is not None and self.keys[position][0] <= today and \
+         self._ended(event, (today - self.keys[position][0]) * 1440 + now_minutes):
+        continue
+      if needle is not None and needle not in (event.location or "").lower():
+        continue
+      if text is not None and not any(text in (value or "").lower() for value in (event.title, event.location, event.desc)):
+        continue
+      if limit is not None and len(found) == limit:
+        return found, encode_cursor(self.keys[last]) # More events match after this page
+      found.append(event)
+      last = position
+    return found, None
+
+  @staticmethod
+  def _ended(event, now_minutes):
+    """Whether event ended before now_minutes, counted from the midnight that starts its day."""
+    starts = clock_minutes(event.start_time)
+    ends = clock_minutes(event.end_time)
+    if ends is None:
+      ends = starts # Without an end time, an event counts as over once it starts
+    elif starts is not None and ends < starts: # Ends after midnight, on the next day
+      ends += 1440
+    if ends is None:
+      return now_minutes >= 1440 # An untimed event lasts its whole day
+    return ends < now_minutes
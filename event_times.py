@@ -0,0 +1,76 @@
+import re
+from datetime import datetime
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+TIME_MEMO_SIZE = 1024 # A campus calendar only uses a few hundred distinct time ranges
+UNDATED = 10 ** 7 # Sorts events whose date could not be parsed after every real date ordinal
+UNTIMED = -1 # Sorts events without a start time first on their day
+
+try:
+  CAMPUS_TIMEZONE = ZoneInfo("America/Chicago") # Feed dates and times are campus local time
+except ZoneInfoNotFoundError:
+  CAMPUS_TIMEZONE = None # No tz database installed, fall back to the server's local time
+
+# The shapes matched by the strptime formats "%I:%M %p", "%I %p", "%I:%M%p" and "%I%p",
+# written as one ASCII pattern so the common cases skip strptime entirely.
+_CLOCK_TIME = re.compile(r"(1[0-2]|0?[1-9])(?::([0-5][0-9]|[0-9]))?\s*([AaPp][Mm])", re.ASCII)
+_FORMATS = ["%I:%M %p", "%I %p", "%I:%M%p", "%I%p"]
+
+
+def format_24_hour(t):
+  """Converts a 12-hour clock time such as "2:00 PM" or "9am" to "HH:MM", or returns None."""
+  match = _CLOCK_TIME.fullmatch(t)
+  if match:
+    hour, minute, meridiem = match.groups()
+    hour = int(hour) % 12 + (12 if meridiem[0] in "Pp" else 0)
+    return f"{hour:02d}:{int(minute or 0):02d}"
+
+  for fmt in _FORMATS: # Unusual input, e.g. stray unicode whitespace, gets the exact strptime behavior
+    try:
+      return datetime.strptime(t, fmt).strftime("%H:%M")
+    except ValueError:
+      continue
+  return None
+
+@lru_cache(maxsize=TIME_MEMO_SIZE)
+def parse_time_range(time):
+  """Converts a time range string such as "2:00 PM - 4:00 PM" to a 24 hour ("14:00", "16:00") tuple.
+  Either end is None when it cannot be parsed, and both are when time is not a two-part range."""
+  if not time:
+    return None, None
+
+  parts = time.split("-")
+
+  if len(parts) != 2:
+    return None, None
+
+  return format_24_hour(parts[0].strip()), format_24_hour(parts[1].strip())
+
+@lru_cache(maxsize=4096)
+def parse_event_date(text):
+  """Converts a feed date such as "November 15, 2025" to a date, or returns None."""
+  try:
+    return datetime.strptime(text.strip(), "%B %d, %Y").date()
+  except (AttributeError, ValueError):
+    return None
+
+def clock_minutes(time_24):
+  """Converts a 24 hour "HH:MM" time to minutes after midnight, or returns None."""
+  if not time_24:
+    return None
+  hours, _, minutes = time_24.partition(":")
+  return int(hours) * 60 + int(minutes)
+
+def start_key(date_text, start_time, event_id):
+  """Returns the (date ordinal, start minute, id) key that orders events chronologically.
+  Undated events sort after every dated one, and untimed events first on their day."""
+  date = parse_event_date(date_text)
+  minutes = clock_minutes(start_time)
+  return (date.toordinal() if date is not None else UNDATED,
+          minutes if minutes is not None else UNTIMED,
+          str(event_id))
+
+def campus_now():
+  """Returns the current naive date and time on campus."""
+  return datetime.now(CAMPUS_TIMEZONE).replace(tzinfo=None)
@@ -1,17 +1,646 @@
+import hashlib
+import logging
+import math
+import multiprocessing
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
 from reader import make_reader
-from event_entry import EventEntry
+import compact
+from event_entry import EventEntry, parse_rows
+from event_store import SortedEvents
+import metrics
+from metrics import DERIVED, FEED_ERRORS, REFRESH_SECONDS, REFRESHES, STAGE_SECONDS
+from feed_registry import DEFAULT_TIMEOUT, FeedRegistry, parse_feed_list
+from parsed_store import ParsedEventStore
+from search import SearchIndex
 
-feed_url = "https://webapps.macalester.edu/eventscalendar/events/rss/"
+logger = logging.getLogger(__name__)
+
+# The Macalester events feed; MACEVENTS_FEED_URL points it elsewhere, e.g. at the load test's stand-in server
+feed_url = os.environ.get("MACEVENTS_FEED_URL", "https://webapps.macalester.edu/eventscalendar/events/rss/")
 
 reader = make_reader("db.sqlite") # Creating a reader object and initializing a database to store info
 
+feeds = FeedRegistry() # feed_url first, then the calendars listed in MACEVENTS_FEEDS
+FETCH_WORKERS = int(os.environ.get("MACEVENTS_FETCH_WORKERS", 4)) # Feeds fetched at the same time
+
+
+CHANGE_LOG_GENERATIONS = 200 # Feed generations a change token stays valid for, ~2 days at the default refresh interval
+
+# Seconds after the last successful refresh at which a request starts a background refresh while it is
+# answered from the stale snapshot. None leaves refreshing to the FeedRefresher alone.
+STALE_AFTER = None
+REVALIDATE_RETRY = 60 # Seconds before requests may start another background refresh after one failed
+
+PARALLEL_MIN_ENTRIES = 2000 # Smaller batches parse faster in this process than they can be shipped to workers
+PARSE_WORKERS = int(os.environ.get("MACEVENTS_PARSE_WORKERS", 0)) or os.cpu_count() or 1
+# Parse workers are not forked from this process: it runs the refresher and request threads, and a
+# child forked while one of them held a lock (logging, sqlite, the import lock) could hang on it
+PARSE_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+# Sidecar database of parsed events that lets a restarted worker skip parsing unchanged entries; "" turns it off
+PARSED_DB = os.environ.get("MACEVENTS_PARSED_DB", "parsed.sqlite")
+
+
+class _Flight():
+  def __init__(self):
+    self.done = threading.Event()
+    self.result = None
+    self.error = None
+
+  def wait(self):
+    self.done.wait()
+    if self.error is not None:
+      raise self.error
+    return self.result
+
+
+class SingleFlight():
+  """Runs at most one call per key at a time. Callers that ask for a key while its call is running
+  wait for that call and share its result (or exception) instead of running it again."""
+
+  def __init__(self):
+    self.calls = 0 # Calls actually run
+    self._lock = threading.Lock()
+    self._running = {} # key -> _Flight
+
+  def run(self, key, function):
+    """Returns function(), or the result of the call already running for key."""
+    with self._lock:
+      flight = self._running.get(key)
+      if flight is not None:
+        joined = True
+      else:
+        joined = False
+        flight = self._running[key] = _Flight()
+        self.calls += 1
+    if joined:
+      return flight.wait()
+    try:
+      flight.result = function()
+    except BaseException as error:
+      flight.error = error
+      raise
+    finally:
+      with self._lock:
+        del self._running[key]
+      flight.done.set()
+    return flight.result
+
+
+class ParsedEntryCache():
+  """A map of entry id to its content fingerprint and parsed EventEntry, so only entries that
+  changed since the last feed update have to be parsed again.
+
+  It holds the entries of the current feed and is only trimmed by retain(), once entries leave
+  the feed: a size bound would make every refresh of a larger feed parse the entries it evicted."""
+
+  def __init__(self):
+    self.hits = 0
+    self.misses = 0
+    self._entries = {}
+
+  def __len__(self):
+    return len(self._entries)
+
+  def __contains__(self, entry_id):
+    return entry_id in self._entries
+
+  def get(self, entry_id, fingerprint):
+    """Returns the cached EventEntry for entry_id if it was parsed from the same content, otherwise None."""
+    cached = self._entries.get(entry_id)
+    if cached is None or cached[0] != fingerprint:
+      self.misses += 1
+      return None
+    self.hits += 1
+    return cached[1]
+
+  def put(self, entry_id, fingerprint, event):
+    self._entries[entry_id] = (fingerprint, event)
+
+  def retain(self, entry_ids):
+    """Evicts every cached entry whose id is not in entry_ids, i.e. entries that left the feed."""
+    for entry_id in [key for key in self._entries if key not in entry_ids]:
+      del self._entries[entry_id]
+
+  def texts(self):
+    """Yields the title and, once built, the description of every cached entry."""
+    for _, event in list(self._entries.values()):
+      yield event.title
+      if event.computed("desc"):
+        yield event.desc
+
+  def clear(self):
+    self._entries.clear()
+    self.hits = 0
+    self.misses = 0
+
+
+class ChangeLog():
+  """The entries added, updated and removed by each of the last `max_generations` feed generations,
+  so a client holding a token for one of them only needs to fetch the difference.
+
+  Tokens name a generation of this process's snapshots, or of the host's when workers follow a
+  shared snapshot file. A token from another worker that does not share it, from before the
+  oldest generation kept, or for a generation this log never recorded (a follower can skip the
+  generations published between two of its checks), cannot be answered and needs a full resync."""
+
+  def __init__(self, max_generations=CHANGE_LOG_GENERATIONS, epoch=None):
+    self.max_generations = max_generations
+    self.epoch = epoch or secrets.token_hex(4) # Generations restart with every log, so tokens are tied to it
+    self.oldest = None # The earliest generation a token can name
+    self._log = deque() # (generation, {entry id: "added", "updated" or "removed"})
+
+  def record(self, generation, before, after):
+    """Logs the difference between the (entry id, fingerprint) keys of the previous generation and of this one.
+    before is None for the first generation."""
+    if before is None:
+      self.oldest = generation
+      return
+    old, new = dict(before), dict(after)
+    changes = {entry_id: "removed" for entry_id in old.keys() - new.keys()}
+    for entry_id, fingerprint in new.items():
+      if entry_id not in old:
+        changes[entry_id] = "added"
+      elif old[entry_id] != fingerprint:
+        changes[entry_id] = "updated"
+    self._log.append((generation, changes))
+    while len(self._log) > self.max_generations:
+      self.oldest = self._log.popleft()[0] # Deltas up to and including this generation are gone
+
+  def token(self, generation):
+    return f"{self.epoch}-{generation}"
+
+  def parse(self, token, generation):
+    """Returns the generation named by token if changes since it up to generation can be answered, otherwise None."""
+    epoch, _, number = (token or "").partition("-")
+    if epoch != self.epoch or not number.isdigit() or self.oldest is None:
+      return None
+    since = int(number)
+    if since > generation:
+      return None
+    if since == self.oldest or any(logged == since for logged, _ in list(self._log)):
+      return since
+    return None
+
+  def since(self, since, generation):
+    """Returns {entry id: "added", "updated" or "removed"} for the net changes after generation since,
+    up to generation."""
+    first, last = {}, {}
+    for logged, changes in list(self._log): # Copied, as a refresh may be appending
+      if since < logged <= generation:
+        for entry_id, change in changes.items():
+          first.setdefault(entry_id, change)
+          last[entry_id] = change
+    net = {}
+    for entry_id, change in first.items():
+      existed, exists = change != "added", last[entry_id] != "removed"
+      if existed or exists:
+        net[entry_id] = "updated" if existed and exists else "removed" if existed else "added"
+    return net
+
+
+class FeedStatus():
+  """The outcome of the feed refreshes so far, reported by the readiness check."""
+
+  def __init__(self):
+    self.last_success = None # datetime of the last refresh that fetched at least one feed
+    self.last_attempt = None
+    self.last_error = None
+    self.last_duration = None # Seconds taken by the last refresh
+    self.failures = 0 # Failed refreshes since the last success
+    self.feed_errors = 0 # Feeds that could not be fetched or parsed, over all refreshes
+
+  def succeeded(self, duration, feed_errors=0):
+    self.last_success = self.last_attempt = datetime.now(timezone.utc)
+    self.last_duration = duration
+    self.failures = 0
+    self.feed_errors += feed_errors
+
+  def failed(self, duration, error):
+    self.last_attempt = datetime.now(timezone.utc)
+    self.last_duration = duration
+    self.last_error = f"{type(error).__name__}: {error}"
+    self.failures += 1
+
+
+class EventSnapshot(list):
+  """The list of EventEntry objects built from one feed generation.
+
+  The generation only advances when the parsed content changes, and `derived` holds
+  per-snapshot artifacts (e.g. serialized responses) that are thrown away with it."""
+
+  def __init__(self, events=(), generation=0, keys=None, updated_at=None, ordered=None):
+    super().__init__(events)
+    self.generation = generation
+    self.keys = keys if keys is not None else [] # (entry id, fingerprint) pairs in feed order
+    self.ordered = ordered if ordered is not None else SortedEvents(self) # The same events in chronological order
+    self.updated_at = updated_at if updated_at is not None else datetime.now(timezone.utc).replace(microsecond=0)
+    self.derived = {}
+
+
+_cache = ParsedEntryCache()
+_lock = threading.Lock() # Serializes snapshot builds; serving a built snapshot never takes it
+_events = None # The parsed snapshot served to requests until the next one is swapped in
+_previous = None # The last snapshot built, reused when a feed update changed nothing
+_ordered = SortedEvents() # Chronological order of the last snapshot, updated in place on each build
+_store = ParsedEventStore(PARSED_DB) if PARSED_DB else None
+_warm = _store is None # Whether the parsed events persisted by an earlier run are in _cache
+_changes = ChangeLog()
+_search = None # Full-text index of the last snapshot, built on the first search and then updated in place on each build
+status = FeedStatus()
+_refreshing = threading.Lock() # Held while the feeds are fetched, so only one refresh runs at a time
+_fresh_until = None # time.monotonic() after which requests start a background refresh
+_warming = threading.Lock() # Held while a background thread builds the first snapshot
+_flights = SingleFlight() # Coalesces concurrent snapshot rebuilds and builds of per-generation artifacts
+_shared = None # SharedSnapshot this process publishes its snapshots to when it leads, or loads them from
+
+
+metrics.collector("macevents_parse_cache_total", "counter", "Parsed entry cache lookups, by whether the entry was cached.",
+                  lambda: [({"result": "hit"}, _cache.hits), ({"result": "miss"}, _cache.misses)])
+metrics.collector("macevents_parse_cache_entries", "gauge", "Parsed entries held in memory.", lambda: [({}, len(_cache))])
+metrics.collector("macevents_snapshot_generation", "gauge", "Generation of the events snapshot being served.",
+                  lambda: [({}, _events.generation)] if _events is not None else [])
+metrics.collector("macevents_snapshot_events", "gauge", "Events in the snapshot being served.",
+                  lambda: [({}, len(_events))] if _events is not None else [])
+
+
+def entry_fingerprint(entry):
+  """Returns a digest of the entry fields that EventEntry parses, used to detect changed entries."""
+  content = repr((entry.title, entry.link, entry.summary))
+  return hashlib.blake2b(content.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+
+def derived(events, name, build):
+  """Returns the artifact called name for an events snapshot, calling build() at most once per feed generation.
+  Plain lists (e.g. in tests) have no per-generation storage, so build() runs on every call."""
+  store = getattr(events, "derived", None)
+  if store is None:
+    return build()
+  value = store.get(name)
+  if value is not None:
+    DERIVED.inc("hit")
+    return value
+  built = []
+
+  def build_once():
+    value = store.get(name) # A call that finished just before this one started may have built it
+    if value is None:
+      DERIVED.inc("miss")
+      value = store.setdefault(name, build())
+      built.append(True)
+    return value
+  value = _flights.run(("derived", id(store), name), build_once) # Requests for a new generation build it once
+  if not built:
+    DERIVED.inc("coalesced")
+  return value
+
+def change_token(events):
+  """Returns the token a client passes back to changes_since() to get what changed after events."""
+  return _changes.token(getattr(events, "generation", 0))
+
+def changes_since(events, token):
+  """Returns (generation named by token, {entry id: "added", "updated" or "removed"}) for the changes
+  between token and events, or None when token cannot be answered and the client needs a full resync."""
+  changes = _changes
+  generation = getattr(events, "generation", 0)
+  since = changes.parse(token, generation)
+  if since is None:
+    return None
+  return since, changes.since(since, generation)
+
+def invalidate():
+  """Marks the parsed snapshot as stale so the next get_events() picks up changed entries."""
+  global _events
+  with _lock:
+    _events = None
+
+def clear_cache():
+  """Drops every parsed entry held in memory, as on a fresh start: the next get_events()
+  reloads the persisted parsed events and parses everything else again."""
+  global _events, _previous, _ordered, _warm, _changes, _search
+  with _lock:
+    _events = None
+    _previous = None
+    _ordered = SortedEvents()
+    _search = None
+    _changes = ChangeLog() # Generations start over, so earlier tokens must not match
+    _warm = _store is None
+    _cache.clear()
+
+def use_store(store):
+  """Persists parsed events to store (a ParsedEventStore, or None for no persistence) from now on."""
+  global _store
+  with _lock:
+    _store = store
+  clear_cache()
+
+def use_shared(shared):
+  """Shares snapshots with the other workers of the host through shared (a SharedSnapshot, or None).
+  Only the leading process fetches and parses; the others load each generation it publishes."""
+  global _shared
+  with _lock:
+    _shared = shared
+
+def _publish(events):
+  if _shared is not None and _shared.leader:
+    _shared.publish_async(events, _changes.epoch, status.last_success)
+
 def add_feed():
-  reader.add_feed(feed_url, exist_ok=True) # Adding Mac RSS feed to feed reader, allowing duplicates and allowing updates
-  reader.update_feed(feed_url)
-  reader.enable_feed_updates(feed_url)
+  """Registers the Mac RSS feed and the feeds listed in MACEVENTS_FEEDS without fetching them;
+  fetching is left to refresh(). Feeds the reader stored earlier that are no longer listed are deleted."""
+  feeds.clear()
+  register_feed(feed_url)
+  for extra in parse_feed_list(os.environ.get("MACEVENTS_FEEDS", "")):
+    register_feed(extra.url, extra.timeout)
+  for stored in list(reader.get_feeds()):
+    if stored.url not in feeds:
+      reader.delete_feed(stored.url, missing_ok=True)
 
-def get_events():
-  event_entries = []
+def register_feed(url, timeout=DEFAULT_TIMEOUT):
+  """Adds the feed at url to the merged events, fetched with its own (connect, read) timeout in seconds."""
+  feeds.register(url, timeout)
+  feeds.install(reader)
+  reader.add_feed(url, exist_ok=True) # Adding the feed to feed reader, allowing duplicates and allowing updates
+  reader.enable_feed_updates(url)
+
+def refresh():
+  """Fetches every registered feed, FETCH_WORKERS at a time, and swaps in a snapshot with the changed entries.
+  Requests keep getting the previous snapshot until the new one is complete. A feed that cannot be
+  fetched is logged and keeps its stored entries; when every feed fails, the first error is raised."""
+  with _refreshing:
+    return _refresh()
+
+def revalidate():
+  """Starts a refresh on a background thread unless one is already running, and returns right away.
+  Returns whether a refresh was started."""
+  global _fresh_until
+  if not _refreshing.acquire(blocking=False):
+    return False
+  _fresh_until = time.monotonic() + REVALIDATE_RETRY # Until this one finishes, other requests need not start one
+
+  def run():
+    try:
+      _refresh()
+    except Exception:
+      logger.exception("Background feed refresh failed; still serving the last snapshot")
+    finally:
+      _refreshing.release()
+  threading.Thread(target=run, name="feed-revalidate", daemon=True).start()
+  return True
+
+def _refresh():
+  global _fresh_until
+  started = time.monotonic()
+  with REFRESH_SECONDS.time():
+    try:
+      errors = []
+      updated = 0
+      for result in reader.update_feeds_iter(workers=FETCH_WORKERS):
+        updated += 1
+        if isinstance(result.value, Exception):
+          logger.warning("Could not update %s: %s", result.url, result.value)
+          FEED_ERRORS.inc(result.url)
+          errors.append(result.value)
+      if errors and len(errors) == updated:
+        raise errors[0]
+      events = rebuild()
+    except Exception as error:
+      REFRESHES.inc("failure")
+      status.failed(time.monotonic() - started, error)
+      _fresh_until = time.monotonic() + REVALIDATE_RETRY if STALE_AFTER is not None else None
+      raise
+  REFRESHES.inc("success" if not errors else "partial")
+  status.succeeded(time.monotonic() - started, len(errors))
+  _publish(events)
+  _fresh_until = time.monotonic() + STALE_AFTER if STALE_AFTER is not None else None
+  return events
+
+def rebuild():
+  """Builds a snapshot from the entries stored by the reader and atomically makes it current."""
+  global _events
+  with _lock:
+    _events = _build_snapshot()
+    return _events
+
+def _parse_context():
+  context = multiprocessing.get_context(PARSE_START_METHOD)
+  if PARSE_START_METHOD == "forkserver":
+    # By default the fork server imports __main__ first, e.g. all of app.py with its feed setup and
+    # refresher thread, and forks every worker from that process; the workers only need the parser
+    context.set_forkserver_preload(["event_entry"])
+  return context
+
+def parse_entries(entries, workers=None, chunk_size=None):
+  """Parses (id, title, link, summary) tuples into EventEntry objects, in the same order.
+
+  Batches of at least PARALLEL_MIN_ENTRIES are split into chunks and parsed by a pool of
+  `workers` processes (PARSE_WORKERS by default), which send back compact field tuples.
+  Smaller batches, or workers=1, are parsed serially in this process."""
+  entries = list(entries)
+  workers = workers if workers is not None else PARSE_WORKERS
+  if workers <= 1 or len(entries) < PARALLEL_MIN_ENTRIES:
+    return [EventEntry(*entry) for entry in entries]
+
+  chunk_size = chunk_size or math.ceil(len(entries) / (workers * 4)) # A few chunks per worker evens out the load
+  chunks = [entries[start:start + chunk_size] for start in range(0, len(entries), chunk_size)]
+  with ProcessPoolExecutor(max_workers=workers, mp_context=_parse_context()) as pool:
+    return [EventEntry.from_parsed(*row) for rows in pool.map(parse_rows, chunks) for row in rows]
+
+def merged_entries():
+  """Returns the stored entries of every feed, one per entry id: an event listed by several
+  calendars is taken from the feed registered first."""
+  chosen = {}
   for entry in reader.get_entries():
-    event_entries.append(EventEntry(entry.id, entry.title, entry.link, entry.summary)) # Collecting all entries from Mac RSS and transforming them into our EventEntry objects
-  return event_entries
\ No newline at end of file
+    rank = feeds.rank(getattr(entry, "feed_url", None))
+    current = chosen.get(entry.id)
+    if current is None or rank < current[0]:
+      chosen[entry.id] = (rank, entry)
+  return [entry for _, entry in chosen.values()]
+
+def _load_store():
+  global _warm
+  _warm = True
+  try:
+    for entry_id, fingerprint, event in _store.load():
+      _cache.put(entry_id, fingerprint, event)
+  except sqlite3.Error:
+    logger.warning("Could not load parsed events from %s", _store.path, exc_info=True)
+
+def _save_store(parsed, entry_ids):
+  try:
+    _store.sync(parsed, entry_ids)
+  except sqlite3.Error:
+    logger.warning("Could not save parsed events to %s", _store.path, exc_info=True)
+
+def _build_snapshot():
+  global _previous
+  if not _warm:
+    with STAGE_SECONDS.time("load"):
+      _load_store() # One query instead of parsing every entry again after a restart
+  with STAGE_SECONDS.time("read"):
+    entries = merged_entries()
+
+  event_entries = []
+  keys = []
+  missing = [] # (position, fingerprint, entry fields) of the entries that need parsing
+  with STAGE_SECONDS.time("match"):
+    for entry in entries:
+      fingerprint = entry_fingerprint(entry)
+      event = _cache.get(entry.id, fingerprint)
+      if event is None:
+        missing.append((len(event_entries), fingerprint, (entry.id, entry.title, entry.link, entry.summary)))
+      event_entries.append(event)
+      keys.append((entry.id, fingerprint))
+
+  parsed = []
+  with STAGE_SECONDS.time("parse"):
+    # Collecting all changed entries from Mac RSS and transforming them into our EventEntry objects
+    for (position, fingerprint, fields), event in zip(missing, parse_entries(fields for _, _, fields in missing)):
+      event_entries[position] = event
+      _cache.put(fields[0], fingerprint, event)
+      parsed.append((fields[0], fingerprint, event))
+  entry_ids = {entry_id for entry_id, _ in keys}
+  _retain(entry_ids)
+  if _store is not None:
+    with STAGE_SECONDS.time("persist"):
+      _save_store(parsed, entry_ids)
+
+  if _previous is None or _previous.keys != keys:
+    with STAGE_SECONDS.time("order"):
+      _reorder(event_entries)
+      generation = _previous.generation + 1 if _previous is not None else 1
+      _changes.record(generation, _previous.keys if _previous is not None else None, keys)
+      _previous = EventSnapshot(event_entries, generation, keys, ordered=_ordered.copy())
+  return _previous # Same content as before keeps the generation and its derived responses valid
+
+def _retain(entry_ids):
+  """Forgets the parsed entries, titles and descriptions of everything that left the feed or changed."""
+  _cache.retain(entry_ids)
+  compact.retain_texts(_cache.texts())
+
+def _load_image(image):
+  """Makes the generation in a SnapshotImage current, reusing the entries this worker already holds
+  and installing the image's payloads, which stay mapped instead of being serialized again."""
+  global _previous, _changes
+  previous_keys = _previous.keys if _previous is not None else None
+  if _changes.epoch != image.epoch:
+    _changes = ChangeLog(epoch=image.epoch) # Tokens are the leader's, valid on every worker
+    previous_keys = None
+  event_entries = []
+  with STAGE_SECONDS.time("load"):
+    for (entry_id, fingerprint), row in zip(image.keys, image.rows()):
+      event = _cache.get(entry_id, fingerprint)
+      if event is None:
+        event = EventEntry.from_parsed(*row)
+        _cache.put(entry_id, fingerprint, event)
+      event_entries.append(event)
+  _retain({entry_id for entry_id, _ in image.keys})
+  with STAGE_SECONDS.time("order"):
+    _reorder(event_entries)
+  _changes.record(image.generation, previous_keys, image.keys)
+  _previous = EventSnapshot(event_entries, image.generation, image.keys, image.updated_at, _ordered.copy())
+  _previous.derived["image"] = image
+  for name in image.payload_names:
+    _previous.derived[name] = image.payload(name)
+  if image.refreshed_at is not None:
+    status.last_success = image.refreshed_at
+  return _previous
+
+def _follow(events):
+  """get_events() of a worker that follows the shared snapshot file: loads a newer generation when
+  one was published, takes over refreshing when the leader is gone, and only builds a snapshot itself
+  before any file was published."""
+  global _events
+  if events is not None and not _shared.due():
+    return events
+  with _lock:
+    if not _shared.lead():
+      image = _shared.read()
+      if image is not None and (_events is None or (image.epoch, image.generation) !=
+                                (_changes.epoch, _events.generation)):
+        _events = _load_image(image)
+      if _events is not None:
+        return _events
+    if _events is None:
+      _events = _build_snapshot()
+      _publish(_events)
+    return _events
+
+def _reorder(event_entries):
+  """Brings _ordered and the search index up to date with event_entries by removing and
+  inserting only the entries that changed."""
+  current = {id(event) for event in event_entries}
+  previous = {id(event) for event in _ordered}
+  removed = [event for event in _ordered if id(event) not in current]
+  added = []
+  for event in event_entries:
+    if id(event) not in previous:
+      added.append(event)
+      previous.add(id(event))
+  for event in removed:
+    _ordered.remove(event)
+  for event in added:
+    _ordered.add(event)
+  if _search is not None:
+    _search.update(removed, added)
+
+def search_index(events):
+  """Returns the full-text SearchIndex for an events snapshot.
+
+  The index of the latest snapshot is built on the first search and then kept up to date as
+  snapshots are built, re-indexing only the entries that changed. Plain lists (e.g. in tests)
+  get an index of their own on every call."""
+  global _search
+  if getattr(events, "generation", None) is None:
+    return SearchIndex(events)
+  index = _search
+  if index is None:
+    with _lock:
+      if _search is None:
+        with STAGE_SECONDS.time("index"):
+          _search = SearchIndex(_previous if _previous is not None else events)
+      index = _search
+  return index
+
+def current():
+  """Returns the snapshot being served, or None if none was built yet. Never builds or blocks."""
+  return _events
+
+def warm_up():
+  """Builds the first snapshot from the stored entries on a background thread, if none was built yet."""
+  if _events is not None or not _warming.acquire(blocking=False):
+    return
+
+  def run():
+    try:
+      get_events()
+    except Exception:
+      logger.exception("Could not build the events snapshot")
+    finally:
+      _warming.release()
+  threading.Thread(target=run, name="feed-warm-up", daemon=True).start()
+
+def get_events():
+  global _events
+  events = _events
+  if _shared is not None and not _shared.leader:
+    return _follow(events)
+  if events is not None:
+    if _fresh_until is not None and time.monotonic() > _fresh_until:
+      revalidate() # Stale: this request still gets the last snapshot
+    return events # Nothing changed since the last feed update
+  return _flights.run("snapshot", _rebuild_current) # Concurrent callers wait for the one rebuild
+
+def _rebuild_current():
+  global _events
+  with _lock:
+    if _events is None: # A refresh may have swapped one in while this waited
+      _events = _build_snapshot()
+      _publish(_events)
+    return _events
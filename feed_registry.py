@@ -0,0 +1,83 @@
+import threading
+from collections import namedtuple
+from requests.adapters import HTTPAdapter
+
+DEFAULT_TIMEOUT = (3.05, 60) # (connect, read) seconds, the reader library's own default
+
+Feed = namedtuple("Feed", ["url", "timeout"])
+
+
+def parse_feed_list(text):
+  """Returns Feeds for a comma-separated list of "url" or "url seconds" items, e.g. the MACEVENTS_FEEDS setting."""
+  found = []
+  for item in text.split(","):
+    parts = item.split()
+    if not parts:
+      continue
+    timeout = float(parts[1]) if len(parts) > 1 else DEFAULT_TIMEOUT
+    found.append(Feed(parts[0], timeout))
+  return found
+
+
+class FeedTimeoutAdapter(HTTPAdapter):
+  """An HTTP adapter that sends each request with the timeout of the feed it fetches."""
+
+  def __init__(self, registry, *args, **kwargs):
+    self.registry = registry
+    super().__init__(*args, **kwargs)
+
+  def send(self, request, **kwargs):
+    kwargs["timeout"] = self.registry.timeout_for(request.url)
+    return super().send(request, **kwargs)
+
+
+class FeedRegistry():
+  """The feeds whose entries are merged into the events list, in priority order.
+
+  When the same entry appears in several feeds, the feed registered first wins. Each feed has
+  its own timeout, applied by a request hook installed on the reader (see install())."""
+
+  def __init__(self):
+    self._feeds = {}
+    self._rank = {} # Feed URL -> registration order
+    self._lock = threading.Lock()
+
+  def __len__(self):
+    return len(self._feeds)
+
+  def __iter__(self):
+    return iter(list(self._feeds.values()))
+
+  def __contains__(self, url):
+    return url in self._feeds
+
+  def register(self, url, timeout=DEFAULT_TIMEOUT):
+    with self._lock:
+      self._feeds[url] = Feed(url, timeout)
+      self._rank = {url: rank for rank, url in enumerate(self._feeds)}
+
+  def clear(self):
+    with self._lock:
+      self._feeds = {}
+      self._rank = {}
+
+  def rank(self, url):
+    """Returns the priority of the feed at url (lower wins), with unregistered feeds last."""
+    return self._rank.get(url, len(self._rank))
+
+  def timeout_for(self, url):
+    feed = self._feeds.get(url)
+    return feed.timeout if feed is not None else DEFAULT_TIMEOUT
+
+  def install(self, reader):
+    """Makes reader fetch every registered feed with that feed's timeout."""
+    hooks = reader._parser.session_factory.request_hooks
+    if not any(getattr(hook, "__self__", None) is self for hook in hooks):
+      hooks.append(self._request_hook)
+
+  def _request_hook(self, session, request, **kwargs):
+    # The adapters are replaced rather than mounted, so threads sharing the session can keep reading them
+    for prefix in ("https://", "http://"):
+      if not isinstance(session.adapters.get(prefix), FeedTimeoutAdapter):
+        session.adapters[prefix] = FeedTimeoutAdapter(self)
+    return None
@@ -0,0 +1,142 @@
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from event_store import SortedEvents
+from event_times import parse_event_date
+from metrics import STAGE_SECONDS
+import payloads
+
+CALENDAR_MIMETYPE = "text/calendar"
+CALENDAR_NAME = "Macalester Events"
+TIMEZONE_ID = "America/Chicago" # Feed dates and times are campus local time
+MAX_LINE_OCTETS = 75 # RFC 5545 folds longer content lines
+
+# The campus time zone's rules since 2007, so clients resolve TZID without a time zone database
+VTIMEZONE = (
+  "BEGIN:VTIMEZONE", f"TZID:{TIMEZONE_ID}",
+  "BEGIN:DAYLIGHT", "TZOFFSETFROM:-0600", "TZOFFSETTO:-0500", "TZNAME:CDT",
+  "DTSTART:20070311T020000", "RRULE:FREQ=YEARLY;BYMONTH=3;BYDAY=2SU", "END:DAYLIGHT",
+  "BEGIN:STANDARD", "TZOFFSETFROM:-0500", "TZOFFSETTO:-0600", "TZNAME:CST",
+  "DTSTART:20071104T020000", "RRULE:FREQ=YEARLY;BYMONTH=11;BYDAY=1SU", "END:STANDARD",
+  "END:VTIMEZONE",
+)
+
+
+def escape_text(value):
+  """Escapes value for an iCalendar TEXT property."""
+  return (str(value).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+          .replace("\r\n", "\\n").replace("\n", "\\n").replace("\r", "\\n"))
+
+def fold(line):
+  """Returns line as one or more CRLF-terminated content lines of at most 75 octets."""
+  encoded = line.encode("utf-8")
+  if len(encoded) <= MAX_LINE_OCTETS:
+    return line + "\r\n"
+  parts = []
+  start = 0
+  limit = MAX_LINE_OCTETS
+  while start < len(encoded):
+    end = min(start + limit, len(encoded))
+    while end < len(encoded) and (encoded[end] & 0xC0) == 0x80: # Never split a UTF-8 sequence
+      end -= 1
+    parts.append(encoded[start:end].decode("utf-8"))
+    start = end
+    limit = MAX_LINE_OCTETS - 1 # Continuation lines start with a space
+  return "\r\n ".join(parts) + "\r\n"
+
+def _local_time(day, time_24):
+  hours, _, minutes = time_24.partition(":")
+  return datetime(day.year, day.month, day.day, int(hours), int(minutes))
+
+def format_event(event, stamp):
+  """Returns the VEVENT for event as folded content lines, or None when its date cannot be parsed.
+  Events without a start time are all-day events."""
+  day = parse_event_date(event.date)
+  if day is None:
+    return None
+  lines = ["BEGIN:VEVENT", f"UID:{escape_text(event.id)}@macevents", f"DTSTAMP:{stamp}"]
+  if event.start_time:
+    start = _local_time(day, event.start_time)
+    lines.append(f"DTSTART;TZID={TIMEZONE_ID}:{start:%Y%m%dT%H%M%S}")
+    if event.end_time:
+      end = _local_time(day, event.end_time)
+      if end < start: # Ends after midnight
+        end += timedelta(days=1)
+      lines.append(f"DTEND;TZID={TIMEZONE_ID}:{end:%Y%m%dT%H%M%S}")
+  else:
+    lines.append(f"DTSTART;VALUE=DATE:{day:%Y%m%d}")
+    lines.append(f"DTEND;VALUE=DATE:{day + timedelta(days=1):%Y%m%d}")
+  lines.append(f"SUMMARY:{escape_text(event.title)}")
+  if event.location:
+    lines.append(f"LOCATION:{escape_text(event.location)}")
+  if event.coord:
+    lines.append(f"GEO:{event.coord[0]};{event.coord[1]}")
+  if event.desc:
+    lines.append(f"DESCRIPTION:{escape_text(event.desc)}")
+  if event.link and event.link.startswith(("http://", "https://")):
+    lines.append(f"URL:{event.link}")
+  lines.append("END:VEVENT")
+  return "".join(fold(line) for line in lines)
+
+
+class CalendarFeed():
+  """The iCalendar export of one events snapshot, partitioned by building and by day.
+
+  Every event is formatted once, when the feed is built. A calendar for one building, one day
+  or both joins the already formatted events of that partition, and is then kept as a payload
+  with its own ETag until the next feed generation replaces the whole CalendarFeed."""
+
+  def __init__(self, events, resolver, updated_at=None):
+    updated_at = updated_at or datetime.now(timezone.utc)
+    stamp = f"{updated_at.astimezone(timezone.utc):%Y%m%dT%H%M%SZ}"
+    ordered = getattr(events, "ordered", None) # Snapshots come already sorted
+    if ordered is None:
+      ordered = SortedEvents(events)
+    self.last_modified = updated_at
+    self.events = [] # (building name or None, day, VEVENT text), in chronological order
+    self.by_building = defaultdict(list)
+    self.by_day = defaultdict(list)
+    with STAGE_SECONDS.time("ical"):
+      for event in ordered.events:
+        vevent = format_event(event, stamp)
+        if vevent is None:
+          continue
+        building = resolver.resolve(event.location)
+        entry = (building.name if building is not None else None, parse_event_date(event.date), vevent)
+        self.events.append(entry)
+        if entry[0] is not None:
+          self.by_building[entry[0]].append(entry)
+        self.by_day[entry[1]].append(entry)
+    self._payloads = {}
+    self._lock = threading.Lock()
+
+  def payload(self, building=None, day=None):
+    """Returns the calendar Payload of the events in the building named building (a canonical
+    Building name) on day (a date), either of which may be None for all of them."""
+    key = (building, day)
+    payload = self._payloads.get(key)
+    if payload is not None:
+      return payload
+    if building is not None:
+      entries = self.by_building.get(building, [])
+      if day is not None:
+        entries = [entry for entry in entries if entry[1] == day]
+    elif day is not None:
+      entries = self.by_day.get(day, [])
+    else:
+      entries = self.events
+    if not entries:
+      key = "empty" # Keeps requests for arbitrary days from growing the cache
+      payload = self._payloads.get(key)
+      if payload is not None:
+        return payload
+    payload = payloads.Payload(self._render(entries).encode("utf-8"), CALENDAR_MIMETYPE, self.last_modified)
+    with self._lock:
+      return self._payloads.setdefault(key, payload)
+
+  @staticmethod
+  def _render(entries):
+    header = ("BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//Macalester College//MacEvents//EN",
+              "CALSCALE:GREGORIAN", "METHOD:PUBLISH", f"X-WR-CALNAME:{CALENDAR_NAME}",
+              f"X-WR-TIMEZONE:{TIMEZONE_ID}") + VTIMEZONE
+    return "".join(fold(line) for line in header) + "".join(entry[2] for entry in entries) + "END:VCALENDAR\r\n"
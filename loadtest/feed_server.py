@@ -0,0 +1,141 @@
+"""A local HTTP server that stands in for the Macalester events RSS feed.
+
+Run from the repository root:
+  python -m loadtest.feed_server [--entries 500] [--paragraphs 3] [--update-interval 60] [--port 8001]
+
+The feed holds --entries synthetic events shaped like the Mac feed, whose summaries have
+--paragraphs paragraphs each. Every --update-interval seconds --update-fraction of them change,
+so refreshes parse a realistic share of entries. Unchanged feeds are answered 304 Not Modified
+to clients that send the feed's ETag back, as the reader library does."""
+import argparse
+import hashlib
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import escape
+
+from benchmarks import synthetic
+
+FEED_PATH = "/eventscalendar/events/rss/"
+
+
+def render_feed(entries):
+  """Returns the RSS 2.0 document for (id, title, link, summary) tuples, as bytes."""
+  items = "".join(
+    f"<item><title>{escape(title)}</title><link>{escape(link)}</link><guid>{escape(entry_id)}</guid>"
+    f"<description><![CDATA[{summary}]]></description></item>"
+    for entry_id, title, link, summary in entries)
+  return ('<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+          "<title>Macalester College Events</title><link>https://webapps.macalester.edu/eventscalendar/</link>"
+          "<description>Local stand-in for the Macalester events RSS feed, used by the load test.</description>"
+          f"{items}</channel></rss>").encode("utf-8")
+
+
+class SyntheticFeed():
+  """The current version of a synthetic feed, changing --update-fraction of its entries on every update."""
+
+  def __init__(self, entries=500, paragraphs=3, update_interval=60, update_fraction=0.05, seed=494):
+    self.update_interval = update_interval
+    self.update_fraction = update_fraction
+    self.version = 0
+    self.requests = 0
+    self._entries = synthetic.entries(entries, seed=seed, paragraphs=paragraphs)
+    self._rng = random.Random(seed)
+    self._started = time.monotonic()
+    self._lock = threading.Lock()
+    self._render()
+
+  def _render(self):
+    self.body = render_feed(self._entries)
+    self.etag = '"' + hashlib.blake2b(self.body, digest_size=16).hexdigest() + '"'
+
+  def update(self):
+    """Changes the summaries of update_fraction of the entries, as a new version of the feed."""
+    with self._lock:
+      self._update()
+
+  def _update(self):
+    self.version += 1
+    changed = max(1, round(len(self._entries) * self.update_fraction)) if self._entries else 0
+    for position in self._rng.sample(range(len(self._entries)), changed):
+      entry_id, title, link, summary = self._entries[position]
+      self._entries[position] = (entry_id, title, link, f"{summary}<p>Updated in version {self.version}.</p>")
+    self._render()
+
+  def current(self):
+    """Returns (body, ETag) of the feed, updating it first when update_interval has passed."""
+    with self._lock:
+      if self.update_interval > 0:
+        due = int((time.monotonic() - self._started) // self.update_interval)
+        while self.version < due:
+          self._update()
+      self.requests += 1
+      return self.body, self.etag
+
+
+class FeedServer():
+  """Serves a SyntheticFeed over HTTP on a background thread. Port 0 picks a free port."""
+
+  def __init__(self, feed, host="127.0.0.1", port=0):
+    self.feed = feed
+
+    class Handler(BaseHTTPRequestHandler):
+      def do_GET(self):
+        if self.path.split("?")[0] != FEED_PATH:
+          self.send_error(404)
+          return
+        body, etag = feed.current()
+        if self.headers.get("If-None-Match") == etag:
+          self.send_response(304)
+          self.send_header("ETag", etag)
+          self.end_headers()
+          return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/rss+xml; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+      def log_message(self, format, *args):
+        pass # One line per fetch would drown out the load test's own output
+
+    self._server = ThreadingHTTPServer((host, port), Handler)
+    self._thread = None
+
+  @property
+  def url(self):
+    host, port = self._server.server_address[:2]
+    return f"http://{host}:{port}{FEED_PATH}"
+
+  def start(self):
+    self._thread = threading.Thread(target=self._server.serve_forever, name="feed-server", daemon=True)
+    self._thread.start()
+    return self
+
+  def stop(self):
+    self._server.shutdown()
+    self._server.server_close()
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--entries", type=int, default=500)
+  parser.add_argument("--paragraphs", type=int, default=3, help="paragraphs per summary")
+  parser.add_argument("--update-interval", type=float, default=60, help="seconds between feed updates, 0 for none")
+  parser.add_argument("--update-fraction", type=float, default=0.05, help="share of the entries changed per update")
+  parser.add_argument("--port", type=int, default=8001)
+  args = parser.parse_args(argv)
+
+  feed = SyntheticFeed(args.entries, args.paragraphs, args.update_interval, args.update_fraction)
+  server = FeedServer(feed, port=args.port).start()
+  print(f"Serving {args.entries} synthetic entries at {server.url}", flush=True)
+  try:
+    while True:
+      time.sleep(3600)
+  except KeyboardInterrupt:
+    server.stop()
+
+if __name__ == "__main__":
+  main()
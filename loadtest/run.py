@@ -0,0 +1,260 @@
+"""Load-tests the whole service under Gunicorn against a local stand-in for the RSS feed, and
+reports throughput, latency percentiles and worker memory as JSON.
+
+Run from the repository root (needs `pip install gunicorn`, and Linux for the memory figures):
+  python -m loadtest.run [--workers 4] [--clients 16] [--duration 30] [--entries 500]
+                         [--refresh-interval 30] [--update-interval 20] [--output loadtest.json]
+
+The app runs in a temporary directory with its own db.sqlite, parsed.sqlite and snapshot file, and
+fetches the feed from loadtest.feed_server. Once every event is being served, --clients threads
+request ROUTES for --duration seconds, each over its own connection, while the feed keeps changing
+every --update-interval seconds and the app refreshes every --refresh-interval seconds."""
+import argparse
+import http.client
+import json
+import math
+import os
+import platform
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from loadtest.feed_server import FeedServer, SyntheticFeed
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Requests each client sends in turn: /events most often, as the app polls it
+ROUTES = ["/events", "/events", "/events", "/events", "/health", "/health/ready", "/", "/coord", "/times", "/events"]
+HEADERS = {"Accept-Encoding": "gzip"}
+READY_TIMEOUT = 120 # Seconds to wait for the server to serve every event
+
+
+def commit():
+  """Returns the short hash of the checked-out commit. Not taken from benchmarks.run, which imports the app."""
+  try:
+    return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                          cwd=ROOT).stdout.strip()
+  except (OSError, subprocess.CalledProcessError):
+    return None
+
+def free_port():
+  with socket.socket() as probe:
+    probe.bind(("127.0.0.1", 0))
+    return probe.getsockname()[1]
+
+def percentile(ordered, fraction):
+  """Returns the nearest-rank percentile of an ascending list, or None when it is empty."""
+  if not ordered:
+    return None
+  return ordered[min(len(ordered), max(1, math.ceil(fraction * len(ordered)))) - 1]
+
+def summarize(latencies, errors, seconds):
+  ordered = sorted(latencies)
+  return {
+    "requests": len(ordered),
+    "errors": errors,
+    "requests_per_second": round(len(ordered) / seconds, 1),
+    **{f"p{round(fraction * 100)}_ms": round(percentile(ordered, fraction) * 1000, 2) if ordered else None
+       for fraction in (0.5, 0.95, 0.99)},
+    "max_ms": round(ordered[-1] * 1000, 2) if ordered else None,
+  }
+
+def rss_mb(pid):
+  """Returns the resident memory of a process in MiB, read from /proc (Linux only), or None."""
+  try:
+    with open(f"/proc/{pid}/status") as status:
+      for line in status:
+        if line.startswith("VmRSS:"):
+          return round(int(line.split()[1]) / 1024, 1)
+  except OSError:
+    pass
+  return None
+
+def worker_pids(pid):
+  """Returns the pids of the processes Gunicorn's master process pid forked."""
+  try:
+    with open(f"/proc/{pid}/task/{pid}/children") as children:
+      return [int(child) for child in children.read().split()]
+  except OSError:
+    return []
+
+
+class Server():
+  """The app under Gunicorn in a temporary directory, fetching the feed at feed_url."""
+
+  def __init__(self, feed_url, workers, refresh_interval, threads=1):
+    self.port = free_port()
+    self.directory = tempfile.mkdtemp(prefix="macevents-loadtest-")
+    env = dict(os.environ, MACEVENTS_FEED_URL=feed_url, MACEVENTS_FEEDS="",
+               MACEVENTS_REFRESH_INTERVAL=str(refresh_interval),
+               PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    command = [sys.executable, "-m", "gunicorn", "--workers", str(workers), "--threads", str(threads),
+               "--bind", f"127.0.0.1:{self.port}", "--chdir", self.directory, "--log-level", "warning", "app:app"]
+    self.process = subprocess.Popen(command, env=env)
+
+  def get(self, path):
+    connection = http.client.HTTPConnection("127.0.0.1", self.port, timeout=30)
+    try:
+      connection.request("GET", path)
+      response = connection.getresponse()
+      return response.status, response.read()
+    finally:
+      connection.close()
+
+  def wait_until_serving(self, entries, timeout=READY_TIMEOUT):
+    """Waits until /events has every entry of the feed, i.e. the first refresh reached the workers."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+      if self.process.poll() is not None:
+        raise RuntimeError(f"Gunicorn exited with status {self.process.returncode}")
+      try:
+        status, body = self.get("/events")
+        if status == 200 and len(json.loads(body)) >= entries:
+          return
+      except (OSError, http.client.HTTPException, ValueError):
+        pass
+      time.sleep(0.5)
+    raise RuntimeError(f"The server did not serve {entries} events within {timeout} seconds")
+
+  def memory(self):
+    workers = worker_pids(self.process.pid)
+    return {"master_rss_mb": rss_mb(self.process.pid),
+            "workers": [{"pid": pid, "rss_mb": rss_mb(pid)} for pid in workers]}
+
+  def stop(self):
+    self.process.send_signal(signal.SIGTERM)
+    try:
+      self.process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+      self.process.kill()
+    shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def drive(server, clients, duration):
+  """Sends ROUTES from clients threads for duration seconds. Returns ({route: [seconds]}, {route: errors}, peak memory)."""
+  latencies = defaultdict(list)
+  errors = defaultdict(int)
+  lock = threading.Lock()
+  stop = time.monotonic() + duration
+  start = threading.Barrier(clients + 1)
+
+  def client(number):
+    connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=30)
+    timings = defaultdict(list)
+    failures = defaultdict(int)
+    turn = number # Clients start at different routes, so every route is requested from the first moment
+    start.wait()
+    while time.monotonic() < stop:
+      route = ROUTES[turn % len(ROUTES)]
+      turn += 1
+      started = time.perf_counter()
+      try:
+        connection.request("GET", route, headers=HEADERS)
+        response = connection.getresponse()
+        response.read()
+        ok = response.status == 200
+      except (OSError, http.client.HTTPException):
+        connection.close() # Reconnects on the next request
+        ok = False
+      if ok:
+        timings[route].append(time.perf_counter() - started)
+      else:
+        failures[route] += 1
+    connection.close()
+    with lock:
+      for route, values in timings.items():
+        latencies[route].extend(values)
+      for route, count in failures.items():
+        errors[route] += count
+
+  threads = [threading.Thread(target=client, args=(number,), daemon=True) for number in range(clients)]
+  for thread in threads:
+    thread.start()
+  start.wait()
+  peak = {}
+  while time.monotonic() < stop: # Sampling worker memory while the clients run
+    for worker in server.memory()["workers"]:
+      if worker["rss_mb"] is not None:
+        peak[worker["pid"]] = max(peak.get(worker["pid"], 0), worker["rss_mb"])
+    time.sleep(min(1.0, max(0.0, stop - time.monotonic())))
+  for thread in threads:
+    thread.join()
+  return latencies, errors, peak
+
+def run(workers=4, clients=16, duration=30, entries=500, paragraphs=3, refresh_interval=30, update_interval=20,
+        threads=1):
+  feed = SyntheticFeed(entries, paragraphs, update_interval)
+  feed_server = FeedServer(feed).start()
+  server = Server(feed_server.url, workers, refresh_interval, threads)
+  try:
+    server.wait_until_serving(entries)
+    for route in set(ROUTES): # Every worker builds its pages on first use; those first requests are not measured
+      for _ in range(workers * 2):
+        server.get(route)
+    idle = server.memory()
+    started = time.monotonic()
+    latencies, errors, peak = drive(server, clients, duration)
+    elapsed = time.monotonic() - started
+    memory = server.memory()
+  finally:
+    server.stop()
+    feed_server.stop()
+
+  every = [latency for values in latencies.values() for latency in values]
+  return {
+    "commit": commit(),
+    "python": platform.python_version(),
+    "machine": platform.machine(),
+    "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    "config": {"workers": workers, "threads": threads, "clients": clients, "duration": duration, "entries": entries,
+               "paragraphs": paragraphs, "refresh_interval": refresh_interval, "update_interval": update_interval},
+    "total": summarize(every, sum(errors.values()), elapsed),
+    "routes": {route: summarize(latencies[route], errors[route], elapsed) for route in sorted(set(ROUTES))},
+    "memory": {"master_rss_mb": memory["master_rss_mb"],
+               "workers": [{**worker, "idle_rss_mb": next((before["rss_mb"] for before in idle["workers"]
+                                                           if before["pid"] == worker["pid"]), None),
+                            "peak_rss_mb": peak.get(worker["pid"])} for worker in memory["workers"]]},
+    "feed": {"versions": feed.version, "fetches": feed.requests},
+  }
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--workers", type=int, default=4, help="Gunicorn worker processes")
+  parser.add_argument("--threads", type=int, default=1, help="threads per Gunicorn worker")
+  parser.add_argument("--clients", type=int, default=16, help="concurrent client connections")
+  parser.add_argument("--duration", type=float, default=30, help="seconds of load")
+  parser.add_argument("--entries", type=int, default=500, help="entries in the synthetic feed")
+  parser.add_argument("--paragraphs", type=int, default=3, help="paragraphs per entry summary")
+  parser.add_argument("--refresh-interval", type=float, default=30, help="seconds between the app's feed refreshes")
+  parser.add_argument("--update-interval", type=float, default=20, help="seconds between feed changes, 0 for none")
+  parser.add_argument("--output", help="write the report to this JSON file")
+  args = parser.parse_args(argv)
+
+  if shutil.which("gunicorn") is None and subprocess.run([sys.executable, "-m", "gunicorn", "--version"],
+                                                         capture_output=True).returncode != 0:
+    parser.error("gunicorn is not installed; pip install gunicorn")
+  report = run(args.workers, args.clients, args.duration, args.entries, args.paragraphs, args.refresh_interval,
+               args.update_interval, args.threads)
+
+  total = report["total"]
+  print(f"{total['requests']} requests in {args.duration:g}s: {total['requests_per_second']} req/s, "
+        f"p50 {total['p50_ms']} ms, p95 {total['p95_ms']} ms, p99 {total['p99_ms']} ms, {total['errors']} errors")
+  for route, result in report["routes"].items():
+    print(f"  {route:<14} {result['requests_per_second']:>8} req/s  p50 {result['p50_ms']:>8} ms  "
+          f"p95 {result['p95_ms']:>8} ms  p99 {result['p99_ms']:>8} ms  {result['errors']} errors")
+  for worker in report["memory"]["workers"]:
+    print(f"  worker {worker['pid']}: {worker['rss_mb']} MiB RSS (peak {worker['peak_rss_mb']} MiB)")
+  if args.output:
+    with open(args.output, "w") as file:
+      json.dump(report, file, indent=2)
+  return 1 if total["errors"] else 0
+
+if __name__ == "__main__":
+  sys.exit(main())
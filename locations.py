@@ -0,0 +1,153 @@
+import math
+from collections import defaultdict, namedtuple
+from functools import lru_cache
+
+EARTH_RADIUS_METERS = 6371008.8
+MAX_DISTANCE_METERS = math.pi * EARTH_RADIUS_METERS # Half the circumference: no two points are further apart
+GRID_CELL_DEGREES = 0.001 # About 111m of latitude (and ~79m of longitude on campus) per grid cell
+
+Building = namedtuple("Building", ["name", "coord"])
+
+
+def distance_meters(a, b):
+  """Returns the great-circle distance in meters between two [latitude, longitude] points."""
+  lat1, lon1, lat2, lon2 = map(math.radians, (a[0], a[1], b[0], b[1]))
+  h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+  return 2 * EARTH_RADIUS_METERS * math.asin(math.sqrt(h))
+
+
+class LocationResolver():
+  """Matches free-text event locations to campus buildings.
+
+  Built once from a {name or tuple of alias names: [lat, lon]} table such as
+  EventEntry.location_coords. Every alias is lowercased into an Aho-Corasick automaton,
+  so a location is resolved in a single pass over its characters; when several aliases
+  occur in it, the building listed first in the table wins, as it did with the linear scan."""
+
+  def __init__(self, table, memo_size=4096):
+    self.buildings = []
+    self.aliases = {}
+    for key, coord in table.items():
+      names = key if isinstance(key, tuple) else (key,)
+      building = Building(names[0], coord)
+      self.buildings.append(building)
+      for name in names:
+        self.aliases.setdefault(name.lower(), len(self.buildings) - 1)
+    self.by_name = {building.name.lower(): building for building in self.buildings}
+    self._build_automaton()
+    self.resolve = lru_cache(maxsize=memo_size)(self._resolve) # Campus calendars reuse a few location strings
+
+  def _build_automaton(self):
+    self._goto = [{}]
+    self._fail = [0]
+    self._match = [None] # Best (lowest) building index of any alias ending at each node
+
+    for alias, index in self.aliases.items():
+      node = 0
+      for char in alias:
+        child = self._goto[node].get(char)
+        if child is None:
+          child = len(self._goto)
+          self._goto[node][char] = child
+          self._goto.append({})
+          self._fail.append(0)
+          self._match.append(None)
+        node = child
+      if self._match[node] is None or index < self._match[node]:
+        self._match[node] = index
+
+    queue = list(self._goto[0].values())
+    for node in queue: # Breadth-first, so every fail target is finished before it is used
+      for char, child in self._goto[node].items():
+        fallback = self._fail[node]
+        while fallback and char not in self._goto[fallback]:
+          fallback = self._fail[fallback]
+        target = self._goto[fallback].get(char, 0)
+        self._fail[child] = target if target != child else 0
+        inherited = self._match[self._fail[child]]
+        if inherited is not None and (self._match[child] is None or inherited < self._match[child]):
+          self._match[child] = inherited
+        queue.append(child)
+
+  def _resolve(self, location):
+    if not location:
+      return None
+    goto, fail, match = self._goto, self._fail, self._match
+    best = None
+    node = 0
+    for char in location.lower():
+      while node and char not in goto[node]:
+        node = fail[node]
+      node = goto[node].get(char, 0)
+      found = match[node]
+      if found is not None and (best is None or found < best):
+        best = found
+        if best == 0:
+          break
+    return self.buildings[best] if best is not None else None
+
+  def coords(self, location):
+    """Returns the [latitude, longitude] of the building named in location, or None."""
+    building = self.resolve(location)
+    return building.coord if building is not None else None
+
+  def building(self, name):
+    """Returns the Building whose canonical name or alias is name (case-insensitive), or None."""
+    name = name.lower()
+    building = self.by_name.get(name)
+    if building is None and name in self.aliases:
+      building = self.buildings[self.aliases[name]]
+    return building
+
+
+class EventLocator():
+  """Answers "events in building X" and "events within N meters of a point" for a list of events.
+
+  Events are grouped by the building their location resolves to, and the buildings are
+  bucketed into a lat/lon grid, so a radius query only measures distances to the buildings
+  in the grid cells the radius can reach."""
+
+  def __init__(self, events, resolver, cell_degrees=GRID_CELL_DEGREES):
+    self.resolver = resolver
+    self.cell_degrees = cell_degrees
+    self.by_building = defaultdict(list)
+    for event in events:
+      building = resolver.resolve(event.location)
+      if building is not None:
+        self.by_building[building.name].append(event)
+
+    self.grid = defaultdict(list)
+    for name in self.by_building:
+      building = resolver.by_name[name.lower()]
+      self.grid[self._cell(building.coord)].append(building)
+
+  def _cell(self, coord):
+    return (math.floor(coord[0] / self.cell_degrees), math.floor(coord[1] / self.cell_degrees))
+
+  def in_building(self, name):
+    """Returns the events held in the building called name (or one of its aliases)."""
+    building = self.resolver.building(name)
+    return list(self.by_building.get(building.name, [])) if building is not None else []
+
+  def nearby(self, point, radius_meters):
+    """Returns (distance in meters, event) pairs for events within radius_meters of point, closest first."""
+    reach = min(radius_meters, MAX_DISTANCE_METERS) # Larger radii reach no further, and could overflow the cell counts
+    lat_cells = math.ceil(reach / (EARTH_RADIUS_METERS * math.radians(self.cell_degrees)))
+    cos_lat = max(math.cos(math.radians(point[0])), 1e-6)
+    lon_cells = math.ceil(lat_cells / cos_lat)
+    if (2 * lat_cells + 1) * (2 * lon_cells + 1) > len(self.grid):
+      candidates = [building for cell in self.grid.values() for building in cell] # Radius covers more cells than are filled
+    else:
+      center_lat, center_lon = self._cell(point)
+      candidates = [building
+                    for lat_cell in range(center_lat - lat_cells, center_lat + lat_cells + 1)
+                    for lon_cell in range(center_lon - lon_cells, center_lon + lon_cells + 1)
+                    for building in self.grid.get((lat_cell, lon_cell), ())]
+
+    found = []
+    for building in candidates:
+      distance = distance_meters(point, building.coord)
+      if distance <= radius_meters:
+        found.extend((distance, event) for event in self.by_building[building.name])
+    found.sort(key=lambda pair: pair[0])
+    return found
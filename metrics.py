@@ -0,0 +1,175 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# Set MACEVENTS_METRICS=0 to turn every timer and counter into a no-op and hide /metrics
+ENABLED = os.environ.get("MACEVENTS_METRICS", "1").lower() not in ("0", "false", "no")
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_metrics = []
+_collectors = []
+
+
+def _format_labels(names, values, extra=()):
+  pairs = list(zip(names, values)) + list(extra)
+  if not pairs:
+    return ""
+  escaped = (str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for _, value in pairs)
+  return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+def _format_value(value):
+  return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter():
+  """A Prometheus counter, optionally split by label values given positionally in the order of `labels`."""
+
+  type = "counter"
+
+  def __init__(self, name, help, labels=()):
+    self.name = name
+    self.help = help
+    self.labels = tuple(labels)
+    self._values = {}
+    self._lock = threading.Lock()
+
+  def inc(self, *label_values, amount=1):
+    if not ENABLED:
+      return
+    with self._lock:
+      self._values[label_values] = self._values.get(label_values, 0) + amount
+
+  def value(self, *label_values):
+    return self._values.get(label_values, 0)
+
+  def reset(self):
+    with self._lock:
+      self._values = {}
+
+  def samples(self):
+    return [(self.name, _format_labels(self.labels, values), value) for values, value in sorted(self._values.items())]
+
+
+class _Timer():
+  __slots__ = ("histogram", "label_values", "started")
+
+  def __init__(self, histogram, label_values):
+    self.histogram = histogram
+    self.label_values = label_values
+
+  def __enter__(self):
+    self.started = time.perf_counter()
+    return self
+
+  def __exit__(self, *exc_info):
+    self.histogram.observe(time.perf_counter() - self.started, *self.label_values)
+
+
+class _NullTimer():
+  __slots__ = ()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc_info):
+    pass
+
+_NULL_TIMER = _NullTimer()
+
+
+class Histogram():
+  """A Prometheus histogram of durations in seconds (or any other value) with fixed bucket bounds."""
+
+  type = "histogram"
+
+  def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+    self.name = name
+    self.help = help
+    self.labels = tuple(labels)
+    self.buckets = tuple(buckets)
+    self._series = {} # label values -> [count per bucket (the last for +Inf), sum]
+    self._lock = threading.Lock()
+
+  def observe(self, value, *label_values):
+    if not ENABLED:
+      return
+    position = bisect_left(self.buckets, value)
+    with self._lock:
+      series = self._series.get(label_values)
+      if series is None:
+        series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+      series[0][position] += 1
+      series[1] += value
+
+  def time(self, *label_values):
+    """Returns a context manager that observes the seconds spent inside it."""
+    return _Timer(self, label_values) if ENABLED else _NULL_TIMER
+
+  def count(self, *label_values):
+    series = self._series.get(label_values)
+    return sum(series[0]) if series is not None else 0
+
+  def reset(self):
+    with self._lock:
+      self._series = {}
+
+  def samples(self):
+    found = []
+    for values, (counts, total) in sorted(self._series.items()):
+      cumulative = 0
+      for bound, count in zip(self.buckets + ("+Inf",), counts):
+        cumulative += count
+        le = bound if bound == "+Inf" else _format_value(float(bound))
+        found.append((f"{self.name}_bucket", _format_labels(self.labels, values, [("le", le)]), cumulative))
+      found.append((f"{self.name}_sum", _format_labels(self.labels, values), total))
+      found.append((f"{self.name}_count", _format_labels(self.labels, values), cumulative))
+    return found
+
+
+def counter(name, help, labels=()):
+  metric = Counter(name, help, labels)
+  _metrics.append(metric)
+  return metric
+
+def histogram(name, help, labels=(), buckets=DEFAULT_BUCKETS):
+  metric = Histogram(name, help, labels, buckets)
+  _metrics.append(metric)
+  return metric
+
+def collector(name, type, help, collect):
+  """Registers a metric whose samples are read when /metrics is scraped, instead of being updated on the hot path.
+  collect() returns (label dict, value) pairs."""
+  _collectors.append((name, type, help, collect))
+
+def reset():
+  for metric in _metrics:
+    metric.reset()
+
+def render():
+  """Returns every metric in the Prometheus text exposition format."""
+  lines = []
+  for metric in _metrics:
+    lines.append(f"# HELP {metric.name} {metric.help}")
+    lines.append(f"# TYPE {metric.name} {metric.type}")
+    lines.extend(f"{name}{labels} {_format_value(value)}" for name, labels, value in metric.samples())
+  for name, type, help, collect in _collectors:
+    lines.append(f"# HELP {name} {help}")
+    lines.append(f"# TYPE {name} {type}")
+    for labels, value in collect():
+      lines.append(f"{name}{_format_labels(labels.keys(), labels.values())} {_format_value(value)}")
+  return "\n".join(lines) + "\n"
+
+
+# Shared by events_feed, payloads and app
+STAGE_SECONDS = histogram("macevents_stage_seconds",
+                          "Seconds spent in each stage of building and serving the events.", ["stage"])
+REQUEST_SECONDS = histogram("macevents_request_seconds", "Seconds spent handling requests, by endpoint.", ["endpoint"])
+DERIVED = counter("macevents_derived_total",
+                  "Lookups of per-generation artifacts (serialized bodies, indexes), by whether they were cached (hit), "
+                  "built (miss) or waited for a build already running (coalesced).",
+                  ["result"])
+REFRESH_SECONDS = histogram("macevents_refresh_seconds", "Seconds taken by feed refreshes.")
+REFRESHES = counter("macevents_refreshes_total", "Feed refreshes, by outcome.", ["outcome"])
+FEED_ERRORS = counter("macevents_feed_errors_total", "Feeds that could not be updated during a refresh.", ["feed"])
@@ -0,0 +1,65 @@
+import threading
+from flask import get_template_attribute, render_template
+import metrics
+import payloads
+from metrics import STAGE_SECONDS
+
+FRAGMENTS_TEMPLATE = "_fragments.html"
+
+
+class FragmentCache():
+  """HTML fragments rendered once per event and shared by every page that shows them.
+
+  A fragment is one of the macros in templates/_fragments.html rendered for one event.
+  The feed only replaces an EventEntry when its entry changes, so fragments are kept by
+  event identity across feed generations, and retain() drops those of events that left the feed."""
+
+  def __init__(self):
+    self.renders = 0
+    self._fragments = {} # (macro name, id(event)) -> (event, rendered Markup)
+    self._retained = None
+    self._lock = threading.Lock()
+
+  def __len__(self):
+    return len(self._fragments)
+
+  def render(self, name, event):
+    key = (name, id(event))
+    cached = self._fragments.get(key)
+    if cached is None or cached[0] is not event: # An id can be reused once its event is gone
+      cached = (event, get_template_attribute(FRAGMENTS_TEMPLATE, name)(event))
+      self._fragments[key] = cached
+      self.renders += 1
+    return cached[1]
+
+  def retain(self, events):
+    """Drops the fragments of events that are not in events, once per feed generation."""
+    generation = getattr(events, "generation", None)
+    with self._lock:
+      if generation is not None and generation == self._retained:
+        return
+      current = {id(event) for event in events}
+      self._fragments = {key: cached for key, cached in self._fragments.items() if key[1] in current}
+      self._retained = generation
+
+  def clear(self):
+    with self._lock:
+      self._fragments = {}
+      self._retained = None
+      self.renders = 0
+
+
+fragments = FragmentCache()
+metrics.collector("macevents_fragment_renders_total", "counter", "Event fragments rendered for the HTML pages.",
+                  lambda: [({}, fragments.renders)])
+
+
+def render_page(events, template):
+  """Returns the payload of template rendered for events, rendered at most once per feed generation."""
+  return payloads.snapshot_payload(events, template, lambda: _render(events, template))
+
+def _render(events, template):
+  fragments.retain(events)
+  with STAGE_SECONDS.time("render"):
+    html = render_template(template, events=events)
+  return payloads.Payload(html.encode("utf-8"), "text/html", getattr(events, "updated_at", None))
@@ -0,0 +1,84 @@
+import json
+import sqlite3
+from event_entry import PARSER_VERSION, EventEntry
+
+# The EventEntry fields kept for each entry, in column order
+PARSED_FIELDS = ("title", "link", "time", "location", "date", "start_time", "end_time", "coord", "desc")
+# Fields EventEntry derives on first access. They are only written once computed; otherwise the
+# column is NULL and the field is derived again after loading, desc from the summary column
+LAZY_FIELDS = ("start_time", "end_time", "coord", "desc")
+
+
+class ParsedEventStore():
+  """A sidecar SQLite table of parsed events, so a restarted worker does not parse the whole feed again.
+
+  Rows are keyed by entry id and hold the content fingerprint and PARSER_VERSION they were parsed
+  with. load() reads every current row in one query; rows from another parser version are
+  skipped, so their entries are parsed again and overwritten. Writing a row does not compute
+  the fields EventEntry derives lazily: a description not built yet is stored as the raw summary,
+  so saving and loading stay cheap, at the cost of building it after a restart when it is read."""
+
+  def __init__(self, path):
+    self.path = path
+    self.ids = set() # Entry ids with a row in the table
+    self._connection = sqlite3.connect(path, timeout=10, check_same_thread=False) # Only used under events_feed._lock
+    with self._connection:
+      self._connection.execute("PRAGMA journal_mode=WAL") # Workers read while another one writes
+      columns = [row[1] for row in self._connection.execute("PRAGMA table_info(parsed_events)")]
+      if columns and "summary" not in columns:
+        self._connection.execute("DROP TABLE parsed_events") # Written before summaries were kept; parsed again
+      self._connection.execute(
+          "CREATE TABLE IF NOT EXISTS parsed_events ("
+          " id TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, parser_version INTEGER NOT NULL, "
+          + ", ".join(f"{field} TEXT" for field in PARSED_FIELDS) + ", summary TEXT)")
+
+  def load(self):
+    """Returns (entry id, fingerprint, EventEntry) for every row written by this parser version."""
+    rows = self._connection.execute(
+        f"SELECT id, fingerprint, parser_version, {', '.join(PARSED_FIELDS)}, summary FROM parsed_events").fetchall()
+    self.ids = {row[0] for row in rows}
+    return [(row[0], row[1], self._event(row[0], row[3:])) for row in rows if row[2] == PARSER_VERSION]
+
+  def sync(self, parsed, entry_ids):
+    """Writes the (entry id, fingerprint, EventEntry) triples in parsed and deletes the rows whose
+    id is not in entry_ids, in one transaction."""
+    removed = self.ids - entry_ids
+    if not parsed and not removed:
+      return
+    with self._connection:
+      self._connection.executemany("DELETE FROM parsed_events WHERE id = ?", [(entry_id,) for entry_id in removed])
+      self._connection.executemany(
+          f"INSERT OR REPLACE INTO parsed_events VALUES (?, ?, ?, {', '.join('?' * len(PARSED_FIELDS))}, ?)",
+          [(entry_id, fingerprint, PARSER_VERSION) + self._row(event) for entry_id, fingerprint, event in parsed])
+    self.ids -= removed
+    self.ids.update(entry_id for entry_id, _, _ in parsed)
+
+  def clear(self):
+    with self._connection:
+      self._connection.execute("DELETE FROM parsed_events")
+    self.ids = set()
+
+  def close(self):
+    self._connection.close()
+
+  @staticmethod
+  def _row(event):
+    summary = event.summary # Read first: desc is set before the summary is dropped, so one of them is there
+    fields = {field: getattr(event, field) if field not in LAZY_FIELDS or event.computed(field) else None
+              for field in PARSED_FIELDS}
+    if summary is not None:
+      fields["desc"] = None
+    if event.computed("coord"):
+      fields["coord"] = json.dumps(fields["coord"]) # "null" when known to have none, unlike NULL
+    return tuple(fields[field] for field in PARSED_FIELDS) + (summary,)
+
+  @staticmethod
+  def _event(entry_id, values):
+    fields = dict(zip(PARSED_FIELDS, values))
+    summary = values[len(PARSED_FIELDS)]
+    pending = [field for field in LAZY_FIELDS if field != "desc" and fields[field] is None]
+    if summary is not None:
+      pending.append("desc")
+    if fields["coord"] is not None:
+      fields["coord"] = json.loads(fields["coord"])
+    return EventEntry.from_parsed(entry_id, **fields, summary=summary, pending=pending)
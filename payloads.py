@@ -0,0 +1,104 @@
+import gzip
+import hashlib
+import json
+import threading
+from flask import Response, request
+import events_feed as feed
+from metrics import STAGE_SECONDS
+
+try:
+  import brotli
+except ImportError: # Optional; without it only gzip is offered
+  brotli = None
+
+NDJSON = "application/x-ndjson"
+MIN_COMPRESS_BYTES = 1024 # Smaller bodies are sent as they are
+MAPPED_CHUNK_BYTES = 64 * 1024 # Mapped bodies are copied out this much at a time, as WSGI servers only write bytes
+
+# Content encodings offered, in order of preference. Each body is compressed once per payload, but
+# on the request path right after a refresh, so the settings trade a little size for much less CPU.
+ENCODERS = {"gzip": lambda body: gzip.compress(body, compresslevel=6, mtime=0)}
+if brotli is not None:
+  ENCODERS = {"br": lambda body: brotli.compress(body, quality=5), **ENCODERS}
+
+
+class Payload():
+  """A response body serialized once, with the validators used for conditional GETs.
+
+  The body is bytes, or a memoryview of a snapshot file mapped by shared_snapshot, which also
+  passes the ETag and compressed variants that were computed when the file was written."""
+
+  def __init__(self, body, mimetype, last_modified=None, etag=None, variants=None):
+    self.body = body
+    self.mimetype = mimetype
+    # Strong ETag, derived from the exact bytes served
+    self.etag = etag if etag is not None else hashlib.blake2b(body, digest_size=16).hexdigest()
+    self.last_modified = last_modified
+    self._variants = dict(variants) if variants is not None else {}
+    self._compressing = threading.Lock()
+
+  def encoded(self, encoding):
+    """Returns (body, etag, content encoding) for this payload in encoding, compressing it at most once.
+    The content encoding is None when compressing would not make the body smaller."""
+    variant = self._variants.get(encoding)
+    if variant is not None:
+      return variant
+    with self._compressing: # Requests arriving together after a refresh wait for one compression
+      variant = self._variants.get(encoding)
+      if variant is None:
+        with STAGE_SECONDS.time("compress"):
+          body = ENCODERS[encoding](self.body)
+        if len(body) < len(self.body):
+          variant = (body, f"{self.etag}-{encoding}", encoding) # Each variant needs its own strong ETag
+        else:
+          variant = (self.body, self.etag, None)
+        self._variants[encoding] = variant
+    return variant
+
+
+def json_payload(data, last_modified=None):
+  with STAGE_SECONDS.time("serialize"):
+    body = json.dumps(data, separators=(",", ":")).encode("utf-8")
+  return Payload(body, "application/json", last_modified)
+
+def snapshot_payload(events, name, build):
+  """Returns the payload called name for an events snapshot, building it at most once per feed generation."""
+  return feed.derived(events, name, build)
+
+def negotiate_encoding(payload):
+  """Returns the content encoding to send payload with for this request, or None to send it uncompressed."""
+  if len(payload.body) < MIN_COMPRESS_BYTES:
+    return None
+  return request.accept_encodings.best_match(list(ENCODERS))
+
+def mapped_chunks(body):
+  """Yields a memoryview body as bytes chunks, so no worker holds a whole copy of it."""
+  for start in range(0, len(body), MAPPED_CHUNK_BYTES):
+    yield bytes(body[start:start + MAPPED_CHUNK_BYTES])
+
+def send_payload(payload):
+  """Creates the response for payload, compressed as the client accepts, answering 304 Not Modified
+  when the client's copy is current."""
+  body, etag, content_encoding = payload.body, payload.etag, None
+  encoding = negotiate_encoding(payload)
+  if encoding is not None:
+    body, etag, content_encoding = payload.encoded(encoding)
+  if isinstance(body, memoryview):
+    response = Response(mapped_chunks(body), mimetype=payload.mimetype)
+    response.content_length = len(body)
+  else:
+    response = Response(body, mimetype=payload.mimetype)
+  if content_encoding is not None:
+    response.content_encoding = content_encoding
+  response.vary.add("Accept-Encoding")
+  response.set_etag(etag)
+  if payload.last_modified is not None:
+    response.last_modified = payload.last_modified
+  return response.make_conditional(request)
+
+def stream_ndjson(records):
+  """Creates a response that serializes records to newline-delimited JSON one at a time, as they are sent."""
+  def generate():
+    for record in records:
+      yield json.dumps(record, separators=(",", ":")) + "\n"
+  return Response(generate(), mimetype=NDJSON)
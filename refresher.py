@@ -0,0 +1,64 @@
+import logging
+import random
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class FeedRefresher():
+  """Calls a refresh function on a background thread every `interval` seconds.
+
+  Each delay is spread by +/- `jitter` (a fraction of the delay) so workers started together
+  do not fetch the feed in lockstep. After a failed refresh the delay starts at `retry_delay`
+  and doubles with every consecutive failure, capped at `max_backoff`."""
+
+  def __init__(self, refresh, interval=900, jitter=0.1, retry_delay=30, max_backoff=None):
+    self.refresh = refresh
+    self.interval = interval
+    self.jitter = jitter
+    self.retry_delay = retry_delay
+    self.max_backoff = max_backoff if max_backoff is not None else interval
+    self.failures = 0
+    self._stop = threading.Event()
+    self._thread = None
+
+  def next_delay(self):
+    """Returns the number of seconds to wait before the next refresh."""
+    if self.failures:
+      delay = min(self.max_backoff, self.retry_delay * 2 ** (self.failures - 1))
+    else:
+      delay = self.interval
+    return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+  def run_once(self):
+    """Runs one refresh, recording the outcome for the backoff. Returns True if it succeeded."""
+    try:
+      self.refresh()
+    except Exception:
+      self.failures += 1
+      logger.exception("Feed refresh failed (%d in a row)", self.failures)
+      return False
+    self.failures = 0
+    return True
+
+  def start(self, initial_delay=0):
+    if self.is_running():
+      return
+    self._stop.clear()
+    self._thread = threading.Thread(target=self._run, args=(initial_delay,), name="feed-refresher", daemon=True)
+    self._thread.start()
+
+  def stop(self, timeout=None):
+    self._stop.set()
+    if self._thread is not None:
+      self._thread.join(timeout)
+      self._thread = None
+
+  def is_running(self):
+    return self._thread is not None and self._thread.is_alive()
+
+  def _run(self, initial_delay):
+    delay = initial_delay
+    while not self._stop.wait(delay):
+      self.run_once()
+      delay = self.next_delay()
@@ -0,0 +1,194 @@
+import heapq
+import math
+import re
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+from operator import itemgetter
+from event_store import sort_key
+
+TOKEN = re.compile(r"\w+")
+FIELD_WEIGHTS = (("title", 3), ("location", 2), ("desc", 1)) # A word in the title counts three times one in the description
+PREFIX_WEIGHT = 0.5 # A word that only starts with the last query term counts half as much as the term itself
+MAX_PREFIX_TERMS = 200 # Words a prefix expands to at most, in alphabetical order
+SATURATION = 1.2 # Repeating a word in an event adds less and less to its score, as in BM25
+MAX_READS = 2000 # Events a longer query reads from its best score groups before scoring every match instead
+
+
+def tokens(text):
+  return TOKEN.findall(text.lower()) if text else []
+
+
+class SearchIndex():
+  """An in-memory inverted index over the title, location and description of events.
+
+  Each word maps to the events containing it, grouped by weight: the sum of the field weights of
+  the word's occurrences in the event. A query matches the events containing every term, the last
+  term also matching as a prefix, and an event scores the sum over terms of the saturated weight
+  times the term's inverse document frequency. Since weights take few values, events with equal
+  scores form sets, and the best results are read from combinations of those sets, best scores
+  first, rather than by scoring every matching event one at a time. When the best combinations
+  hold too few matches, as for words that rarely or never meet, the sets of every term are
+  intersected and only the events left are scored. The events feed updates the index with only
+  the events that changed on each refresh."""
+
+  def __init__(self, events=()):
+    self._postings = {} # word -> {weight: set of id(event)}
+    self._counts = {} # word -> events containing it
+    self._vocabulary = [] # Every word, sorted, for prefix lookups
+    self._events = {} # id(event) -> (event, {word: weight})
+    self._lock = threading.Lock()
+    self.update(added=events)
+
+  def __len__(self):
+    return len(self._events)
+
+  def update(self, removed=(), added=()):
+    """Removes the events in removed and indexes the events in added, matched by identity."""
+    with self._lock:
+      for event in removed:
+        self._remove(event)
+      for event in added:
+        self._add(event)
+
+  def _add(self, event):
+    doc = id(event)
+    if doc in self._events:
+      return
+    weights = Counter()
+    for field, weight in FIELD_WEIGHTS:
+      weights.update(tokens(getattr(event, field, None)) * weight) # Each occurrence counts weight times
+    for word, weight in weights.items():
+      postings = self._postings.get(word)
+      if postings is None:
+        postings = self._postings[word] = {}
+        self._counts[word] = 0
+        insort(self._vocabulary, word)
+      docs = postings.get(weight)
+      if docs is None:
+        docs = postings[weight] = set()
+      docs.add(doc)
+      self._counts[word] += 1
+    self._events[doc] = (event, weights)
+
+  def _remove(self, event):
+    doc = id(event)
+    indexed = self._events.get(doc)
+    if indexed is None or indexed[0] is not event:
+      return
+    for word, weight in indexed[1].items():
+      postings = self._postings[word]
+      postings[weight].discard(doc)
+      if not postings[weight]:
+        del postings[weight]
+      self._counts[word] -= 1
+      if not postings:
+        del self._postings[word]
+        del self._counts[word]
+        del self._vocabulary[bisect_left(self._vocabulary, word)]
+    del self._events[doc]
+
+  def _expand(self, prefix):
+    start = bisect_left(self._vocabulary, prefix)
+    words = []
+    for word in self._vocabulary[start:start + MAX_PREFIX_TERMS]:
+      if not word.startswith(prefix):
+        break
+      words.append(word)
+    return words
+
+  def _term_groups(self, term, prefix):
+    """Returns [(score, set of id(event))] for the events matching term (or, with prefix, a word
+    starting with it), best score first. With prefix, an event can be in several sets."""
+    total = len(self._events)
+    groups = []
+    for word in self._expand(term) if prefix else [term]:
+      postings = self._postings.get(word)
+      if not postings:
+        continue
+      idf = math.log(1 + total / self._counts[word])
+      if word != term:
+        idf *= PREFIX_WEIGHT
+      groups.extend((weight / (weight + SATURATION) * idf, docs) for weight, docs in postings.items())
+    groups.sort(key=lambda group: group[0], reverse=True)
+    return groups
+
+  def search(self, query, limit=20, prefix=True):
+    """Returns up to limit (score, event) pairs for the events matching every term of query, best first.
+    With prefix, the last term also matches words it starts."""
+    terms = list(dict.fromkeys(tokens(query)))
+    if not terms:
+      return []
+    with self._lock:
+      terms = [self._term_groups(term, prefix and position == len(terms) - 1) for position, term in enumerate(terms)]
+      found = _best_found(terms, limit)
+      if found is None: # Too few matches in the best combinations; score every match instead
+        found = _matching_scores(terms)
+        found = heapq.nlargest(limit, found.items(), key=itemgetter(1)) if limit is not None else found.items()
+      events = self._events
+      found = [(score, events[doc][0]) for doc, score in found]
+    found.sort(key=lambda pair: (-pair[0], sort_key(pair[1]))) # Equal scores in chronological order
+    return found
+
+
+def _best_found(terms, limit):
+  """Returns [(id(event), score)] for up to limit events, read from the combinations of score
+  groups best first, or None once that has read more than MAX_READS events of a longer query."""
+  found = {} # id(event) -> score, in the order found
+  reads = 0
+  for score, smallest, others in _best_combinations(terms):
+    reads += len(terms) * 8 # Roughly the cost of finding the combination, in events read
+    for doc in smallest:
+      reads += 1
+      if reads > MAX_READS and others:
+        return None
+      if doc not in found and all(doc in docs for docs in others): # Or found earlier through a better combination
+        found[doc] = score
+        if len(found) == limit:
+          return list(found.items())
+  return list(found.items())
+
+def _best_combinations(terms):
+  """Yields (total score, smallest set, other sets) for every combination of one score group per
+  term, highest total first; the events in all of the combination's sets match it."""
+  if not terms or any(not groups for groups in terms):
+    return
+  start = (0,) * len(terms)
+  heap = [(-sum(groups[0][0] for groups in terms), start)]
+  queued = {start}
+  while heap:
+    negative, positions = heapq.heappop(heap)
+    smallest, *others = sorted((terms[term][position][1] for term, position in enumerate(positions)), key=len)
+    # Filtered lazily by the caller, so the search stops reading large sets as soon as it has enough results
+    yield -negative, smallest, others
+    for term, position in enumerate(positions):
+      if position + 1 < len(terms[term]):
+        following = positions[:term] + (position + 1,) + positions[term + 1:]
+        if following not in queued:
+          queued.add(following)
+          score = -negative - terms[term][position][0] + terms[term][position + 1][0]
+          heapq.heappush(heap, (-score, following))
+
+def _matching_scores(terms):
+  """Returns {id(event): total score} for the events in a group of every term.
+
+  The matches are first narrowed down with set intersections, starting with the term with the
+  fewest events and stopping as soon as none are left, so the work grows with the events that
+  match rather than with the combinations of groups. Only those events are then scored."""
+  terms = sorted(terms, key=lambda groups: sum(len(docs) for _, docs in groups))
+  matches = set().union(*(docs for _, docs in terms[0]))
+  for groups in terms[1:]:
+    if not matches:
+      return {}
+    matches = set().union(*(docs & matches for _, docs in groups))
+  scores = dict.fromkeys(matches, 0)
+  for groups in terms:
+    left = set(matches)
+    for score, docs in groups: # Best first, so an event counts the best group it is in
+      if not left:
+        break
+      hits = docs & left
+      for doc in hits:
+        scores[doc] += score
+      left -= hits
+  return scores
@@ -0,0 +1,194 @@
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from datetime import datetime
+import compact
+import payloads
+from event_entry import PARSER_VERSION
+from metrics import STAGE_SECONDS
+
+try:
+  import fcntl
+except ImportError: # Not on Windows; there every process refreshes and publishes on its own
+  fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"MACEVSNP"
+FORMAT_VERSION = 1
+PREFIX = struct.Struct("<8sII") # Magic, format version, header length
+CHECK_INTERVAL = 1.0 # Seconds between checks of a following worker for a newer snapshot file
+
+# Arguments of EventEntry.from_parsed, as keys of the columnar events section
+ROW_KEYS = ("id", "title", "link", "time", "location", "date", "starttime", "endtime", "coord", "description")
+
+
+def _timestamp(value):
+  return value.isoformat() if value is not None else None
+
+def _datetime(value):
+  return datetime.fromisoformat(value) if value is not None else None
+
+
+class SnapshotImage():
+  """One feed generation read from a snapshot file.
+
+  The file stays memory-mapped for as long as the image or a payload from it is referenced,
+  so every worker on the host serves the same pages of it from the OS page cache."""
+
+  def __init__(self, mapped, header, data_start):
+    self.generation = header["generation"]
+    self.epoch = header["epoch"]
+    self.updated_at = _datetime(header["updated_at"])
+    self.refreshed_at = _datetime(header["refreshed_at"])
+    self.keys = [tuple(key) for key in header["keys"]]
+    self.payload_names = list(header["payloads"])
+    self._header = header
+    self._view = memoryview(mapped)[data_start:]
+
+  def _section(self, span):
+    offset, length = span
+    return self._view[offset:offset + length]
+
+  def rows(self):
+    """Returns the EventEntry.from_parsed arguments of every event, in the order of keys."""
+    data = json.loads(bytes(self._section(self._header["events"])))
+    columns = compact.decode(data)
+    return [tuple(event[key] for key in ROW_KEYS) for event in columns]
+
+  def payload(self, name):
+    """Returns the Payload called name, with its body and compressed variants read from the mapping."""
+    entry = self._header["payloads"][name]
+    variants = {encoding: (self._section(span), etag, encoding) for encoding, (span, etag) in entry["variants"].items()}
+    return payloads.Payload(self._section(entry["body"]), entry["mimetype"], _datetime(entry["last_modified"]),
+                            etag=entry["etag"], variants=variants)
+
+
+class SharedSnapshot():
+  """A versioned snapshot file that lets the workers of one host share a single refresher.
+
+  The one process that holds the lock next to the file leads: it refreshes the feed and
+  publishes every new generation, writing the parsed events and the payloads made by `builders`
+  ({name: build(events) -> Payload}) with their compressed variants to a new file that atomically
+  replaces the old one. Every other process follows: it maps the newest file and loads its
+  events without fetching or parsing. When the leader exits, the next follower to check takes
+  over, and `on_lead` is called."""
+
+  def __init__(self, path, builders=None, on_lead=None, check_interval=CHECK_INTERVAL):
+    self.path = path
+    self.builders = builders or {}
+    self.on_lead = on_lead
+    self.check_interval = check_interval
+    self.leader = False
+    self.published = None # (epoch, generation) last written by this process
+    self._lock_file = None
+    self._seen = None # (inode, mtime, size) of the last file read
+    self._next_check = 0
+    self._publishing = threading.Lock()
+
+  def lead(self):
+    """Tries to become the process that refreshes and publishes for this host. Returns whether it leads."""
+    if self.leader:
+      return True
+    if fcntl is not None:
+      lock_file = open(f"{self.path}.lock", "a")
+      try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+      except OSError:
+        lock_file.close()
+        return False
+      self._lock_file = lock_file # Held until the process exits
+    self.leader = True
+    logger.info("Leading feed refreshes for %s (pid %d)", self.path, os.getpid())
+    if self.on_lead is not None:
+      self.on_lead()
+    return True
+
+  def due(self):
+    """Whether a following worker should look for a newer file, at most once per check_interval."""
+    now = time.monotonic()
+    if now < self._next_check:
+      return False
+    self._next_check = now + self.check_interval
+    return True
+
+  def read(self):
+    """Returns the SnapshotImage in the file if it changed since the last read, otherwise None.
+    Missing, partial, foreign or outdated files are ignored."""
+    try:
+      with open(self.path, "rb") as file:
+        stat = os.fstat(file.fileno())
+        seen = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if seen == self._seen or stat.st_size < PREFIX.size:
+          return None
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except OSError:
+      return None
+    self._seen = seen
+    magic, version, header_length = PREFIX.unpack_from(mapped)
+    if magic != MAGIC or version != FORMAT_VERSION:
+      logger.warning("Ignoring %s: not a snapshot file of format %d", self.path, FORMAT_VERSION)
+      return None
+    header = json.loads(mapped[PREFIX.size:PREFIX.size + header_length])
+    if header["parser_version"] != PARSER_VERSION:
+      return None # Written by a worker running another version of EventEntry, e.g. during a deploy
+    return SnapshotImage(mapped, header, PREFIX.size + header_length)
+
+  def publish(self, events, epoch, refreshed_at=None):
+    """Writes events and their payloads to a new file and atomically replaces the current one.
+    Does nothing unless this process leads, or if this generation was already written."""
+    with self._publishing:
+      generation = getattr(events, "generation", 0)
+      if not self.leader or self.published == (epoch, generation):
+        return False
+      with STAGE_SECONDS.time("publish"):
+        self._write(events, epoch, generation, refreshed_at)
+      self.published = (epoch, generation)
+      return True
+
+  def publish_async(self, events, epoch, refreshed_at=None):
+    """Publishes events on a background thread, so requests do not wait for compression and writing."""
+    def run():
+      try:
+        self.publish(events, epoch, refreshed_at)
+      except Exception:
+        logger.exception("Could not publish the events snapshot to %s", self.path)
+    threading.Thread(target=run, name="snapshot-publish", daemon=True).start()
+
+  def _write(self, events, epoch, generation, refreshed_at):
+    chunks = []
+    offset = 0
+
+    def add(body):
+      nonlocal offset
+      chunks.append(body)
+      offset += len(body)
+      return [offset - len(body), len(body)]
+
+    header = {"generation": generation, "epoch": epoch, "parser_version": PARSER_VERSION,
+              "updated_at": _timestamp(getattr(events, "updated_at", None)), "refreshed_at": _timestamp(refreshed_at),
+              "keys": getattr(events, "keys", []), "payloads": {}}
+    header["events"] = add(compact.dumps(compact.encode(events), compact.COLUMNAR))
+    for name, build in self.builders.items():
+      payload = build(events)
+      entry = {"mimetype": payload.mimetype, "etag": payload.etag,
+               "last_modified": _timestamp(payload.last_modified), "body": add(payload.body), "variants": {}}
+      if len(payload.body) >= payloads.MIN_COMPRESS_BYTES:
+        for encoding in payloads.ENCODERS:
+          body, etag, content_encoding = payload.encoded(encoding)
+          if content_encoding is not None:
+            entry["variants"][encoding] = [add(body), etag]
+      header["payloads"][name] = entry
+
+    encoded = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    temporary = f"{self.path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as file:
+      file.write(PREFIX.pack(MAGIC, FORMAT_VERSION, len(encoded)))
+      file.write(encoded)
+      for chunk in chunks:
+        file.write(chunk)
+    os.replace(temporary, self.path) # Workers that mapped the old file keep reading it until they let go
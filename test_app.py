@@ -1,6 +1,18 @@
 import pytest
-from unittest.mock import patch
-from app import app
+import gzip
+import json
+import os
+import runpy
+import threading
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+from app import app, build_events_payload
+import compact
+import events_feed as feed
+import pages
+import payloads
 from event_entry import EventEntry
 
 # ============================================================================
@@ -49,6 +61,24 @@ def mock_events(mock_event):
 # FLASK ROUTE TESTS
 # ============================================================================
 
+class TestParseWorkerImport:
+    """Test cases for app.py imported again by the processes that parse large batches."""
+
+    def test_worker_import_sets_nothing_up(self):
+        """Test that importing app.py as __mp_main__, as forkserver and spawn workers do when the app
+        runs as `python app.py`, neither touches the feeds nor starts refreshing or leading."""
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+        with patch('events_feed.add_feed') as mock_add_feed, \
+             patch('refresher.FeedRefresher.start') as mock_start, \
+             patch('shared_snapshot.SharedSnapshot.lead') as mock_lead:
+            module = runpy.run_path(path, run_name="__mp_main__")
+
+        assert module["SERVING"] is False and module["shared"] is None
+        mock_add_feed.assert_not_called()
+        mock_start.assert_not_called()
+        mock_lead.assert_not_called()
+
+
 class TestIndexRoute:
    """Test cases for the index route (/)."""
    
@@ -133,15 +163,15 @@ class TestEventsRoute:
         assert event['description'] == "This is a test event description"
 
     @patch('app.feed.get_events')
-    def test_events_reverse_order(self, mock_get_events, client, mock_events):
-        """Test that events are returned in reverse order."""
-        mock_get_events.return_value = mock_events
+    def test_events_chronological_order(self, mock_get_events, client, mock_events):
+        """Test that events are returned in chronological order, whatever the feed order."""
+        mock_get_events.return_value = mock_events[::-1]
         response = client.get('/events')
         data = response.get_json()
 
-        # The first event in mock_events should be last in response
-        assert data[0]['id'] == "test-id-456"
-        assert data[1]['id'] == "test-id-123"
+        # January 15 comes before January 20
+        assert data[0]['id'] == "test-id-123"
+        assert data[1]['id'] == "test-id-456"
 
     @patch('app.feed.get_events')
     def test_events_with_empty_list(self, mock_get_events, client):
@@ -346,7 +376,550 @@ class TestIntegration:
         # Should be identical every time
         assert data1 == data2 == data3
 
-        # Should be reversed from input
-        assert data1[0]['id'] == "test-id-789"
+        # Should be in date order
+        assert data1[0]['id'] == "test-id-123"
         assert data1[1]['id'] == "test-id-456"
-        assert data1[2]['id'] == "test-id-123"
\ No newline at end of file
+        assert data1[2]['id'] == "test-id-789"
+
+# ============================================================================
+# CONDITIONAL GET TESTS
+# ============================================================================
+
+class TestEventsConditionalGet:
+    """Test cases for the precomputed /events body and its validators."""
+
+    @pytest.fixture
+    def snapshot(self, mock_events):
+        return feed.EventSnapshot(mock_events, generation=1,
+                                  updated_at=datetime(2025, 1, 10, 12, 0, tzinfo=timezone.utc))
+
+    @patch('app.feed.get_events')
+    def test_events_has_etag_and_last_modified(self, mock_get_events, client, snapshot):
+        """Test that /events sends a strong ETag and the snapshot's Last-Modified."""
+        mock_get_events.return_value = snapshot
+        response = client.get('/events')
+
+        etag, weak = response.get_etag()
+        assert etag and not weak
+        assert response.last_modified == snapshot.updated_at
+
+    @patch('app.feed.get_events')
+    def test_events_if_none_match_returns_304(self, mock_get_events, client, snapshot):
+        """Test that a matching If-None-Match gets 304 with no body."""
+        mock_get_events.return_value = snapshot
+        etag, _ = client.get('/events').get_etag()
+
+        response = client.get('/events', headers={'If-None-Match': f'"{etag}"'})
+
+        assert response.status_code == 304
+        assert response.data == b""
+
+    @patch('app.feed.get_events')
+    def test_events_if_modified_since_returns_304(self, mock_get_events, client, snapshot):
+        """Test that an up-to-date If-Modified-Since gets 304."""
+        mock_get_events.return_value = snapshot
+        response = client.get('/events', headers={'If-Modified-Since': 'Fri, 10 Jan 2025 12:00:00 GMT'})
+
+        assert response.status_code == 304
+
+    @patch('app.feed.get_events')
+    def test_events_stale_etag_returns_body(self, mock_get_events, client, snapshot):
+        """Test that an outdated ETag gets the full body."""
+        mock_get_events.return_value = snapshot
+        response = client.get('/events', headers={'If-None-Match': '"outdated"'})
+
+        assert response.status_code == 200
+        assert len(response.get_json()) == 2
+
+    @patch('app.feed.get_events')
+    def test_events_serialized_once_per_generation(self, mock_get_events, client, snapshot):
+        """Test that the JSON body is built once and reused for the same snapshot."""
+        mock_get_events.return_value = snapshot
+
+        with patch('app.build_events_payload', wraps=build_events_payload) as mock_build:
+            first = client.get('/events')
+            second = client.get('/events')
+
+        mock_build.assert_called_once()
+        assert first.data == second.data
+
+
+# ============================================================================
+# LOCATION QUERY TESTS
+# ============================================================================
+
+class TestLocationRoutes:
+    """Test cases for the /events/nearby and /events/building routes."""
+
+    @patch('app.feed.get_events')
+    def test_nearby_returns_events_with_distance(self, mock_get_events, client, mock_events):
+        """Test that nearby events come back closest first with their distance."""
+        mock_get_events.return_value = mock_events
+        response = client.get('/events/nearby?lat=44.93855&lon=-93.16822&radius=50')
+        data = response.get_json()
+
+        assert response.status_code == 200
+        assert [event['id'] for event in data] == ["test-id-123"]
+        assert data[0]['distance'] == 0
+
+    @patch('app.feed.get_events')
+    def test_nearby_requires_a_point(self, mock_get_events, client, mock_events):
+        """Test that a missing or malformed point is rejected."""
+        mock_get_events.return_value = mock_events
+
+        assert client.get('/events/nearby?lat=44.9').status_code == 400
+        assert client.get('/events/nearby?lat=north&lon=west').status_code == 400
+
+    @patch('app.feed.get_events')
+    def test_nearby_rejects_non_finite_numbers(self, mock_get_events, client, mock_events):
+        """Test that nan and infinite coordinates or radius are rejected rather than failing."""
+        mock_get_events.return_value = mock_events
+
+        for query in ('lat=nan&lon=-93.1', 'lat=44.9&lon=inf', 'lat=44.9&lon=-93.1&radius=inf',
+                      'lat=44.9&lon=-93.1&radius=nan', 'lat=-infinity&lon=-93.1'):
+            assert client.get(f'/events/nearby?{query}').status_code == 400
+
+    @patch('app.feed.get_events')
+    def test_nearby_rejects_points_off_the_globe(self, mock_get_events, client, mock_events):
+        """Test that latitudes beyond the poles and longitudes beyond the date line are rejected."""
+        mock_get_events.return_value = mock_events
+
+        for query in ('lat=1e300&lon=0', 'lat=-90.5&lon=0', 'lat=0&lon=180.1', 'lat=0&lon=-1e300'):
+            assert client.get(f'/events/nearby?{query}').status_code == 400
+
+    @patch('app.feed.get_events')
+    def test_nearby_huge_radius_at_the_pole(self, mock_get_events, client, mock_events):
+        """Test that a radius beyond any distance on Earth, at a pole, finds every located event instead of failing."""
+        mock_get_events.return_value = mock_events
+
+        response = client.get('/events/nearby?lat=90&lon=0&radius=1e308')
+
+        assert response.status_code == 200
+        assert response.get_json()
+        assert len(response.get_json()) == len(client.get('/events/nearby?lat=44.9&lon=-93.1&radius=1e7').get_json())
+
+    @patch('app.feed.get_events')
+    def test_building_returns_its_events(self, mock_get_events, client, mock_events):
+        """Test that the building route lists the events held there."""
+        mock_get_events.return_value = mock_events
+        data = client.get('/events/building/Humanities').get_json()
+
+        assert [event['id'] for event in data] == ["test-id-456"]
+
+    @patch('app.feed.get_events')
+    def test_unknown_building_returns_404(self, mock_get_events, client, mock_events):
+        """Test that an unknown building name is a 404."""
+        mock_get_events.return_value = mock_events
+
+        assert client.get('/events/building/Nowhere Hall').status_code == 404
+
+
+# ============================================================================
+# FILTERED EVENTS TESTS
+# ============================================================================
+
+class TestEventsFilters:
+    """Test cases for the /events query parameters."""
+
+    @patch('app.feed.get_events')
+    def test_date_range(self, mock_get_events, client, mock_events):
+        """Test that from/to limit events to the given days."""
+        mock_get_events.return_value = mock_events
+        data = client.get('/events?from=2025-01-16&to=2025-01-31').get_json()
+
+        assert [event['id'] for event in data] == ["test-id-456"]
+
+    @patch('app.feed.get_events')
+    def test_location_filter(self, mock_get_events, client, mock_events):
+        """Test that location limits events to a building."""
+        mock_get_events.return_value = mock_events
+        data = client.get('/events?location=Library').get_json()
+
+        assert [event['id'] for event in data] == ["test-id-123"]
+
+    @patch('app.feed.get_events')
+    def test_pagination_headers(self, mock_get_events, client, mock_events):
+        """Test that a limited page links to the next one through X-Next-Cursor."""
+        mock_get_events.return_value = mock_events
+        first = client.get('/events?limit=1')
+        second = client.get(f"/events?limit=1&cursor={first.headers['X-Next-Cursor']}")
+
+        assert [event['id'] for event in first.get_json()] == ["test-id-123"]
+        assert [event['id'] for event in second.get_json()] == ["test-id-456"]
+        assert 'X-Next-Cursor' not in second.headers
+
+    @patch('app.feed.get_events')
+    @pytest.mark.parametrize("query", ["from=yesterday", "to=2025-13-01", "limit=0", "limit=many", "cursor=@@@"])
+    def test_invalid_parameters_return_400(self, mock_get_events, client, mock_events, query):
+        """Test that malformed parameters are rejected."""
+        mock_get_events.return_value = mock_events
+
+        assert client.get(f'/events?{query}').status_code == 400
+
+
+class TestUpcomingEvents:
+    """Test cases for ?upcoming=1."""
+
+    @patch('app.campus_now')
+    @patch('app.feed.get_events')
+    def test_upcoming_skips_past_and_ended_events(self, mock_get_events, mock_now, client, mock_events):
+        """Test that only events that have not ended yet are returned."""
+        mock_get_events.return_value = mock_events
+        mock_now.return_value = datetime(2025, 1, 15, 17, 0)
+
+        assert [event['id'] for event in client.get('/events?upcoming=1').get_json()] == ["test-id-456"]
+
+        mock_now.return_value = datetime(2025, 1, 15, 15, 0)
+        assert [event['id'] for event in client.get('/events?upcoming=1').get_json()] == ["test-id-123", "test-id-456"]
+
+
+class TestEventsStreaming:
+    """Test cases for newline-delimited JSON streaming from /events."""
+
+    @patch('app.feed.get_events')
+    def test_stream_arg_sends_one_event_per_line(self, mock_get_events, client, mock_events):
+        """Test that ?stream=1 sends each event as one JSON line, in the same order as the array."""
+        mock_get_events.return_value = mock_events
+        response = client.get('/events?stream=1')
+
+        assert response.mimetype == 'application/x-ndjson'
+        assert response.is_streamed
+        lines = response.get_data(as_text=True).splitlines()
+        assert [json.loads(line) for line in lines] == client.get('/events').get_json()
+
+    @patch('app.feed.get_events')
+    def test_accept_header_selects_stream(self, mock_get_events, client, mock_events):
+        """Test that Accept: application/x-ndjson streams, and the response varies on Accept."""
+        mock_get_events.return_value = mock_events
+        response = client.get('/events', headers={'Accept': 'application/x-ndjson'})
+
+        assert response.mimetype == 'application/x-ndjson'
+        assert 'Accept' in response.vary
+        assert 'Accept' in client.get('/events').vary
+
+    @patch('app.feed.get_events')
+    def test_filtered_stream_keeps_cursor(self, mock_get_events, client, mock_events):
+        """Test that a filtered stream sends only matching events and the next-page cursor."""
+        mock_get_events.return_value = mock_events
+        response = client.get('/events?stream=1&limit=1')
+
+        lines = response.get_data(as_text=True).splitlines()
+        assert [json.loads(line)['id'] for line in lines] == ["test-id-123"]
+        assert response.headers.get('X-Next-Cursor')
+
+
+class TestCompactFormat:
+    """Test cases for the dictionary-encoded /events formats negotiated with Accept."""
+
+    @pytest.fixture
+    def snapshot(self, mock_events):
+        return feed.EventSnapshot(mock_events * 20, generation=1)
+
+    @patch('app.feed.get_events')
+    def test_columnar_decodes_to_the_json(self, mock_get_events, client, snapshot):
+        """Test that the columnar layout holds the same events as the JSON, in less space."""
+        mock_get_events.return_value = snapshot
+        plain = client.get('/events')
+        response = client.get('/events', headers={'Accept': compact.COLUMNAR})
+
+        assert response.mimetype == compact.COLUMNAR
+        assert 'Accept' in response.vary
+        assert compact.decode(json.loads(response.data)) == plain.get_json()
+        assert len(response.data) < len(plain.data)
+        assert response.get_etag()[0] != plain.get_etag()[0]
+
+    @patch('app.feed.get_events')
+    def test_compact_body_is_built_once(self, mock_get_events, client, snapshot):
+        """Test that the encoded body is kept with the generation's other payloads."""
+        mock_get_events.return_value = snapshot
+        with patch('app.compact.encode', wraps=compact.encode) as mock_encode:
+            first = client.get('/events', headers={'Accept': compact.COLUMNAR})
+            second = client.get('/events', headers={'Accept': compact.COLUMNAR})
+
+        mock_encode.assert_called_once()
+        assert first.data == second.data
+
+    @patch('app.feed.get_events')
+    def test_filtered_events_are_encoded(self, mock_get_events, client, mock_events):
+        """Test that filtered pages use the same layout and keep their cursor."""
+        mock_get_events.return_value = mock_events
+        response = client.get('/events?limit=1', headers={'Accept': compact.COLUMNAR})
+
+        assert [event['id'] for event in compact.decode(json.loads(response.data))] == ["test-id-123"]
+        assert response.headers.get('X-Next-Cursor')
+
+    @patch('app.feed.get_events')
+    def test_msgpack_when_installed(self, mock_get_events, client, snapshot):
+        """Test that MessagePack is offered when the optional msgpack module is available."""
+        pytest.importorskip("msgpack")
+        mock_get_events.return_value = snapshot
+        response = client.get('/events', headers={'Accept': compact.MSGPACK})
+
+        assert response.mimetype == compact.MSGPACK
+        assert compact.decode(compact.loads(response.data, compact.MSGPACK)) == client.get('/events').get_json()
+
+
+class TestEventChanges:
+    """Test cases for /events/changes."""
+
+    @pytest.fixture
+    def feed_entries(self):
+        """Serve /events from the real snapshot builder over mocked reader entries."""
+        feed.clear_cache()
+        with patch('events_feed.reader.get_entries') as mock_get_entries:
+            yield mock_get_entries
+        feed.clear_cache()
+
+    @staticmethod
+    def rss_entry(number, text="Details"):
+        return SimpleNamespace(id=f"event/{number}", title=f"Event {number}", link=f"https://example.com/{number}",
+                               summary=f"<strong>January {number}, 2025 | 2:00 PM - 3:00 PM | Library</strong><p>{text}</p>")
+
+    def test_missing_token_gets_full_resync(self, client, feed_entries):
+        """Test that a request without a token gets every event and a token."""
+        feed_entries.return_value = [self.rss_entry(2), self.rss_entry(1)]
+        data = client.get('/events/changes').get_json()
+
+        assert data["resync"] is True
+        assert [event["id"] for event in data["events"]] == ["event/1", "event/2"]
+        assert data["token"]
+
+    def test_token_gets_only_changes(self, client, feed_entries):
+        """Test that a client's token returns only what was added, updated and removed since."""
+        feed_entries.return_value = [self.rss_entry(1), self.rss_entry(2)]
+        token = client.get('/events/changes').get_json()["token"]
+
+        feed_entries.return_value = [self.rss_entry(2, "Moved"), self.rss_entry(3)]
+        feed.invalidate()
+        data = client.get(f'/events/changes?since={token}').get_json()
+
+        assert data["resync"] is False
+        assert [event["id"] for event in data["added"]] == ["event/3"]
+        assert [event["description"] for event in data["updated"]] == ["Moved"]
+        assert data["removed"] == ["event/1"]
+        assert data["token"] != token
+
+        unchanged = client.get(f'/events/changes?since={data["token"]}').get_json()
+        assert (unchanged["added"], unchanged["updated"], unchanged["removed"]) == ([], [], [])
+
+    def test_unknown_token_gets_full_resync(self, client, feed_entries):
+        """Test that a token from another process or an expired generation forces a resync."""
+        feed_entries.return_value = [self.rss_entry(1)]
+
+        assert client.get('/events/changes?since=deadbeef-1').get_json()["resync"] is True
+
+
+class TestEventSearch:
+    """Test cases for /events/search."""
+
+    @patch('app.feed.get_events')
+    def test_search_ranks_matches(self, mock_get_events, client, mock_events):
+        """Test that matching events come back best first, with their scores."""
+        mock_get_events.return_value = mock_events
+        data = client.get('/events/search?q=another test').get_json()
+
+        assert [event['id'] for event in data] == ["test-id-456"]
+        assert data[0]['score'] > 0
+
+    @patch('app.feed.get_events')
+    def test_search_matches_prefixes_and_limits(self, mock_get_events, client, mock_events):
+        """Test that a partial last word matches and ?limit= caps the results."""
+        mock_get_events.return_value = mock_events
+
+        assert len(client.get('/events/search?q=descr').get_json()) == 2
+        assert len(client.get('/events/search?q=descr&limit=1').get_json()) == 1
+
+    @pytest.mark.parametrize("query", ["", "?q=", "?q=test&limit=0", "?q=test&limit=x"])
+    @patch('app.feed.get_events')
+    def test_invalid_parameters_return_400(self, mock_get_events, client, mock_events, query):
+        """Test that a missing query or a bad limit is rejected."""
+        mock_get_events.return_value = mock_events
+
+        assert client.get(f'/events/search{query}').status_code == 400
+
+
+class TestEventsCalendar:
+    """Test cases for /events.ics."""
+
+    @pytest.fixture
+    def snapshot(self, mock_events):
+        return feed.EventSnapshot(mock_events, generation=1,
+                                  updated_at=datetime(2025, 1, 10, 12, 0, tzinfo=timezone.utc))
+
+    @patch('app.feed.get_events')
+    def test_calendar_has_every_event(self, mock_get_events, client, snapshot):
+        """Test that the calendar is iCalendar with one VEVENT per event and an ETag."""
+        mock_get_events.return_value = snapshot
+        response = client.get('/events.ics')
+
+        assert response.status_code == 200
+        assert response.mimetype == 'text/calendar'
+        assert response.data.count(b'BEGIN:VEVENT') == 2
+        assert b'DTSTART;TZID=America/Chicago:20250115T140000' in response.data
+        assert response.headers.get('ETag')
+
+    @patch('app.feed.get_events')
+    def test_calendar_filters(self, mock_get_events, client, snapshot):
+        """Test that ?location= and ?date= narrow the calendar."""
+        mock_get_events.return_value = snapshot
+
+        assert client.get('/events.ics?location=library').data.count(b'BEGIN:VEVENT') == 1
+        assert client.get('/events.ics?date=2025-01-20').data.count(b'BEGIN:VEVENT') == 1
+        assert client.get('/events.ics?date=2025-02-01').data.count(b'BEGIN:VEVENT') == 0
+
+    @patch('app.feed.get_events')
+    def test_calendar_revalidates(self, mock_get_events, client, snapshot):
+        """Test that a client polling with its ETag gets 304 from the calendar built once."""
+        mock_get_events.return_value = snapshot
+        etag = client.get('/events.ics').headers['ETag']
+
+        with patch('ical.format_event') as format_event:
+            response = client.get('/events.ics', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        format_event.assert_not_called()
+
+    @pytest.mark.parametrize("query,status", [("?date=tomorrow", 400), ("?location=Nowhere Hall", 404)])
+    @patch('app.feed.get_events')
+    def test_invalid_filters(self, mock_get_events, client, snapshot, query, status):
+        """Test that a bad date or unknown building is rejected."""
+        mock_get_events.return_value = snapshot
+
+        assert client.get(f'/events.ics{query}').status_code == status
+
+
+class TestCompressedPayloads:
+    """Test cases for Accept-Encoding negotiation of precomputed payloads."""
+
+    @pytest.fixture
+    def snapshot(self, mock_events):
+        return feed.EventSnapshot(mock_events * 20, generation=1)
+
+    @patch('app.feed.get_events')
+    def test_gzip_is_sent_when_accepted(self, mock_get_events, client, snapshot):
+        """Test that a gzip-accepting client gets the same JSON, compressed, with its own ETag."""
+        mock_get_events.return_value = snapshot
+        plain = client.get('/events')
+        compressed = client.get('/events', headers={'Accept-Encoding': 'gzip'})
+
+        assert compressed.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(compressed.data) == plain.data
+        assert len(compressed.data) < len(plain.data)
+        assert compressed.get_etag()[0] != plain.get_etag()[0]
+        assert 'Accept-Encoding' in compressed.vary and 'Accept-Encoding' in plain.vary
+
+    @patch('app.feed.get_events')
+    def test_compressed_body_is_built_once(self, mock_get_events, client, snapshot):
+        """Test that the compressed body is cached with the payload for the generation."""
+        mock_get_events.return_value = snapshot
+        with patch.dict(payloads.ENCODERS, gzip=Mock(wraps=payloads.ENCODERS['gzip'])) as encoders:
+            first = client.get('/events', headers={'Accept-Encoding': 'gzip'})
+            second = client.get('/events', headers={'Accept-Encoding': 'gzip'})
+
+            assert encoders['gzip'].call_count == 1
+        assert first.data == second.data
+
+    def test_concurrent_requests_compress_once(self, snapshot):
+        """Test that requests asking for the same variant at once wait for a single compression."""
+        payload = build_events_payload(snapshot)
+
+        def slow_gzip(body):
+            time.sleep(0.05) # Long enough for the other threads to ask meanwhile
+            return gzip.compress(body)
+
+        with patch.dict(payloads.ENCODERS, gzip=Mock(side_effect=slow_gzip)) as encoders:
+            threads = [threading.Thread(target=payload.encoded, args=("gzip",)) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            assert encoders['gzip'].call_count == 1
+        assert gzip.decompress(payload.encoded("gzip")[0]) == payload.body
+
+    @patch('app.feed.get_events')
+    def test_compressed_etag_revalidates(self, mock_get_events, client, snapshot):
+        """Test that the ETag of a compressed variant gets 304 Not Modified."""
+        mock_get_events.return_value = snapshot
+        etag, _ = client.get('/events', headers={'Accept-Encoding': 'gzip'}).get_etag()
+
+        response = client.get('/events', headers={'Accept-Encoding': 'gzip', 'If-None-Match': f'"{etag}"'})
+
+        assert response.status_code == 304
+
+    @patch('app.feed.get_events')
+    def test_small_bodies_are_not_compressed(self, mock_get_events, client, mock_events):
+        """Test that bodies under MIN_COMPRESS_BYTES go out as they are."""
+        mock_get_events.return_value = feed.EventSnapshot(mock_events[:1], generation=1)
+
+        assert 'Content-Encoding' not in client.get('/events', headers={'Accept-Encoding': 'gzip'}).headers
+
+    @patch('app.feed.get_events')
+    def test_brotli_is_preferred_when_installed(self, mock_get_events, client, snapshot):
+        """Test that Brotli is chosen over gzip when the optional brotli module is available."""
+        brotli = pytest.importorskip("brotli")
+        mock_get_events.return_value = snapshot
+        response = client.get('/events', headers={'Accept-Encoding': 'gzip, br'})
+
+        assert response.headers['Content-Encoding'] == 'br'
+        assert brotli.decompress(response.data) == client.get('/events').data
+
+
+class TestCachedPages:
+    """Test cases for the per-generation HTML pages and their shared event fragments."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_fragments(self):
+        pages.fragments.clear()
+        yield
+        pages.fragments.clear()
+
+    @pytest.fixture
+    def snapshot(self, mock_events):
+        return feed.EventSnapshot(mock_events, generation=1)
+
+    @patch('app.feed.get_events')
+    def test_pages_are_rendered_once_per_generation(self, mock_get_events, client, snapshot):
+        """Test that the rendered page is reused until the feed generation changes."""
+        mock_get_events.return_value = snapshot
+        with patch('pages.render_template', wraps=pages.render_template) as mock_render:
+            first = client.get('/')
+            second = client.get('/')
+
+        mock_render.assert_called_once()
+        assert first.data == second.data
+        assert b"Test Event" in first.data
+
+    @patch('app.feed.get_events')
+    def test_fragments_are_shared_across_pages(self, mock_get_events, client, snapshot):
+        """Test that each event's shared cells are rendered once for all three pages."""
+        mock_get_events.return_value = snapshot
+        for url in ('/', '/coord', '/times'):
+            assert client.get(url).status_code == 200
+
+        # Per event: name_cells and time_cell, plus one row for each page
+        assert pages.fragments.renders == len(snapshot) * 5
+
+    @patch('app.feed.get_events')
+    def test_unchanged_events_keep_rows_across_generations(self, mock_get_events, client, snapshot, mock_events):
+        """Test that a new generation only renders rows for events that are new."""
+        mock_get_events.return_value = snapshot
+        client.get('/times')
+        renders = pages.fragments.renders
+
+        added = object.__new__(EventEntry)
+        added.id, added.title, added.location, added.date = "new-id", "new title", "Library", "January 25, 2025"
+        added.start_time, added.end_time = "10:00", "11:00"
+        mock_get_events.return_value = feed.EventSnapshot(mock_events[1:] + [added], generation=2)
+        response = client.get('/times')
+
+        assert pages.fragments.renders == renders + 3 # name_cells, time_cell and times_row for the new event
+        assert b"new title" in response.data and b'<td id="title">Test Event</td>' not in response.data
+        assert len(pages.fragments) == 6
+
+    @patch('app.feed.get_events')
+    def test_pages_escape_event_text(self, mock_get_events, client, mock_event):
+        """Test that event text in cached fragments is still HTML-escaped."""
+        mock_event.title = "<script>alert(1)</script>"
+        mock_get_events.return_value = [mock_event]
+
+        assert b"&lt;script&gt;" in client.get('/').data
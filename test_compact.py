@@ -0,0 +1,95 @@
+import pytest
+import compact
+from event_entry import EventEntry
+
+
+def make_event(event_id, location, text):
+    """Create an EventEntry from a summary shaped like the Mac RSS feed."""
+    return EventEntry(event_id, "Library hours: 8am-10pm", f"https://example.com/{event_id}",
+                      f"<strong>November 15, 2025 | 7:00 PM - 9:00 PM | {location}</strong><p>{text}</p>")
+
+def as_dict(event):
+    return {key: getattr(event, attribute) for key, attribute in compact.COLUMNS}
+
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+@pytest.fixture
+def events():
+    return [
+        make_event("a", "Library", "Open to all."),
+        make_event("b", "Library", "Open to all."),
+        make_event("c", "Humanities 401", "Closed for the holiday."),
+        make_event("d", "Online", "Open to all."),
+    ]
+
+
+# ============================================================================
+# ENCODING TESTS
+# ============================================================================
+
+class TestEncode:
+    """Test cases for the dictionary-encoded columnar layout."""
+
+    def test_round_trip(self, events):
+        """Test that decoding gives back the same objects as the /events JSON."""
+        assert compact.decode(compact.encode(events)) == [as_dict(event) for event in events]
+
+    def test_repeated_values_are_stored_once(self, events):
+        """Test that shared strings and coordinates appear once in their tables."""
+        data = compact.encode(events)
+
+        assert data["count"] == 4
+        assert data["strings"].count("Open to all.") == 1
+        assert data["strings"].count("Library") == 1
+        assert data["coords"] == [[44.93855, -93.16822], [44.93712, -93.16928]]
+        assert data["columns"]["location"][0] == data["columns"]["location"][1]
+        assert data["columns"]["coord"][3] is None
+        assert data["columns"]["id"] == ["a", "b", "c", "d"]
+
+    def test_empty(self):
+        """Test that no events encode to empty tables and decode to an empty list."""
+        data = compact.encode([])
+
+        assert data["strings"] == [] and data["coords"] == []
+        assert compact.decode(data) == []
+
+    @pytest.mark.parametrize("mimetype", compact.MIMETYPES)
+    def test_serialized_round_trip(self, events, mimetype):
+        """Test that every offered format loads back to the same encoded dict."""
+        data = compact.encode(events)
+
+        assert compact.loads(compact.dumps(data, mimetype), mimetype) == data
+
+
+class TestInterning:
+    """Test cases for the strings and coordinates shared between entries."""
+
+    def test_parsed_fields_are_shared(self, events):
+        """Test that entries parsed separately hold the same string objects."""
+        assert events[0].location is events[1].location
+        assert events[0].desc is events[1].desc
+        assert events[0].date is events[2].date
+
+    def test_rebuilt_entries_share_coordinates(self):
+        """Test that entries rebuilt from worker or database rows share one coordinate list."""
+        rows = [("x", "T", "l", None, "Library", "d", None, None, [44.93855, -93.16822], "Same text"),
+                ("y", "T", "l", None, "Library", "d", None, None, [44.93855, -93.16822], "Same text")]
+        first, second = (EventEntry.from_parsed(*row) for row in rows)
+
+        assert first.coord is second.coord
+        assert first.desc is second.desc
+
+    def test_free_text_can_be_dropped(self):
+        """Test that titles and descriptions are shared through a table of compact, not the immortal
+        sys.intern table, and that retain_texts forgets the ones no event carries any more."""
+        kept, dropped = "".join(["Kept ", "description"]), "".join(["Edited ", "description"])
+        assert compact.intern_text(kept) is kept
+        assert compact.intern_text(dropped) is dropped
+
+        compact.retain_texts([kept])
+
+        assert compact.intern_text("".join(["Kept ", "description"])) is kept
+        assert dropped not in compact._texts
@@ -0,0 +1,90 @@
+import json
+import os
+import random
+import pytest
+from benchmarks import legacy, synthetic
+from description import clean_description
+from event_entry import EventEntry
+
+GOLDEN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "parse_golden.json")
+
+
+def description_body(summary):
+    """Joins the non-header fragments of summary the way EventEntry.parse_summary does."""
+    fragments = summary.split(">")
+    return ">".join(sub for sub in fragments if not (sub.endswith("strong") and sub != fragments[0]))
+
+
+# ============================================================================
+# GOLDEN OUTPUT TESTS
+# ============================================================================
+
+with open(GOLDEN, encoding="utf-8") as golden_file:
+    GOLDEN_ROWS = json.load(golden_file)
+
+
+class TestGoldenCorpus:
+    """Test cases comparing parsed entries against outputs recorded from the original parser."""
+
+    @pytest.mark.parametrize("row", GOLDEN_ROWS, ids=[str(row["id"])[-12:] for row in GOLDEN_ROWS])
+    def test_entry_matches_golden_output(self, row):
+        """Test that every parsed field matches the recorded output of the original parser."""
+        event = EventEntry(row["id"], row["title"], row["link"], row["summary"])
+
+        parsed = {field: getattr(event, field) for field in row["expected"]}
+
+        assert parsed == row["expected"]
+
+    def test_matches_original_chain_on_synthetic_feed(self):
+        """Test that clean_description matches the original re.sub chain on a fresh synthetic feed."""
+        for _, _, _, summary in synthetic.entries(2000, seed=7, paragraphs=5):
+            assert clean_description(description_body(summary)) == legacy.parse_summary_desc(summary)
+
+    def test_matches_original_chain_on_tag_soup(self):
+        """Test that rule order is preserved on malformed input where removals glue text together."""
+        pieces = ["<p", "</p", "<strong", "</strong", "<span style=\"x\"", "</span", "<em", "<li", "</ul",
+                  "<br /", "<a href='https://www.x.edu/a/b'", " ", "\n", "\t", "p", "p.", "li", "ul", " em ",
+                  " b ", " i ", " br ", "nbsp;", "&amp;", "Sponsored by:", "text", "span", "x/y", "\xa0"]
+        rng = random.Random(494)
+        for _ in range(5000):
+            summary = "".join(rng.choice(pieces) + rng.choice(["", "", ">"]) for _ in range(rng.randint(1, 12)))
+
+            assert clean_description(description_body(summary)) == legacy.parse_summary_desc(summary)
+
+
+# ============================================================================
+# DESCRIPTION CLEANING TESTS
+# ============================================================================
+
+class TestCleanDescription:
+    """Test cases for individual rules of the description cleaner."""
+
+    def test_paragraph_fragments_are_joined(self):
+        """Test that text from separate paragraphs is concatenated without separators."""
+        assert clean_description("<p>One</p><p>Two</p") == "OneTwo"
+
+    def test_tags_and_attributes_are_removed(self):
+        """Test that tag names and href attributes are dropped while other text is kept."""
+        body = "<p>See <a href=\"https://www.macalester.edu/events\">the page</a</p"
+
+        assert clean_description(body) == "Seethe page"
+
+    def test_list_words_become_bullets(self):
+        """Test that bare "li" and "ul" words become a bullet and a newline."""
+        assert clean_description("first li item ul last") == "first • item\nlast"
+
+    def test_sponsor_is_kept(self):
+        """Test that the sponsor line survives with normalized spacing."""
+        assert clean_description("<p>Sponsored by:   Program Board</p") == "Sponsored by: Program Board"
+
+    def test_whitespace_is_collapsed(self):
+        """Test that runs of spaces and tabs collapse and lines are trimmed."""
+        assert clean_description("one \t two  \n  three") == "one two\nthree"
+
+    def test_amp_entities_are_unescaped(self):
+        """Test that leftover amp; entities become ampersands."""
+        assert clean_description("Q&amp;A") == "Q&&A"
+
+    def test_empty_body(self):
+        """Test that an empty body yields an empty description."""
+        assert clean_description("") == ""
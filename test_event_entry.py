@@ -1,5 +1,77 @@
+import pytest
+from unittest.mock import patch
+import event_entry
 from event_entry import EventEntry
 
-event = EventEntry()
+SUMMARY = "<strong>November 15, 2025 | 2:00 PM &#8211; 4:00 PM | Library</strong><p>Event description</p>"
 
-print(event)
\ No newline at end of file
+
+class TestLazyFields:
+    """Test cases for the slotted EventEntry and its lazily computed fields."""
+
+    def test_empty_entry_has_placeholders(self):
+        """Test that an entry made without arguments prints its placeholder fields."""
+        text = str(EventEntry())
+
+        assert "Title: Title unavailable" in text
+        assert "Location: Location unavailable" in text
+        assert "Link: No available link" in text
+
+    def test_entries_have_no_instance_dict(self):
+        """Test that entries are slotted instead of carrying a per-instance __dict__."""
+        entry = EventEntry("id", "Title", "link", SUMMARY)
+
+        assert not hasattr(entry, "__dict__")
+        with pytest.raises(AttributeError):
+            entry.unknown_field = 1
+
+    def test_desc_is_built_on_first_access(self):
+        """Test that the description is only cleaned when read, and then cached."""
+        with patch('event_entry.clean_description', return_value="Event description") as mock_clean:
+            entry = EventEntry("id", "Title", "link", SUMMARY)
+            mock_clean.assert_not_called()
+
+            assert entry.desc == "Event description"
+            assert entry.desc == "Event description"
+
+        mock_clean.assert_called_once()
+        assert entry.summary is None
+
+    def test_desc_read_while_another_thread_builds_it(self):
+        """Test that a reader that saw desc pending, after another thread built it and dropped the
+        summary, returns the built description instead of failing on the missing summary."""
+        reads = iter([event_entry._PENDING, "Event description"]) # Pending when checked, built when read again
+        entry = EventEntry("id", "Title", "link", SUMMARY)
+        entry.summary = None
+
+        with patch.object(EventEntry, '_desc', property(lambda self: next(reads))):
+            assert entry.desc == "Event description"
+
+    def test_coord_and_times_are_built_on_first_access(self):
+        """Test that coordinates and 24 hour times are resolved lazily from the header."""
+        entry = EventEntry("id", "Title", "link", SUMMARY)
+
+        with patch.object(EventEntry, 'get_location_coords', return_value=[1, 2]) as mock_coords:
+            assert entry.coord == [1, 2]
+            assert entry.coord == [1, 2]
+        mock_coords.assert_called_once_with("Library")
+
+        assert (entry.start_time, entry.end_time) == ("14:00", "16:00")
+
+    def test_fields_can_be_assigned(self):
+        """Test that derived fields can still be set directly, as the app tests do."""
+        entry = object.__new__(EventEntry)
+        entry.desc = None
+        entry.coord = None
+        entry.start_time = "10:00"
+        entry.end_time = None
+
+        assert (entry.desc, entry.coord, entry.start_time, entry.end_time) == (None, None, "10:00", None)
+
+    def test_missing_header_leaves_coord_empty(self):
+        """Test that an entry without a header has no coordinates or times."""
+        entry = EventEntry("id", "Title", "link", "<p>No header</p>")
+
+        assert entry.coord is None
+        assert entry.start_time is None and entry.end_time is None
+        assert entry.desc == "No header"
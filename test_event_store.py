@@ -0,0 +1,211 @@
+import base64
+import pytest
+from datetime import date, datetime
+from event_entry import EventEntry
+from event_store import EventIndex, SortedEvents, decode_cursor, encode_cursor, sort_key
+from event_times import parse_event_date
+
+
+def make_event(event_id, day, time, location, text="Description"):
+    """Create an EventEntry from a summary shaped like the Mac RSS feed."""
+    header = f"{day} | {time} | {location}" if time else f"{day} | {location}"
+    return EventEntry(event_id, f"Event {event_id}", f"https://example.com/{event_id}",
+                      f"<strong>{header}</strong><p>{text}</p>")
+
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+@pytest.fixture
+def events():
+    return [
+        make_event("c", "November 16, 2025", "2:00 PM - 3:00 PM", "Library"),
+        make_event("a", "November 15, 2025", "7:00 PM - 9:00 PM", "Kagin Commons", "Dance party"),
+        make_event("b", "November 15, 2025", "9:00 AM - 10:00 AM", "Library 2nd floor"),
+        make_event("d", "November 20, 2025", None, "Minneapolis"),
+        make_event("e", "Sometime soon", "1:00 PM - 2:00 PM", "Library"),
+    ]
+
+@pytest.fixture
+def index(events):
+    return EventIndex(events, EventEntry.location_resolver)
+
+
+def ids(found):
+    return [event.id for event in found]
+
+
+# ============================================================================
+# SORT KEY TESTS
+# ============================================================================
+
+class TestSortKey:
+    """Test cases for the chronological sort key."""
+
+    def test_parse_event_date(self):
+        """Test that feed dates parse and anything else is None."""
+        assert parse_event_date("November 15, 2025") == date(2025, 11, 15)
+        assert parse_event_date(" June 3, 2026 ") == date(2026, 6, 3)
+        assert parse_event_date("Date unavailable") is None
+        assert parse_event_date(None) is None
+
+    def test_events_sort_by_date_then_start_time(self, index):
+        """Test that the index orders events by day, then start time, with undated events last."""
+        assert ids(index.events) == ["b", "a", "c", "d", "e"]
+
+    def test_untimed_events_sort_first_on_their_day(self):
+        """Test that an event without a start time comes before timed events on the same day."""
+        timed = make_event("x", "May 1, 2026", "8:00 AM - 9:00 AM", "Library")
+        untimed = make_event("y", "May 1, 2026", None, "Library")
+
+        assert sort_key(untimed) < sort_key(timed)
+
+    def test_starts_at(self):
+        """Test that starts_at combines the feed date and start time."""
+        assert make_event("x", "May 1, 2026", "8:30 PM - 9:00 PM", "Library").starts_at == datetime(2026, 5, 1, 20, 30)
+        assert make_event("y", "May 1, 2026", None, "Library").starts_at == datetime(2026, 5, 1)
+        assert make_event("z", "Sometime soon", None, "Library").starts_at is None
+
+    def test_cursor_round_trip(self):
+        """Test that cursors decode to the key they encode and reject garbage."""
+        key = (739205, 540, "event/1")
+
+        assert decode_cursor(encode_cursor(key)) == key
+        with pytest.raises(ValueError):
+            decode_cursor("not a cursor")
+
+    def test_cursor_with_infinite_numbers_is_invalid(self):
+        """Test that a cursor whose JSON holds Infinity is rejected like any other malformed cursor."""
+        cursor = base64.urlsafe_b64encode(b'[Infinity, 0, "event/1"]').decode("ascii")
+
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+
+# ============================================================================
+# SORTED EVENTS TESTS
+# ============================================================================
+
+class TestSortedEvents:
+    """Test cases for the bisect-maintained event order."""
+
+    def test_add_and_remove_keep_order(self, events):
+        """Test that inserting and removing events keeps the keys and events sorted."""
+        ordered = SortedEvents(events[:2])
+        for event in events[2:]:
+            ordered.add(event)
+
+        assert ids(ordered) == ["b", "a", "c", "d", "e"]
+        assert ordered.keys == sorted(ordered.keys)
+
+        assert ordered.remove(events[0])
+        assert not ordered.remove(events[0])
+        assert ids(ordered) == ["b", "a", "d", "e"]
+
+    def test_remove_matches_identity(self):
+        """Test that only the given object is removed when another event shares its key."""
+        first = make_event("x", "May 1, 2026", "8:00 AM - 9:00 AM", "Library")
+        twin = make_event("x", "May 1, 2026", "8:00 AM - 9:00 AM", "Library")
+        ordered = SortedEvents([first, twin])
+
+        ordered.remove(twin)
+
+        assert ordered.events == [first]
+
+    def test_copy_is_independent(self, events):
+        """Test that changing a copy leaves the original alone."""
+        ordered = SortedEvents(events)
+        copied = ordered.copy()
+        copied.remove(events[0])
+
+        assert len(ordered) == 5
+        assert len(copied) == 4
+
+
+# ============================================================================
+# QUERY TESTS
+# ============================================================================
+
+class TestQuery:
+    """Test cases for filtered and paginated queries."""
+
+    def test_date_range_is_inclusive(self, index):
+        """Test that from/to include both end days."""
+        found, _ = index.query(start=date(2025, 11, 15), end=date(2025, 11, 16))
+
+        assert ids(found) == ["b", "a", "c"]
+
+    def test_location_uses_building_index(self, index):
+        """Test that a building name matches every location in that building."""
+        found, _ = index.query(location="library")
+
+        assert ids(found) == ["b", "c", "e"]
+
+    def test_location_falls_back_to_substring(self, index):
+        """Test that a location that is not a campus building is matched as text."""
+        found, _ = index.query(location="minneap")
+
+        assert ids(found) == ["d"]
+
+    def test_text_search(self, index):
+        """Test that q matches the title, location and description."""
+        assert ids(index.query(text="DANCE")[0]) == ["a"]
+        assert ids(index.query(text="kagin")[0]) == ["a"]
+
+    def test_filters_combine(self, index):
+        """Test that all given filters must match."""
+        found, _ = index.query(start=date(2025, 11, 16), location="Library")
+
+        assert ids(found) == ["c", "e"]
+
+    def test_pagination_walks_every_event_once(self, index):
+        """Test that following cursors returns every match exactly once."""
+        pages = []
+        after = None
+        while True:
+            found, cursor = index.query(limit=2, after=after)
+            pages.append(ids(found))
+            if cursor is None:
+                break
+            after = decode_cursor(cursor)
+
+        assert pages == [["b", "a"], ["c", "d"], ["e"]]
+
+    def test_cursor_is_stable_across_refresh(self, events):
+        """Test that a cursor from one snapshot continues correctly in the next one."""
+        first = EventIndex(events, EventEntry.location_resolver)
+        _, cursor = first.query(limit=2)
+
+        refreshed = [make_event("early", "November 1, 2025", "1 PM - 2 PM", "Library")] + events[1:]
+        second = EventIndex(refreshed, EventEntry.location_resolver)
+        found, _ = second.query(limit=2, after=decode_cursor(cursor))
+
+        assert ids(found) == ["d", "e"]
+
+    def test_upcoming_skips_past_and_ended_events(self, index):
+        """Test that with now, events that ended earlier today, past days and undated events are skipped."""
+        found, _ = index.query(now=datetime(2025, 11, 15, 12, 0))
+
+        assert ids(found) == ["a", "c", "d"]
+
+    def test_upcoming_keeps_events_running_past_midnight(self):
+        """Test that an event ending after midnight is still upcoming later on its day."""
+        index = EventIndex([make_event("hours", "November 15, 2025", "7:30 AM - 2:00 AM", "Library"),
+                            make_event("late", "November 15, 2025", "10:00 PM - 1:00 AM", "Kagin Commons")],
+                           EventEntry.location_resolver)
+
+        assert ids(index.query(now=datetime(2025, 11, 15, 12, 0))[0]) == ["hours", "late"]
+        assert ids(index.query(now=datetime(2025, 11, 15, 23, 0))[0]) == ["hours", "late"]
+
+    def test_upcoming_keeps_yesterdays_events_until_they_end(self):
+        """Test that events from the day before are listed while they run past midnight, and only then."""
+        index = EventIndex([make_event("hours", "November 14, 2025", "7:30 AM - 2:00 AM", "Library"),
+                            make_event("late", "November 14, 2025", "10:00 PM - 1:00 AM", "Kagin Commons"),
+                            make_event("evening", "November 14, 2025", "7:00 PM - 9:00 PM", "Library"),
+                            make_event("allday", "November 14, 2025", None, "Library")],
+                           EventEntry.location_resolver)
+
+        assert ids(index.query(now=datetime(2025, 11, 15, 0, 30))[0]) == ["hours", "late"]
+        assert ids(index.query(now=datetime(2025, 11, 15, 1, 30))[0]) == ["hours"]
+        assert ids(index.query(now=datetime(2025, 11, 15, 3, 0))[0]) == []
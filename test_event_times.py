@@ -0,0 +1,69 @@
+import pytest
+from unittest.mock import patch
+from benchmarks import legacy
+import event_times
+from event_times import format_24_hour, parse_time_range
+
+
+@pytest.fixture(autouse=True)
+def empty_memo():
+    parse_time_range.cache_clear()
+    yield
+    parse_time_range.cache_clear()
+
+
+# ============================================================================
+# TIME PARSING TESTS
+# ============================================================================
+
+class TestParseTimeRange:
+    """Test cases for converting time ranges to 24 hour start and end times."""
+
+    @pytest.mark.parametrize("time", [
+        "2:00 PM - 4:00 PM", "9am - 5pm", "12 AM - 12 PM", "12:30am-1:05PM", "7:30PM - 9PM",
+        "10:00 AM  -  4:00 PM", "1:5 pm - 2:05 Pm", "8 AM - 10 PM", "09:00 AM - 09:30 AM",
+        "13:00 PM - 2 PM", "0:30 AM - 1 AM", "2:60 PM - 3 PM", "noon - 1 PM", "2 PM", "1-2-3",
+        "2:00\xa0PM - 4:00 PM", "2:00 P.M. - 4:00 P.M.", "", None, " - ", "2:00 PM -", "002:00 PM - 3 PM",
+        "٢:00 PM - 3 PM", "2 : 00 PM - 3 PM", "2:00 PMX - 3 PM", "12:00 AM - 11:59 PM",
+    ])
+    def test_matches_strptime_implementation(self, time):
+        """Test that results are identical to the original strptime-only implementation."""
+        assert parse_time_range(time) == legacy.time_start_end(time)
+
+    def test_every_clock_time_matches_strptime(self):
+        """Test the fast path against strptime for every hour, minute and meridiem spelling."""
+        for hour in ["1", "01", "9", "09", "10", "12"]:
+            for minute in ["", ":0", ":00", ":05", ":30", ":59"]:
+                for space in ["", " ", "  "]:
+                    for meridiem in ["AM", "pm", "Am", "pM"]:
+                        time = f"{hour}{minute}{space}{meridiem}"
+                        assert format_24_hour(time) == legacy.time_start_end(f"{time} - 1 AM")[0]
+
+    def test_common_shapes_skip_strptime(self):
+        """Test that the usual "H:MM AM" shapes are parsed without strptime."""
+        with patch.object(event_times, 'datetime') as mock_datetime:
+            assert parse_time_range("2:00 PM - 4 pm") == ("14:00", "16:00")
+
+        mock_datetime.strptime.assert_not_called()
+
+    def test_unusual_input_falls_back_to_strptime(self):
+        """Test that input outside the fast path still gets the strptime result."""
+        assert format_24_hour("2:00 PM") == "14:00"
+
+    def test_results_are_memoized(self):
+        """Test that a repeated time string is served from the memo."""
+        parse_time_range("2:00 PM - 4:00 PM")
+        parse_time_range("2:00 PM - 4:00 PM")
+
+        info = parse_time_range.cache_info()
+        assert info.hits == 1
+        assert info.misses == 1
+
+    def test_memo_is_bounded(self):
+        """Test that the memo does not grow past its size limit."""
+        for minute in range(60):
+            for hour in range(1, 13):
+                for day in range(2):
+                    parse_time_range(f"{hour}:{minute:02d} {'AM' if day else 'PM'} - 11 PM")
+
+        assert parse_time_range.cache_info().currsize == event_times.TIME_MEMO_SIZE
@@ -1,5 +1,8 @@
+import threading
+import time
 import pytest
 from unittest.mock import patch
+import compact
 import events_feed as feed
 from event_entry import EventEntry
 
@@ -22,6 +25,14 @@ class MockRSSEntry:
 # FIXTURES
 # ============================================================================
 
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    """Start every test as if the feed had just been updated, with nothing parsed yet."""
+    feed.clear_cache()
+    yield
+    feed.clear_cache()
+
+
 @pytest.fixture
 def mock_rss_entry():
     """Create a mock RSS entry as returned by reader.get_entries()."""
@@ -124,4 +135,381 @@ class TestGetEvents:
         events = feed.get_events()
 
         assert len(events) == 1
-        assert isinstance(events[0], EventEntry)
\ No newline at end of file
+        assert isinstance(events[0], EventEntry)
+
+
+# ============================================================================
+# PARSED ENTRY CACHE TESTS
+# ============================================================================
+
+class TestParsedEntryCache:
+    """Test cases for reusing parsed EventEntry objects between feed updates."""
+
+    @patch('events_feed.reader.get_entries')
+    def test_steady_state_returns_cached_list(self, mock_get_entries, mock_rss_entries):
+        """Test that repeated calls without a feed update do not read or parse the feed again."""
+        mock_get_entries.return_value = mock_rss_entries
+
+        first = feed.get_events()
+        second = feed.get_events()
+
+        assert first is second
+        mock_get_entries.assert_called_once()
+
+    @patch('events_feed.reader.get_entries')
+    def test_invalidate_reparses_only_changed_entries(self, mock_get_entries, mock_rss_entries):
+        """Test that after a feed update only entries whose content changed are parsed again."""
+        mock_get_entries.return_value = mock_rss_entries
+        first = feed.get_events()
+
+        changed = MockRSSEntry(
+            id="rss-id-456",
+            title="Another RSS Event (moved)",
+            link="https://webapps.macalester.edu/event/456",
+            summary="<strong>November 20, 2025 | 10:00 AM - 12:00 PM | Weyerhaeuser Memorial Chapel</strong><p>Another event</p>"
+        )
+        mock_get_entries.return_value = [mock_rss_entries[0], changed]
+        feed.invalidate()
+
+        with patch('events_feed.EventEntry', wraps=EventEntry) as mock_event_entry:
+            second = feed.get_events()
+
+        mock_event_entry.assert_called_once_with(changed.id, changed.title, changed.link, changed.summary)
+        assert second[0] is first[0]
+        assert second[1].location == "Weyerhaeuser Memorial Chapel"
+
+    @patch('events_feed.reader.get_entries')
+    def test_entries_removed_from_feed_are_evicted(self, mock_get_entries, mock_rss_entries):
+        """Test that entries no longer in the feed are dropped from the cache."""
+        mock_get_entries.return_value = mock_rss_entries
+        feed.get_events()
+
+        mock_get_entries.return_value = mock_rss_entries[:1]
+        feed.invalidate()
+        events = feed.get_events()
+
+        assert [event.id for event in events] == ["rss-id-123"]
+        assert "rss-id-456" not in feed._cache
+
+    @patch('events_feed.PARSE_WORKERS', 1)
+    @patch('events_feed.reader.get_entries')
+    def test_large_feeds_are_not_parsed_again(self, mock_get_entries):
+        """Test that an unchanged refresh of a feed with tens of thousands of entries reuses every one of them."""
+        summary = "<strong>November 15, 2025 | Library</strong><p>Event</p>"
+        entries = [MockRSSEntry(f"id-{number}", f"Event {number}", f"https://example.com/{number}", summary)
+                   for number in range(25000)]
+        mock_get_entries.return_value = entries
+        feed.get_events()
+        hits, misses = feed._cache.hits, feed._cache.misses
+
+        feed.invalidate()
+        with patch('events_feed.EventEntry', wraps=EventEntry) as mock_event_entry:
+            feed.get_events()
+
+        mock_event_entry.assert_not_called()
+        assert (feed._cache.hits - hits, feed._cache.misses - misses) == (25000, 0)
+        assert len(feed._cache) == 25000
+
+    @patch('events_feed.reader.get_entries')
+    def test_texts_of_edited_entries_are_forgotten(self, mock_get_entries, mock_rss_entries):
+        """Test that a refresh drops the shared copy of a description that was edited away."""
+        mock_get_entries.return_value = mock_rss_entries
+        old = feed.get_events()[1].desc
+        assert old in compact._texts
+
+        edited = MockRSSEntry(mock_rss_entries[1].id, mock_rss_entries[1].title, mock_rss_entries[1].link,
+                              mock_rss_entries[1].summary.replace("</p>", " (edited)</p>"))
+        mock_get_entries.return_value = [mock_rss_entries[0], edited]
+        feed.invalidate()
+        feed.get_events()
+
+        assert old not in compact._texts
+        assert mock_rss_entries[0].title in compact._texts
+
+    def test_cache_misses_on_changed_fingerprint(self):
+        """Test that a cached entry is not reused when its content fingerprint changed."""
+        cache = feed.ParsedEntryCache()
+        cache.put("a", "fp-old", "event-a")
+
+        assert cache.get("a", "fp-new") is None
+        assert cache.misses == 1
+
+    def test_fingerprint_tracks_parsed_fields(self, mock_rss_entry):
+        """Test that the fingerprint changes with the summary and is stable otherwise."""
+        same = MockRSSEntry(mock_rss_entry.id, mock_rss_entry.title, mock_rss_entry.link, mock_rss_entry.summary)
+        edited = MockRSSEntry(mock_rss_entry.id, mock_rss_entry.title, mock_rss_entry.link, "<p>Edited</p>")
+
+        assert feed.entry_fingerprint(mock_rss_entry) == feed.entry_fingerprint(same)
+        assert feed.entry_fingerprint(mock_rss_entry) != feed.entry_fingerprint(edited)
+
+# ============================================================================
+# SNAPSHOT GENERATION TESTS
+# ============================================================================
+
+class TestEventSnapshot:
+    """Test cases for feed generations of the parsed snapshot."""
+
+    @patch('events_feed.reader.get_entries')
+    def test_unchanged_feed_keeps_generation(self, mock_get_entries, mock_rss_entries):
+        """Test that a feed update with no content changes keeps the same snapshot."""
+        mock_get_entries.return_value = mock_rss_entries
+        first = feed.get_events()
+
+        feed.invalidate()
+        second = feed.get_events()
+
+        assert second is first
+        assert second.generation == first.generation
+
+    @patch('events_feed.reader.get_entries')
+    def test_changed_feed_advances_generation(self, mock_get_entries, mock_rss_entries):
+        """Test that a feed update with changed content produces a new generation."""
+        mock_get_entries.return_value = mock_rss_entries
+        first = feed.get_events()
+
+        mock_get_entries.return_value = mock_rss_entries[:1]
+        feed.invalidate()
+        second = feed.get_events()
+
+        assert second.generation == first.generation + 1
+        assert second.derived == {}
+
+    @patch('events_feed.reader.get_entries')
+    def test_snapshot_order_is_maintained_incrementally(self, mock_get_entries, mock_rss_entries):
+        """Test that added and removed entries keep the snapshot's chronological order."""
+        mock_get_entries.return_value = mock_rss_entries
+        first = feed.get_events()
+
+        earlier = MockRSSEntry("rss-id-000", "Earlier", "https://webapps.macalester.edu/event/0",
+                               "<strong>November 1, 2025 | 9:00 AM - 10:00 AM | Library</strong><p>Early</p>")
+        mock_get_entries.return_value = [earlier] + mock_rss_entries[1:]
+        feed.invalidate()
+        second = feed.get_events()
+
+        assert [event.id for event in second.ordered] == ["rss-id-000", "rss-id-456"]
+        assert second.ordered.keys == sorted(second.ordered.keys)
+        assert [event.id for event in first.ordered] == ["rss-id-123", "rss-id-456"]
+
+    @patch('events_feed.reader.get_entries')
+    def test_search_index_follows_feed_updates(self, mock_get_entries, mock_rss_entries):
+        """Test that the search index is built once and then re-indexes only changed entries."""
+        mock_get_entries.return_value = mock_rss_entries
+        index = feed.search_index(feed.get_events())
+        assert [event.id for _, event in index.search("rss event")] == ["rss-id-123", "rss-id-456"]
+
+        changed = MockRSSEntry("rss-id-123", "Renamed Concert", mock_rss_entries[0].link, mock_rss_entries[0].summary)
+        mock_get_entries.return_value = [changed, mock_rss_entries[1]]
+        feed.invalidate()
+        with patch.object(index, "_add", wraps=index._add) as add:
+            assert feed.search_index(feed.get_events()) is index
+        assert add.call_count == 1
+        assert [event.id for _, event in index.search("concert")] == ["rss-id-123"]
+        assert [event.id for _, event in index.search("rss event")] == ["rss-id-456"]
+
+
+# ============================================================================
+# BATCH INGEST TESTS
+# ============================================================================
+
+class TestParseEntries:
+    """Test cases for parse_entries()."""
+
+    def test_small_batches_parse_serially(self):
+        """Test that batches below PARALLEL_MIN_ENTRIES are parsed in this process."""
+        entries = [("id-1", "Title", "link", "<strong>November 15, 2025 | Library</strong><p>Text</p>")]
+        with patch('events_feed.ProcessPoolExecutor') as mock_pool:
+            events = feed.parse_entries(entries, workers=4)
+
+        mock_pool.assert_not_called()
+        assert [event.id for event in events] == ["id-1"]
+
+    def test_process_pool_matches_serial_parse(self):
+        """Test that parsing in worker processes gives the same fields, in the same order."""
+        from benchmarks import synthetic
+        entries = synthetic.entries(40)
+        with patch('events_feed.PARALLEL_MIN_ENTRIES', 10):
+            parallel = feed.parse_entries(entries, workers=2, chunk_size=7)
+        serial = feed.parse_entries(entries, workers=1)
+
+        fields = ("id", "title", "link", "time", "location", "date", "start_time", "end_time", "coord", "desc")
+        assert [[getattr(event, name) for name in fields] for event in parallel] == \
+               [[getattr(event, name) for name in fields] for event in serial]
+
+    def test_workers_are_not_forked(self):
+        """Test that the pool starts its workers without forking this multi-threaded process."""
+        entries = [("id-1", "Title", "link", "<strong>November 15, 2025 | Library</strong><p>Text</p>")] * 2
+        with patch('events_feed.PARALLEL_MIN_ENTRIES', 1), patch('events_feed.ProcessPoolExecutor') as mock_pool:
+            mock_pool.return_value.__enter__.return_value.map.return_value = []
+            feed.parse_entries(entries, workers=2)
+
+        assert mock_pool.call_args.kwargs["mp_context"].get_start_method() in ("forkserver", "spawn")
+
+    def test_fork_server_only_preloads_the_parser(self):
+        """Test that the fork server imports event_entry rather than __main__ (e.g. all of app.py) before forking workers."""
+        with patch('events_feed.PARSE_START_METHOD', "forkserver"), \
+             patch('events_feed.multiprocessing.get_context') as mock_get_context:
+            context = feed._parse_context()
+
+        mock_get_context.assert_called_once_with("forkserver")
+        context.set_forkserver_preload.assert_called_once_with(["event_entry"])
+
+
+# ============================================================================
+# CHANGE LOG TESTS
+# ============================================================================
+
+class TestChangeLog:
+    """Test cases for the per-generation change log behind /events/changes."""
+
+    def test_changes_are_collapsed_across_generations(self):
+        """Test that the net change per entry is reported, whatever happened in between."""
+        log = feed.ChangeLog()
+        log.record(1, None, [("a", 1), ("b", 1), ("c", 1)])
+        log.record(2, [("a", 1), ("b", 1), ("c", 1)], [("a", 2), ("c", 1), ("d", 1)])
+        log.record(3, [("a", 2), ("c", 1), ("d", 1)], [("a", 2), ("b", 1), ("e", 1)])
+
+        assert log.since(1, 3) == {"a": "updated", "b": "updated", "c": "removed", "e": "added"}
+        assert log.since(2, 3) == {"b": "added", "c": "removed", "d": "removed", "e": "added"}
+        assert log.since(3, 3) == {}
+        assert log.since(1, 2) == {"a": "updated", "b": "removed", "d": "added"}
+
+    def test_tokens_expire_with_retention(self):
+        """Test that tokens older than the retained generations, or from another log, are refused."""
+        log = feed.ChangeLog(max_generations=2)
+        log.record(1, None, [("a", 1)])
+        for generation in range(2, 5):
+            log.record(generation, [("a", generation - 1)], [("a", generation)])
+
+        assert log.parse(log.token(1), 4) is None
+        assert log.parse(log.token(2), 4) == 2
+        assert log.parse(log.token(5), 4) is None
+        assert log.parse(feed.ChangeLog().token(2), 4) is None
+        assert log.parse("garbage", 4) is None
+
+    def test_skipped_generations_need_a_resync(self):
+        """Test that tokens for generations a follower never loaded are refused, not answered with a partial delta."""
+        log = feed.ChangeLog()
+        log.record(4, None, [("a", 1)])
+        log.record(7, [("a", 1)], [("a", 2), ("b", 1)]) # 5 and 6 were published between two checks
+
+        assert log.parse(log.token(4), 7) == 4
+        assert log.parse(log.token(5), 7) is None
+        assert log.parse(log.token(6), 7) is None
+        assert log.parse(log.token(7), 7) == 7
+
+    @patch('events_feed.reader.get_entries')
+    def test_snapshot_builds_are_logged(self, mock_get_entries, mock_rss_entries):
+        """Test that get_events() records each new generation's changes."""
+        mock_get_entries.return_value = mock_rss_entries
+        first = feed.get_events()
+        token = feed.change_token(first)
+
+        mock_get_entries.return_value = mock_rss_entries[1:]
+        feed.invalidate()
+        second = feed.get_events()
+
+        assert feed.changes_since(second, token) == (first.generation, {"rss-id-123": "removed"})
+        assert feed.changes_since(second, feed.change_token(second)) == (second.generation, {})
+
+
+class TestSingleFlight:
+    """Test cases for coalescing concurrent snapshot rebuilds and artifact builds."""
+
+    REQUESTS = 200
+
+    def concurrently(self, call):
+        """Run call() from REQUESTS threads released at the same moment, returning their results."""
+        barrier = threading.Barrier(self.REQUESTS)
+        results = [None] * self.REQUESTS
+
+        def run(number):
+            barrier.wait()
+            results[number] = call()
+        threads = [threading.Thread(target=run, args=(number,)) for number in range(self.REQUESTS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    @pytest.fixture
+    def slow_parse(self):
+        """Count parses, each slow enough for every request to arrive while it runs."""
+        real_parse = feed.parse_entries
+
+        def parse(entries):
+            time.sleep(0.05)
+            return real_parse(entries)
+        with patch('events_feed.parse_entries', side_effect=parse) as mock_parse:
+            yield mock_parse
+
+    def serve(self, builds):
+        """What a request does: get the snapshot, then its serialized body."""
+        events = feed.get_events()
+
+        def build():
+            time.sleep(0.02)
+            builds.append(events.generation)
+            return [event.id for event in events]
+        return events, feed.derived(events, "body", build)
+
+    def test_errors_are_shared(self):
+        """Test that callers waiting on a failed call get its exception, and the next call runs again."""
+        flights = feed.SingleFlight()
+        started = threading.Event()
+
+        def fail():
+            started.set()
+            time.sleep(0.05)
+            raise ValueError("feed down")
+        first = threading.Thread(target=lambda: pytest.raises(ValueError, flights.run, "key", fail))
+        first.start()
+        started.wait()
+        with pytest.raises(ValueError):
+            flights.run("key", fail)
+        first.join()
+
+        assert flights.run("key", lambda: "ok") == "ok"
+        assert flights.calls == 2
+
+    @patch('events_feed.reader.get_entries')
+    def test_one_parse_per_generation(self, mock_get_entries, mock_rss_entries, slow_parse):
+        """Test that 200 concurrent requests parse and serialize each generation exactly once."""
+        builds = []
+        mock_get_entries.return_value = mock_rss_entries
+        first = self.concurrently(lambda: self.serve(builds))
+
+        mock_get_entries.return_value = mock_rss_entries + [MockRSSEntry(
+            "rss-id-789", "New", "https://webapps.macalester.edu/event/789",
+            "<strong>November 25, 2025 | Library</strong><p>New</p>")]
+        feed.invalidate()
+        second = self.concurrently(lambda: self.serve(builds))
+
+        assert slow_parse.call_count == 2
+        assert builds == [1, 2]
+        assert {id(events) for events, _ in first} == {id(first[0][0])}
+        assert {len(body) for _, body in second} == {3}
+
+    @patch('events_feed.reader.get_entries')
+    def test_current_snapshot_is_served_while_a_refresh_rebuilds(self, mock_get_entries, mock_rss_entries):
+        """Test that requests keep getting the last snapshot, without waiting, while rebuild() replaces it."""
+        mock_get_entries.return_value = mock_rss_entries
+        current = feed.get_events()
+        mock_get_entries.return_value = mock_rss_entries[:1]
+        parsing, release = threading.Event(), threading.Event()
+        real_parse = feed.parse_entries
+
+        def parse(entries):
+            parsing.set()
+            release.wait(5) # Held until every request was served
+            return real_parse(entries)
+        with patch('events_feed.parse_entries', side_effect=parse):
+            refresh = threading.Thread(target=feed.rebuild)
+            refresh.start()
+            parsing.wait(5)
+            served = self.concurrently(feed.get_events)
+            release.set()
+            refresh.join()
+
+        assert all(events is current for events in served)
+        assert [event.id for event in feed.get_events()] == ["rss-id-123"]
@@ -0,0 +1,120 @@
+import os
+import pytest
+from unittest.mock import Mock, patch
+from reader import ParseError, make_reader
+import events_feed as feed
+from feed_registry import DEFAULT_TIMEOUT, Feed, FeedRegistry, FeedTimeoutAdapter, parse_feed_list
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+@pytest.fixture
+def local_feeds(tmp_path, monkeypatch):
+    """Point events_feed at a scratch reader database with both stand-in calendars in fixtures/."""
+    local_reader = make_reader(str(tmp_path / "db.sqlite"), feed_root=FIXTURES)
+    monkeypatch.setenv("MACEVENTS_FEEDS", "athletics_rss.xml 5")
+    feed.clear_cache()
+    with patch.object(feed, 'reader', local_reader), patch.object(feed, 'feed_url', "events_rss.xml"):
+        yield local_reader
+    feed.clear_cache()
+    feed.feeds.clear()
+    local_reader.close()
+
+
+# ============================================================================
+# REGISTRY TESTS
+# ============================================================================
+
+class TestFeedRegistry:
+    """Test cases for the feed registry and its per-feed timeouts."""
+
+    def test_parse_feed_list(self):
+        """Test that MACEVENTS_FEEDS items take an optional timeout in seconds."""
+        assert parse_feed_list("https://a/rss 10, https://b/rss ,") == [
+            Feed("https://a/rss", 10.0), Feed("https://b/rss", DEFAULT_TIMEOUT)]
+        assert parse_feed_list("") == []
+
+    def test_rank_follows_registration_order(self):
+        """Test that feeds registered first win, and unknown feeds rank last."""
+        registry = FeedRegistry()
+        registry.register("first")
+        registry.register("second")
+
+        assert registry.rank("first") < registry.rank("second") < registry.rank("unknown")
+
+    def test_rank_before_any_feed_is_registered(self):
+        """Test that an empty registry ranks every feed alike instead of failing."""
+        assert FeedRegistry().rank("unknown") == 0
+
+    def test_adapter_sends_each_feed_with_its_timeout(self):
+        """Test that the adapter replaces the timeout with the one registered for the URL."""
+        registry = FeedRegistry()
+        registry.register("https://slow.example/rss", 30)
+        adapter = FeedTimeoutAdapter(registry)
+
+        with patch('requests.adapters.HTTPAdapter.send') as mock_send:
+            adapter.send(Mock(url="https://slow.example/rss"), timeout=1)
+            adapter.send(Mock(url="https://other.example/rss"))
+
+        assert [call.kwargs["timeout"] for call in mock_send.call_args_list] == [30, DEFAULT_TIMEOUT]
+
+    def test_install_adds_hook_once(self, tmp_path):
+        """Test that installing twice leaves a single request hook on the reader."""
+        registry = FeedRegistry()
+        local_reader = make_reader(str(tmp_path / "db.sqlite"))
+        registry.install(local_reader)
+        registry.install(local_reader)
+
+        hooks = local_reader._parser.session_factory.request_hooks
+        assert sum(getattr(hook, "__self__", None) is registry for hook in hooks) == 1
+        local_reader.close()
+
+
+# ============================================================================
+# MULTI-FEED TESTS
+# ============================================================================
+
+class TestMultipleFeeds:
+    """Test cases for merging several calendars into one events list."""
+
+    def test_add_feed_registers_configured_feeds(self, local_feeds):
+        """Test that add_feed registers feed_url first, then MACEVENTS_FEEDS with their timeouts."""
+        feed.add_feed()
+
+        assert list(feed.feeds) == [Feed("events_rss.xml", DEFAULT_TIMEOUT), Feed("athletics_rss.xml", 5.0)]
+        assert sorted(stored.url for stored in local_feeds.get_feeds()) == ["athletics_rss.xml", "events_rss.xml"]
+
+    def test_feeds_no_longer_listed_are_deleted(self, local_feeds, monkeypatch):
+        """Test that a feed removed from MACEVENTS_FEEDS is dropped from the reader."""
+        feed.add_feed()
+        monkeypatch.setenv("MACEVENTS_FEEDS", "")
+        feed.add_feed()
+
+        assert [stored.url for stored in local_feeds.get_feeds()] == ["events_rss.xml"]
+
+    def test_refresh_merges_and_deduplicates(self, local_feeds):
+        """Test that events from every feed are merged, an event in two feeds appearing once."""
+        feed.add_feed()
+        events = feed.refresh()
+
+        assert [event.title for event in events.ordered] == [
+            "Fall Concert", "Library hours: 8am-10pm", "Volleyball vs. St. Olaf", "Career Fair"]
+
+    def test_one_failing_feed_keeps_the_others(self, local_feeds, monkeypatch):
+        """Test that a feed that cannot be fetched is skipped, while the others still update."""
+        monkeypatch.setenv("MACEVENTS_FEEDS", "missing_rss.xml")
+        feed.add_feed()
+
+        assert len(feed.refresh()) == 3
+
+    def test_every_feed_failing_raises(self, local_feeds, monkeypatch):
+        """Test that refresh raises when no feed could be fetched, so the refresher backs off."""
+        monkeypatch.setenv("MACEVENTS_FEEDS", "")
+        with patch.object(feed, 'feed_url', "missing_rss.xml"):
+            feed.add_feed()
+            with pytest.raises(ParseError):
+                feed.refresh()
@@ -0,0 +1,140 @@
+import threading
+import time
+import pytest
+from datetime import timedelta
+from unittest.mock import patch
+import app as app_module
+import events_feed as feed
+from app import app
+
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def fresh_feed():
+    """Start every test with no snapshot and no refresh history."""
+    feed.clear_cache()
+    with patch.object(feed, 'status', feed.FeedStatus()), patch.object(feed, '_fresh_until', None):
+        yield
+    feed.clear_cache()
+
+
+@pytest.fixture
+def entries():
+    entry = type("Entry", (), dict(id="event/1", title="Event", link="https://example.com/1",
+                                   summary="<strong>January 5, 2025 | Library</strong><p>Details</p>"))()
+    with patch.object(feed.reader, 'get_entries', return_value=[entry]):
+        yield
+
+
+# ============================================================================
+# LIVENESS AND READINESS TESTS
+# ============================================================================
+
+class TestHealth:
+    """Test cases for /health, /health/live and /health/ready."""
+
+    def test_liveness_is_always_healthy(self, client):
+        """Test that liveness answers 200 even before any events are loaded."""
+        for url in ('/health', '/health/live'):
+            response = client.get(url)
+            assert response.status_code == 200
+            assert response.get_json()["status"] == "healthy"
+
+    def test_cold_worker_is_not_ready_and_warms_up(self, client, entries):
+        """Test that readiness is 503 until a snapshot exists, and starts building one."""
+        response = client.get('/health/ready')
+
+        assert response.status_code == 503
+        assert response.get_json()["status"] == "starting"
+        deadline = time.monotonic() + 5
+        while feed.current() is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert client.get('/health/ready').status_code == 200
+
+    def test_ready_reports_feed_state(self, client, entries):
+        """Test that readiness reports the snapshot and the last refresh."""
+        with patch.object(feed.reader, 'update_feeds_iter', return_value=[]):
+            events = feed.refresh()
+        data = client.get('/health/ready').get_json()
+
+        assert data["status"] == "ready"
+        assert data["entries"] == 1
+        assert data["generation"] == events.generation
+        assert data["last_refresh"] is not None and data["last_refresh_age_seconds"] < 60
+        assert data["refresh_failures"] == 0
+
+    def test_stale_feed_is_degraded_but_ready(self, client, entries):
+        """Test that a worker with an old snapshot and failing refreshes still serves, as degraded."""
+        feed.get_events()
+        feed.status.succeeded(0.5)
+        feed.status.last_success -= timedelta(hours=3)
+        with patch.object(feed.reader, 'update_feeds_iter', side_effect=OSError("feed unreachable")):
+            with pytest.raises(OSError):
+                feed.refresh()
+
+        with patch.object(app_module, 'STALE_AFTER', 1800):
+            response = client.get('/health/ready')
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["status"] == "degraded"
+        assert data["refresh_failures"] == 1
+        assert "feed unreachable" in data["last_error"]
+        assert client.get('/events').status_code == 200
+
+
+# ============================================================================
+# STALE-WHILE-REVALIDATE TESTS
+# ============================================================================
+
+class TestStaleWhileRevalidate:
+    """Test cases for serving the last snapshot while a background refresh runs."""
+
+    def test_stale_snapshot_is_served_while_refreshing(self, entries):
+        """Test that a stale request returns at once and starts exactly one background refresh."""
+        current = feed.get_events()
+        fetching = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow_update(**kwargs):
+            calls.append(1)
+            fetching.set()
+            release.wait(5)
+            return []
+
+        with patch.object(feed.reader, 'update_feeds_iter', side_effect=slow_update), \
+             patch.object(feed, 'STALE_AFTER', 60), patch.object(feed, '_fresh_until', time.monotonic() - 1):
+            assert feed.get_events() is current
+            assert fetching.wait(5)
+            assert feed.get_events() is current # A second stale request does not start another refresh
+            release.set()
+            deadline = time.monotonic() + 5
+            while feed._refreshing.locked() and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            assert calls == [1]
+            assert feed._fresh_until > time.monotonic() + 30 # Fresh again for STALE_AFTER
+
+    def test_failed_revalidation_keeps_snapshot(self, entries):
+        """Test that a failing background refresh keeps serving the last snapshot and backs off."""
+        current = feed.get_events()
+        with patch.object(feed.reader, 'update_feeds_iter', side_effect=OSError("feed unreachable")), \
+             patch.object(feed, 'STALE_AFTER', 60), patch.object(feed, '_fresh_until', time.monotonic() - 1):
+            assert feed.revalidate()
+            deadline = time.monotonic() + 5
+            while feed.status.failures == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            assert feed.get_events() is current
+            assert feed._fresh_until > time.monotonic() # Waits REVALIDATE_RETRY before trying again
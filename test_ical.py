@@ -0,0 +1,122 @@
+import pytest
+from datetime import date, datetime, timezone
+from event_entry import EventEntry
+from ical import CalendarFeed, escape_text, fold, format_event
+
+STAMP = "20251101T120000Z"
+
+
+def make_event(event_id, day, time, location, text="Description"):
+    """Create an EventEntry from a summary shaped like the Mac RSS feed."""
+    header = f"{day} | {time} | {location}" if time else f"{day} | {location}"
+    return EventEntry(event_id, f"Event {event_id}", f"https://example.com/{event_id}",
+                      f"<strong>{header}</strong><p>{text}</p>")
+
+
+def unfold(text):
+    return text.replace("\r\n ", "")
+
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+@pytest.fixture
+def events():
+    return [
+        make_event("c", "November 16, 2025", "2:00 PM - 3:00 PM", "Library"),
+        make_event("a", "November 15, 2025", "7:00 PM - 9:00 PM", "Carnegie Hall"),
+        make_event("b", "November 15, 2025", "9:00 AM - 10:00 AM", "Library"),
+        make_event("d", "November 20, 2025", None, "Minneapolis"),
+        make_event("e", "Sometime soon", "1:00 PM - 2:00 PM", "Library"),
+    ]
+
+@pytest.fixture
+def calendar(events):
+    return CalendarFeed(events, EventEntry.location_resolver, datetime(2025, 11, 1, 12, tzinfo=timezone.utc))
+
+
+def uids(payload):
+    return [line[4:] for line in payload.body.decode("utf-8").split("\r\n") if line.startswith("UID:")]
+
+
+# ============================================================================
+# FORMATTING TESTS
+# ============================================================================
+
+class TestFormatting:
+    """Test cases for iCalendar content lines."""
+
+    def test_escape_text(self):
+        """Test that TEXT values escape backslashes, separators and newlines."""
+        assert escape_text("a,b;c\\d\ne") == "a\\,b\\;c\\\\d\\ne"
+
+    def test_long_lines_fold_at_75_octets(self):
+        """Test that long lines are split into continuation lines without breaking characters."""
+        line = "DESCRIPTION:" + "é" * 100
+        folded = fold(line)
+
+        assert all(len(part.encode("utf-8")) <= 75 for part in folded.split("\r\n"))
+        assert unfold(folded) == line + "\r\n"
+
+    def test_timed_event(self, events):
+        """Test that a timed event gets local start and end times in the campus time zone."""
+        vevent = format_event(events[1], STAMP)
+
+        assert "DTSTART;TZID=America/Chicago:20251115T190000\r\n" in vevent
+        assert "DTEND;TZID=America/Chicago:20251115T210000\r\n" in vevent
+        assert "SUMMARY:Event a\r\n" in vevent
+        assert "LOCATION:Carnegie Hall\r\n" in vevent
+        assert "URL:https://example.com/a\r\n" in vevent
+
+    def test_untimed_event_is_all_day(self, events):
+        """Test that an event without a time spans its whole day."""
+        vevent = format_event(events[3], STAMP)
+
+        assert "DTSTART;VALUE=DATE:20251120\r\n" in vevent
+        assert "DTEND;VALUE=DATE:20251121\r\n" in vevent
+
+    def test_undated_event_is_left_out(self, events):
+        """Test that an event whose date cannot be parsed has no VEVENT."""
+        assert format_event(events[4], STAMP) is None
+
+    def test_event_ending_after_midnight(self):
+        """Test that an end time before the start time falls on the next day."""
+        event = make_event("x", "November 15, 2025", "10:00 PM - 1:00 AM", "Library")
+
+        assert "DTEND;TZID=America/Chicago:20251116T010000\r\n" in format_event(event, STAMP)
+
+
+# ============================================================================
+# CALENDAR FEED TESTS
+# ============================================================================
+
+class TestCalendarFeed:
+    """Test cases for the partitioned calendars."""
+
+    def test_full_calendar_is_chronological(self, calendar):
+        """Test that the calendar holds every dated event in order."""
+        body = calendar.payload().body.decode("utf-8")
+
+        assert body.startswith("BEGIN:VCALENDAR\r\n") and body.endswith("END:VCALENDAR\r\n")
+        assert uids(calendar.payload()) == ["b@macevents", "a@macevents", "c@macevents", "d@macevents"]
+
+    def test_partitions_by_building_and_day(self, calendar):
+        """Test that calendars can be narrowed to a building, a day, or both."""
+        assert uids(calendar.payload("Library")) == ["b@macevents", "c@macevents"]
+        assert uids(calendar.payload(day=date(2025, 11, 15))) == ["b@macevents", "a@macevents"]
+        assert uids(calendar.payload("Library", date(2025, 11, 16))) == ["c@macevents"]
+
+    def test_payloads_are_built_once(self, calendar):
+        """Test that each calendar is rendered once and keeps its ETag."""
+        first = calendar.payload("Library")
+
+        assert calendar.payload("Library") is first
+        assert calendar.payload().etag != first.etag
+
+    def test_empty_calendars_share_one_payload(self, calendar):
+        """Test that days without events do not each add a cached calendar."""
+        empty = calendar.payload(day=date(2030, 1, 1))
+
+        assert uids(empty) == []
+        assert calendar.payload(day=date(2030, 1, 2)) is empty
@@ -0,0 +1,75 @@
+import http.client
+import subprocess
+import sys
+import feedparser
+import pytest
+from event_entry import EventEntry
+from loadtest.feed_server import FeedServer, SyntheticFeed
+from loadtest.run import percentile
+
+
+@pytest.fixture
+def server():
+    server = FeedServer(SyntheticFeed(entries=20, update_interval=0)).start()
+    yield server
+    server.stop()
+
+
+def fetch(server, headers=None):
+    host, port = server._server.server_address[:2]
+    connection = http.client.HTTPConnection(host, port, timeout=5)
+    try:
+        connection.request("GET", server.url.split(str(port), 1)[1], headers=headers or {})
+        response = connection.getresponse()
+        return response.status, response.getheader("ETag"), response.read()
+    finally:
+        connection.close()
+
+
+class TestFeedServer:
+    """Test cases for the stand-in RSS feed used by the load test."""
+
+    def test_feed_parses_like_the_mac_feed(self, server):
+        """Test that the served RSS has every entry, with summaries EventEntry can read."""
+        status, _, body = fetch(server)
+        entries = feedparser.parse(body).entries
+
+        assert status == 200
+        assert len(entries) == 20
+        event = EventEntry(entries[0].id, entries[0].title, entries[0].link, entries[0].summary)
+        assert event.date != "Date unavailable" and event.location != "Location unavailable"
+
+    def test_unchanged_feed_gets_304(self, server):
+        """Test that a client sending the current ETag back gets 304 until the feed changes."""
+        _, etag, _ = fetch(server)
+
+        assert fetch(server, {"If-None-Match": etag})[0] == 304
+        server.feed.update()
+        assert fetch(server, {"If-None-Match": etag})[0] == 200
+
+    def test_updates_change_a_fraction_of_entries(self):
+        """Test that each update changes update_fraction of the summaries and keeps the ids."""
+        feed = SyntheticFeed(entries=100, update_interval=0, update_fraction=0.1)
+        before = {entry.id: entry.summary for entry in feedparser.parse(feed.current()[0]).entries}
+        feed.update()
+        after = {entry.id: entry.summary for entry in feedparser.parse(feed.current()[0]).entries}
+
+        assert before.keys() == after.keys()
+        assert sum(before[entry_id] != after[entry_id] for entry_id in before) == 10
+
+
+def test_percentile_is_nearest_rank():
+    """Test the percentiles reported for latencies."""
+    ordered = list(range(1, 101))
+
+    assert [percentile(ordered, fraction) for fraction in (0.5, 0.95, 0.99)] == [50, 95, 99]
+    assert percentile([7], 0.99) == 7
+    assert percentile([], 0.5) is None
+
+
+def test_runner_does_not_import_the_app():
+    """Test that the load test driver leaves the app, its feed refresher and snapshot lock to Gunicorn."""
+    imported = subprocess.run([sys.executable, "-c", "import sys, loadtest.run; print('app' in sys.modules)"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+
+    assert imported == "False"
@@ -0,0 +1,121 @@
+import pytest
+from benchmarks import legacy, synthetic
+from event_entry import EventEntry
+from locations import EventLocator, LocationResolver, distance_meters
+
+LIBRARY = [44.93855, -93.16822]
+OLD_MAIN = [44.93857, -93.16888]
+
+
+class Place:
+    """Minimal stand-in for an EventEntry with only a location."""
+
+    def __init__(self, id, location):
+        self.id = id
+        self.location = location
+
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+@pytest.fixture
+def resolver():
+    return LocationResolver(EventEntry.location_coords)
+
+@pytest.fixture
+def locator(resolver):
+    places = [
+        Place("library-1", "Library 2nd floor"),
+        Place("library-2", "DeWitt Wallace Library"),
+        Place("old-main", "Old Main 002"),
+        Place("stadium", "Macalester Stadium"),
+        Place("concert", "Janet Wallace Fine Arts Center, Mairs Concert Hall"),
+        Place("online", "Zoom"),
+    ]
+    return EventLocator(places, resolver)
+
+
+# ============================================================================
+# LOCATION RESOLVER TESTS
+# ============================================================================
+
+class TestLocationResolver:
+    """Test cases for resolving free-text locations to campus buildings."""
+
+    def test_matches_linear_scan(self, resolver):
+        """Test that the resolver returns the same coordinates as the original linear scan."""
+        locations = synthetic.LOCATIONS + ["", None, "library", "SHAW FIELD", "Leonard Center and Old Main",
+                                           "Great Lawn (rain: Kagin Commons)", "Weyerhaeuser Hall 2nd floor"]
+        for location in locations:
+            assert resolver.coords(location) is legacy.get_location_coords(EventEntry.location_coords, location)
+
+    def test_first_building_in_table_wins(self, resolver):
+        """Test that when several buildings are named, the one listed first in the table is used."""
+        assert resolver.resolve("Shaw Field, or Old Main if it rains").name == "Old Main"
+
+    def test_aliases_resolve_to_their_building(self, resolver):
+        """Test that every alias in a tuple key resolves to the same building."""
+        assert resolver.resolve("John B Davis Lecture Hall").name == "Ruth Stricker Dayton Campus Center"
+        assert resolver.resolve("Law Warschaw Gallery").name == "Music Building Mairs Concert Hall"
+
+    def test_overlapping_names_resolve_correctly(self, resolver):
+        """Test that names sharing a prefix are told apart."""
+        assert resolver.resolve("Weyerhaeuser Hall").name == "Weyerhaeuser Hall"
+        assert resolver.resolve("Weyerhaeuser Memorial Chapel").name == "Weyerhaeuser Memorial Chapel"
+
+    def test_unknown_location(self, resolver):
+        """Test that off-campus locations resolve to nothing."""
+        assert resolver.resolve("Minneapolis Institute of Art") is None
+        assert resolver.coords("") is None
+
+    def test_building_lookup_by_name_or_alias(self, resolver):
+        """Test that buildings can be looked up by canonical name or alias, ignoring case."""
+        assert resolver.building("shaw field").name == "Leonard Center"
+        assert resolver.building("Library").coord == LIBRARY
+        assert resolver.building("Nowhere Hall") is None
+
+    def test_event_entry_uses_resolver(self):
+        """Test that EventEntry.get_location_coords goes through the resolver."""
+        event = EventEntry("id", "Title", "link", "<strong>May 1, 2026 | Carnegie Hall 06B</strong><p>x</p>")
+
+        assert event.coord == [44.93874, -93.16914]
+
+
+# ============================================================================
+# EVENT LOCATOR TESTS
+# ============================================================================
+
+class TestEventLocator:
+    """Test cases for building and radius queries over events."""
+
+    def test_in_building(self, locator):
+        """Test that events are grouped by the building their location names."""
+        assert [place.id for place in locator.in_building("Library")] == ["library-1", "library-2"]
+        assert [place.id for place in locator.in_building("Law Warschaw Gallery")] == ["concert"]
+
+    def test_in_unknown_building(self, locator):
+        """Test that an unknown building has no events."""
+        assert locator.in_building("Nowhere Hall") == []
+
+    def test_nearby_orders_by_distance(self, locator):
+        """Test that events within the radius are returned closest first."""
+        found = locator.nearby(LIBRARY, 100)
+
+        assert [place.id for _, place in found] == ["library-1", "library-2", "old-main"]
+        assert found[0][0] == 0
+        assert found[-1][0] == pytest.approx(distance_meters(LIBRARY, OLD_MAIN))
+
+    def test_nearby_excludes_events_outside_radius(self, locator):
+        """Test that a small radius only reaches the closest building."""
+        assert [place.id for _, place in locator.nearby(OLD_MAIN, 10)] == ["old-main"]
+
+    def test_nearby_large_radius_scans_all_buildings(self, locator):
+        """Test that a radius wider than the grid still finds every located event."""
+        found = locator.nearby(LIBRARY, 20000000)
+
+        assert sorted(place.id for _, place in found) == ["concert", "library-1", "library-2", "old-main", "stadium"]
+
+    def test_distance_meters(self):
+        """Test the great-circle distance between two campus buildings."""
+        assert distance_meters(LIBRARY, OLD_MAIN) == pytest.approx(52, abs=1)
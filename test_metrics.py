@@ -0,0 +1,154 @@
+import pytest
+from unittest.mock import patch
+import events_feed as feed
+import metrics
+from app import app
+from metrics import Counter, Histogram
+
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    metrics.reset()
+    feed.clear_cache()
+    yield
+    metrics.reset()
+    feed.clear_cache()
+
+
+class MockRSSEntry:
+    """Simple mock class to represent an RSS entry with required attributes."""
+
+    def __init__(self, id, title, link, summary):
+        self.id = id
+        self.title = title
+        self.link = link
+        self.summary = summary
+
+
+@pytest.fixture
+def mock_rss_entries():
+    return [MockRSSEntry(f"rss-id-{number}", f"Event {number}", f"https://webapps.macalester.edu/event/{number}",
+                         f"<strong>November {number}, 2025 | 2:00 PM - 4:00 PM | Library</strong><p>Event</p>")
+            for number in range(1, 4)]
+
+
+# ============================================================================
+# METRIC TESTS
+# ============================================================================
+
+class TestMetricTypes:
+    """Test cases for counters, histograms and their text format."""
+
+    def test_counter_renders_labels(self):
+        """Test that a labelled counter renders one escaped sample per label value."""
+        counter = Counter("test_total", "A test counter.", ["result"])
+        counter.inc("hit")
+        counter.inc("hit", amount=2)
+        counter.inc('mi"ss')
+
+        assert counter.samples() == [("test_total", '{result="hit"}', 3), ("test_total", '{result="mi\\"ss"}', 1)]
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test that observations fill cumulative buckets with a sum and count."""
+        histogram = Histogram("test_seconds", "A test histogram.", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 5):
+            histogram.observe(value)
+
+        assert histogram.samples() == [
+            ("test_seconds_bucket", '{le="0.1"}', 1),
+            ("test_seconds_bucket", '{le="1.0"}', 3),
+            ("test_seconds_bucket", '{le="+Inf"}', 4),
+            ("test_seconds_sum", "", 6.25),
+            ("test_seconds_count", "", 4),
+        ]
+
+    def test_timer_observes_elapsed_time(self):
+        """Test that time() records one observation per block."""
+        histogram = Histogram("test_seconds", "A test histogram.", ["stage"])
+        with histogram.time("parse"):
+            pass
+
+        assert histogram.count("parse") == 1
+
+    def test_disabled_metrics_record_nothing(self):
+        """Test that with metrics off, counters and timers are no-ops."""
+        counter = Counter("test_total", "A test counter.")
+        histogram = Histogram("test_seconds", "A test histogram.")
+        with patch.object(metrics, 'ENABLED', False):
+            counter.inc()
+            with histogram.time():
+                pass
+
+        assert counter.samples() == [] and histogram.samples() == []
+
+
+# ============================================================================
+# INSTRUMENTATION TESTS
+# ============================================================================
+
+class TestInstrumentation:
+    """Test cases for the stage timings and the /metrics endpoint."""
+
+    @patch('events_feed.reader.get_entries')
+    def test_snapshot_build_times_each_stage(self, mock_get_entries, mock_rss_entries):
+        """Test that building a snapshot times reading, matching, parsing and ordering."""
+        mock_get_entries.return_value = mock_rss_entries
+        feed.get_events()
+
+        for stage in ("read", "match", "parse", "order"):
+            assert metrics.STAGE_SECONDS.count(stage) == 1, stage
+
+    @patch('events_feed.reader.get_entries')
+    def test_events_route_times_dicts_and_serialization(self, mock_get_entries, client, mock_rss_entries):
+        """Test that /events records dict building, serialization, cache lookups and the request."""
+        mock_get_entries.return_value = mock_rss_entries
+        client.get('/events')
+        client.get('/events')
+
+        assert metrics.STAGE_SECONDS.count("dicts") == 1
+        assert metrics.STAGE_SECONDS.count("serialize") == 1
+        assert metrics.DERIVED.value("hit") >= 1
+        assert metrics.REQUEST_SECONDS.count("events") == 2
+
+    @patch('events_feed.reader.get_entries')
+    def test_metrics_endpoint_is_prometheus_text(self, mock_get_entries, client, mock_rss_entries):
+        """Test that /metrics serves every metric in the Prometheus text format."""
+        mock_get_entries.return_value = mock_rss_entries
+        client.get('/events')
+        response = client.get('/metrics')
+        text = response.get_data(as_text=True)
+
+        assert response.mimetype == 'text/plain'
+        assert '# TYPE macevents_stage_seconds histogram' in text
+        assert 'macevents_stage_seconds_count{stage="parse"} 1' in text
+        assert 'macevents_parse_cache_total{result="miss"} 3' in text
+        assert 'macevents_snapshot_events 3' in text
+
+    def test_metrics_endpoint_can_be_turned_off(self, client):
+        """Test that /metrics is not found when metrics are disabled."""
+        with patch.object(metrics, 'ENABLED', False):
+            assert client.get('/metrics').status_code == 404
+
+    def test_refresh_outcomes_are_counted(self):
+        """Test that refreshes are timed and counted by outcome."""
+        with patch.object(feed.reader, 'update_feeds_iter', return_value=[]), \
+             patch.object(feed.reader, 'get_entries', return_value=[]):
+            feed.refresh()
+        with patch.object(feed.reader, 'update_feeds_iter', side_effect=OSError("feed unreachable")):
+            with pytest.raises(OSError):
+                feed.refresh()
+
+        assert metrics.REFRESHES.value("success") == 1
+        assert metrics.REFRESHES.value("failure") == 1
+        assert metrics.REFRESH_SECONDS.count() == 2
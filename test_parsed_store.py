@@ -0,0 +1,146 @@
+import pytest
+import sqlite3
+from unittest.mock import patch
+import events_feed as feed
+import event_entry
+import parsed_store
+from event_entry import EventEntry
+from parsed_store import PARSED_FIELDS, ParsedEventStore
+
+
+class MockRSSEntry:
+    """Simple mock class to represent an RSS entry with required attributes."""
+
+    def __init__(self, id, title, link, summary):
+        self.id = id
+        self.title = title
+        self.link = link
+        self.summary = summary
+
+
+def rss_entry(number, location="Library"):
+    return MockRSSEntry(f"rss-id-{number}", f"Event {number} amp; more", f"https://webapps.macalester.edu/event/{number}",
+                        f"<strong>November {number}, 2025 | 2:00 PM - 4:00 PM | {location}</strong><p>Event {number}</p>")
+
+
+def parse(entry):
+    return EventEntry(entry.id, entry.title, entry.link, entry.summary)
+
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+@pytest.fixture
+def store(tmp_path):
+    store = ParsedEventStore(str(tmp_path / "parsed.sqlite"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def feed_store(store):
+    """Make events_feed persist parsed events to a temporary store for the test."""
+    feed.use_store(store)
+    yield store
+    feed.use_store(None)
+
+
+# ============================================================================
+# STORE TESTS
+# ============================================================================
+
+class TestParsedEventStore:
+    """Test cases for the sidecar table of parsed events."""
+
+    def test_round_trip_keeps_parsed_fields(self, store):
+        """Test that a loaded entry has the same fields as parsing the summary again."""
+        entries = [rss_entry(3), rss_entry(4, "Kagin Commons amp; Great Lawn"), rss_entry(5, "Off campus")]
+        store.sync([(entry.id, "fp", parse(entry)) for entry in entries], {entry.id for entry in entries})
+
+        loaded = store.load()
+
+        assert [(entry_id, fingerprint) for entry_id, fingerprint, _ in loaded] == [(entry.id, "fp") for entry in entries]
+        for entry, (_, _, event) in zip(entries, loaded):
+            expected = parse(entry)
+            assert event.id == expected.id
+            for field in PARSED_FIELDS:
+                assert getattr(event, field) == getattr(expected, field), field
+            assert event.start_key == expected.start_key
+
+    def test_saving_and_loading_leave_lazy_fields_lazy(self, store):
+        """Test that writing a row does not build the description, and a loaded entry builds it on first read."""
+        built, pending = parse(rss_entry(3)), parse(rss_entry(4))
+        built.desc, built.coord # Read before saving, so kept as computed
+        with patch('event_entry.clean_description', wraps=event_entry.clean_description) as mock_clean:
+            store.sync([(event.id, "fp", event) for event in (built, pending)], {built.id, pending.id})
+            loaded = {event.id: event for _, _, event in store.load()}
+            mock_clean.assert_not_called()
+
+            assert not loaded[pending.id].computed("desc") and loaded[built.id].computed("desc")
+            assert loaded[pending.id].desc == parse(rss_entry(4)).desc
+        assert mock_clean.call_count == 2 # Once for the loaded entry, once for the freshly parsed one
+        assert loaded[built.id].coord == built.coord
+
+    def test_rows_from_another_parser_version_are_skipped(self, store):
+        """Test that rows written by a different parser version are not loaded."""
+        store.sync([("rss-id-3", "fp", parse(rss_entry(3)))], {"rss-id-3"})
+
+        with patch.object(parsed_store, "PARSER_VERSION", parsed_store.PARSER_VERSION + 1):
+            assert store.load() == []
+
+    def test_tables_without_summaries_are_replaced(self, tmp_path):
+        """Test that a table written before summaries were kept is dropped, so its entries are parsed again."""
+        path = str(tmp_path / "old.sqlite")
+        connection = sqlite3.connect(path)
+        connection.execute("CREATE TABLE parsed_events (id TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, "
+                           "parser_version INTEGER NOT NULL, " + ", ".join(f"{field} TEXT" for field in PARSED_FIELDS) + ")")
+        connection.execute("INSERT INTO parsed_events (id, fingerprint, parser_version) VALUES ('old', 'fp', 1)")
+        connection.commit()
+        connection.close()
+
+        store = ParsedEventStore(path)
+        assert store.load() == []
+        store.sync([("rss-id-3", "fp", parse(rss_entry(3)))], {"rss-id-3"})
+        assert [entry_id for entry_id, _, _ in store.load()] == ["rss-id-3"]
+        store.close()
+
+    def test_sync_deletes_entries_that_left_the_feed(self, store):
+        """Test that rows for ids no longer in the feed are deleted."""
+        store.sync([(entry.id, "fp", parse(entry)) for entry in (rss_entry(3), rss_entry(4))], {"rss-id-3", "rss-id-4"})
+        store.sync([], {"rss-id-4"})
+
+        assert [entry_id for entry_id, _, _ in store.load()] == ["rss-id-4"]
+
+
+# ============================================================================
+# WARM START TESTS
+# ============================================================================
+
+class TestWarmStart:
+    """Test cases for events_feed loading persisted parsed events after a restart."""
+
+    @patch('events_feed.reader.get_entries')
+    def test_restart_parses_only_changed_entries(self, mock_get_entries, feed_store):
+        """Test that after a restart only new or changed entries go through EventEntry."""
+        entries = [rss_entry(number) for number in range(1, 6)]
+        mock_get_entries.return_value = entries
+        before = [event.desc for event in feed.get_events()]
+
+        feed.clear_cache() # As if the worker restarted
+        changed = rss_entry(3, "Carnegie Hall")
+        mock_get_entries.return_value = entries[:2] + [changed] + entries[3:]
+        with patch('events_feed.EventEntry', wraps=EventEntry) as mock_event_entry:
+            events = feed.get_events()
+
+        mock_event_entry.assert_called_once_with(changed.id, changed.title, changed.link, changed.summary)
+        assert [event.desc for event in events] == before
+        assert events[2].location == "Carnegie Hall"
+
+    @patch('events_feed.reader.get_entries')
+    def test_unreadable_store_falls_back_to_parsing(self, mock_get_entries, feed_store):
+        """Test that a store that cannot be read is logged and the feed is parsed as usual."""
+        mock_get_entries.return_value = [rss_entry(1)]
+        feed_store.close()
+
+        assert [event.id for event in feed.get_events()] == ["rss-id-1"]
@@ -0,0 +1,159 @@
+import os
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from reader import make_reader
+import events_feed as feed
+from refresher import FeedRefresher
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+@pytest.fixture
+def local_feed(tmp_path):
+    """Point events_feed at a scratch reader database and the stand-in feed in fixtures/."""
+    local_reader = make_reader(str(tmp_path / "db.sqlite"), feed_root=FIXTURES)
+    feed.clear_cache()
+    with patch.object(feed, 'reader', local_reader), patch.object(feed, 'feed_url', "events_rss.xml"):
+        yield local_reader
+    feed.clear_cache()
+    local_reader.close()
+
+
+# ============================================================================
+# FEED REFRESH TESTS
+# ============================================================================
+
+class TestRefresh:
+    """Test cases for refreshing the feed outside of the request path."""
+
+    def test_add_feed_does_not_fetch(self, local_feed):
+        """Test that registering the feed serves what is stored without a network fetch."""
+        feed.add_feed()
+
+        assert feed.get_events() == []
+
+    def test_refresh_swaps_in_parsed_snapshot(self, local_feed):
+        """Test that refresh fetches the feed and makes its entries current."""
+        feed.add_feed()
+        before = feed.get_events()
+
+        after = feed.refresh()
+
+        assert feed.get_events() is after
+        assert after.generation == before.generation + 1
+        assert sorted(event.title for event in after) == ["Career Fair", "Fall Concert", "Library hours: 8am-10pm"]
+
+    def test_refresh_without_changes_keeps_snapshot(self, local_feed):
+        """Test that refreshing an unchanged feed keeps the same generation."""
+        feed.add_feed()
+        first = feed.refresh()
+
+        assert feed.refresh() is first
+
+    def test_requests_are_not_blocked_by_refresh(self, local_feed):
+        """Test that get_events keeps serving the last snapshot while a refresh is running."""
+        feed.add_feed()
+        current = feed.refresh()
+        fetching = threading.Event()
+        release = threading.Event()
+
+        def slow_update(**kwargs):
+            fetching.set()
+            release.wait(5)
+            return []
+
+        with patch.object(local_feed, 'update_feeds_iter', side_effect=slow_update):
+            worker = threading.Thread(target=feed.refresh)
+            worker.start()
+            fetching.wait(5)
+            assert feed.get_events() is current
+            release.set()
+            worker.join(5)
+
+    def test_failed_refresh_keeps_snapshot(self, local_feed):
+        """Test that a failing fetch leaves the current snapshot in place."""
+        feed.add_feed()
+        current = feed.refresh()
+
+        with patch.object(local_feed, 'update_feeds_iter', side_effect=OSError("feed unreachable")):
+            with pytest.raises(OSError):
+                feed.refresh()
+
+        assert feed.get_events() is current
+
+
+# ============================================================================
+# REFRESHER SCHEDULING TESTS
+# ============================================================================
+
+class TestFeedRefresher:
+    """Test cases for the FeedRefresher schedule."""
+
+    def test_delay_is_interval_with_jitter(self):
+        """Test that successful refreshes are spaced by the interval, spread by the jitter."""
+        refresher = FeedRefresher(lambda: None, interval=100, jitter=0.1)
+
+        delays = [refresher.next_delay() for _ in range(50)]
+
+        assert all(90 <= delay <= 110 for delay in delays)
+
+    def test_backoff_doubles_until_capped(self):
+        """Test that consecutive failures back off exponentially up to max_backoff."""
+        def failing_refresh():
+            raise OSError("feed unreachable")
+
+        refresher = FeedRefresher(failing_refresh, interval=900, jitter=0, retry_delay=30, max_backoff=100)
+
+        delays = []
+        for _ in range(4):
+            assert refresher.run_once() is False
+            delays.append(refresher.next_delay())
+
+        assert delays == [30, 60, 100, 100]
+
+    def test_success_resets_backoff(self):
+        """Test that a successful refresh returns to the normal interval."""
+        outcomes = iter([OSError("feed unreachable"), None])
+
+        def flaky_refresh():
+            outcome = next(outcomes)
+            if outcome:
+                raise outcome
+
+        refresher = FeedRefresher(flaky_refresh, interval=900, jitter=0)
+        refresher.run_once()
+        assert refresher.run_once() is True
+
+        assert refresher.failures == 0
+        assert refresher.next_delay() == 900
+
+    def test_background_thread_refreshes_until_stopped(self):
+        """Test that the background thread keeps refreshing and stops cleanly."""
+        calls = threading.Semaphore(0)
+        refresher = FeedRefresher(calls.release, interval=0.01, jitter=0)
+
+        refresher.start()
+        assert calls.acquire(timeout=5)
+        assert calls.acquire(timeout=5)
+        refresher.stop(timeout=5)
+
+        assert not refresher.is_running()
+
+    def test_background_thread_refreshes_local_feed(self, local_feed):
+        """Test that a started refresher loads the stand-in feed without a request waiting on it."""
+        feed.add_feed()
+        refresher = FeedRefresher(feed.refresh, interval=60)
+
+        refresher.start()
+        deadline = time.monotonic() + 5
+        while len(feed.get_events()) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        refresher.stop(timeout=5)
+
+        assert len(feed.get_events()) == 3
@@ -0,0 +1,96 @@
+import pytest
+from event_entry import EventEntry
+from unittest.mock import patch
+from search import SearchIndex, tokens
+
+
+def make_event(event_id, title, location, text):
+    """Create an EventEntry from a summary shaped like the Mac RSS feed."""
+    return EventEntry(event_id, title, f"https://example.com/{event_id}",
+                      f"<strong>November 15, 2025 | 7:00 PM - 9:00 PM | {location}</strong><p>{text}</p>")
+
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+@pytest.fixture
+def events():
+    return [
+        make_event("a", "Jazz Concert", "Weyerhaeuser Memorial Chapel", "An evening of jazz standards."),
+        make_event("b", "Chemistry Seminar", "Olin-Rice Science Center", "Guest lecture followed by a jazz reception."),
+        make_event("c", "Book Club", "Library", "This month: a novel about concert pianists."),
+        make_event("d", "Chess Night", "Library", "Bring a board."),
+    ]
+
+@pytest.fixture
+def index(events):
+    return SearchIndex(events)
+
+
+def ids(found):
+    return [event.id for _, event in found]
+
+
+# ============================================================================
+# SEARCH TESTS
+# ============================================================================
+
+class TestSearchIndex:
+    """Test cases for the full-text event index."""
+
+    def test_tokens(self):
+        """Test that text splits into lowercase words."""
+        assert tokens("Jazz Concert: Olin-Rice, 7PM") == ["jazz", "concert", "olin", "rice", "7pm"]
+        assert tokens(None) == []
+
+    def test_title_matches_rank_above_description_matches(self, index):
+        """Test that a word in the title outranks the same word in the description."""
+        assert ids(index.search("jazz")) == ["a", "b"]
+
+    def test_every_term_must_match(self, index):
+        """Test that only events containing all the query words are returned."""
+        assert ids(index.search("jazz reception")) == ["b"]
+        assert index.search("jazz chess") == []
+
+    def test_location_is_searched(self, index):
+        """Test that events are found by their location."""
+        assert sorted(ids(index.search("library"))) == ["c", "d"]
+
+    def test_last_term_matches_as_prefix(self, index):
+        """Test that the last word also matches the words it starts, below exact matches."""
+        assert ids(index.search("conc")) == ["a", "c"]
+        assert ids(index.search("ch")) == ["b", "d", "a"] # Chemistry, Chess, Chapel
+        assert index.search("conc", prefix=False) == []
+
+    def test_exact_match_outranks_prefix_match(self):
+        """Test that a word equal to the query term beats a longer word it starts."""
+        index = SearchIndex([make_event("a", "Chessboard Sale", "Library", ""), make_event("b", "Chess", "Library", "")])
+
+        assert ids(index.search("chess")) == ["b", "a"]
+
+    def test_limit(self, index):
+        """Test that at most limit results are returned."""
+        assert len(index.search("library", limit=1)) == 1
+        assert index.search("   ") == []
+
+    def test_scoring_every_match_ranks_the_same(self, index):
+        """Test that queries giving up on the best combinations early return the same results."""
+        queries = ["jazz", "jazz reception", "ch", "library c", "jazz chess", "a of the jazz"]
+        expected = [[(round(score, 9), event.id) for score, event in index.search(query, limit=None)] for query in queries]
+
+        with patch("search.MAX_READS", 0):
+            found = [[(round(score, 9), event.id) for score, event in index.search(query, limit=None)] for query in queries]
+            best = index.search("library c", limit=1)
+        assert [round(score, 9) for score, _ in best] == [expected[3][0][0]]
+        assert found == expected
+
+    def test_update_reindexes_only_given_events(self, index, events):
+        """Test that removed events stop matching and added events start matching."""
+        replacement = make_event("a", "Jazz Brunch", "Kagin Commons", "Waffles.")
+        index.update(removed=[events[0]], added=[replacement])
+
+        assert ids(index.search("concert")) == ["c"]
+        assert ids(index.search("waffles")) == ["a"]
+        assert index.search("weyerhaeuser") == []
+        assert len(index) == 4
@@ -0,0 +1,201 @@
+import gzip
+import pytest
+from unittest.mock import patch
+import events_feed as feed
+import payloads
+import shared_snapshot
+from event_entry import EventEntry
+from app import app
+from shared_snapshot import SharedSnapshot
+
+
+def make_event(number, location="Library"):
+    return EventEntry(f"id-{number}", f"Event {number}", f"https://example.com/{number}",
+                      f"<strong>November {number}, 2025 | 2:00 PM - 4:00 PM | {location}</strong><p>Event {number}</p>")
+
+def make_snapshot(events, generation, fingerprints=None):
+    keys = [(event.id, (fingerprints or {}).get(event.id, "fp")) for event in events]
+    return feed.EventSnapshot(events, generation, keys)
+
+def events_body(events):
+    return payloads.json_payload([{"id": event.id, "description": event.desc * 50} for event in events],
+                                 events.updated_at)
+
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "events.snapshot")
+
+@pytest.fixture
+def leader(path):
+    shared = SharedSnapshot(path, {"events.json": events_body})
+    assert shared.lead()
+    return shared
+
+@pytest.fixture
+def follower(path, leader):
+    return SharedSnapshot(path, check_interval=0)
+
+@pytest.fixture
+def following(follower):
+    """Make events_feed a worker that follows the snapshots published by leader."""
+    feed.clear_cache()
+    feed.use_shared(follower)
+    yield follower
+    feed.use_shared(None)
+    feed.clear_cache()
+
+
+# ============================================================================
+# SNAPSHOT FILE TESTS
+# ============================================================================
+
+class TestSharedSnapshot:
+    """Test cases for writing, mapping and leading with the snapshot file."""
+
+    def test_one_process_leads(self, leader, follower):
+        """Test that the lock next to the file lets only one SharedSnapshot lead."""
+        assert leader.leader
+        assert not follower.lead()
+
+    @pytest.mark.skipif(shared_snapshot.fcntl is None, reason="needs fcntl")
+    def test_follower_takes_over_when_the_lock_is_free(self, path):
+        """Test that on_lead runs once the previous leader let go of the lock."""
+        started = []
+        first = SharedSnapshot(path)
+        assert first.lead()
+        first._lock_file.close() # As when the leading process exits
+        second = SharedSnapshot(path, on_lead=lambda: started.append(True))
+
+        assert second.lead()
+        assert started == [True]
+
+    def test_published_events_and_payloads_are_read_back(self, leader, follower):
+        """Test that a follower gets the parsed rows and the payload bytes, validators and variants."""
+        events = make_snapshot([make_event(1), make_event(2, "Humanities")], generation=3)
+        assert leader.publish(events, "epoch")
+
+        image = follower.read()
+        assert (image.generation, image.epoch, image.keys) == (3, "epoch", [("id-1", "fp"), ("id-2", "fp")])
+        rows = [EventEntry.from_parsed(*row) for row in image.rows()]
+        assert [(row.id, row.location, row.coord, row.start_time, row.desc) for row in rows] == \
+            [(event.id, event.location, event.coord, event.start_time, event.desc) for event in events]
+
+        payload, built = image.payload("events.json"), events_body(events)
+        assert bytes(payload.body) == built.body
+        assert payload.etag == built.etag
+        assert payload.last_modified == events.updated_at
+        assert bytes(payload.encoded("gzip")[0]) == built.encoded("gzip")[0]
+
+    def test_unchanged_file_is_not_read_again(self, leader, follower):
+        """Test that read() returns None until a new file replaces the one already read."""
+        leader.publish(make_snapshot([make_event(1)], generation=1), "epoch")
+
+        assert follower.read() is not None
+        assert follower.read() is None
+        leader.publish(make_snapshot([make_event(1)], generation=2), "epoch")
+        assert follower.read().generation == 2
+
+    def test_only_new_generations_are_published(self, leader, follower):
+        """Test that followers never write, and a generation is written once."""
+        events = make_snapshot([make_event(1)], generation=1)
+
+        assert not follower.publish(events, "epoch")
+        assert leader.publish(events, "epoch")
+        assert not leader.publish(events, "epoch")
+
+    def test_foreign_files_are_ignored(self, path, follower):
+        """Test that a file that is not a snapshot of this format is skipped."""
+        with open(path, "wb") as file:
+            file.write(b"not a snapshot file at all")
+
+        assert follower.read() is None
+
+    def test_other_parser_versions_are_ignored(self, leader, follower):
+        """Test that a snapshot parsed by another EventEntry version is not loaded."""
+        with patch("shared_snapshot.PARSER_VERSION", 999):
+            leader.publish(make_snapshot([make_event(1)], generation=1), "epoch")
+
+        assert follower.read() is None
+
+
+# ============================================================================
+# FOLLOWING WORKER TESTS
+# ============================================================================
+
+class TestFollowingWorker:
+    """Test cases for events_feed serving the snapshots another process published."""
+
+    @patch('events_feed.reader.get_entries')
+    def test_events_are_loaded_without_parsing(self, mock_get_entries, leader, following):
+        """Test that a follower serves the leader's generation and payloads without reading the feed."""
+        events = make_snapshot([make_event(1), make_event(2)], generation=4)
+        leader.publish(events, "epoch")
+
+        with patch('event_entry.EventEntry.parse_summary') as mock_parse:
+            loaded = feed.get_events()
+
+        mock_get_entries.assert_not_called()
+        mock_parse.assert_not_called()
+        assert [event.id for event in loaded] == ["id-1", "id-2"]
+        assert loaded.generation == 4
+        assert isinstance(loaded.derived["events.json"].body, memoryview)
+        assert feed.change_token(loaded) == "epoch-4"
+
+    @patch('events_feed.reader.get_entries')
+    def test_new_generations_reuse_unchanged_entries(self, mock_get_entries, leader, following):
+        """Test that a newer file is picked up, keeping the entries whose content did not change."""
+        first, second = make_event(1), make_event(2)
+        leader.publish(make_snapshot([first, second], generation=1), "epoch")
+        loaded = feed.get_events()
+        leader.publish(make_snapshot([first, second, make_event(3)], generation=2, fingerprints={"id-2": "new"}),
+                       "epoch")
+
+        reloaded = feed.get_events()
+
+        assert reloaded.generation == 2
+        assert reloaded[0] is loaded[0]
+        assert reloaded[1] is not loaded[1]
+        assert feed.changes_since(reloaded, feed.change_token(loaded)) == (1, {"id-2": "updated", "id-3": "added"})
+
+    @patch('events_feed.reader.get_entries')
+    def test_follower_builds_before_anything_was_published(self, mock_get_entries, following):
+        """Test that a follower still answers from the stored entries while no file exists yet."""
+        mock_get_entries.return_value = []
+
+        assert feed.get_events() == []
+        mock_get_entries.assert_called_once()
+
+
+class TestMappedPayloads:
+    """Test cases for serving payloads straight from the mapped file."""
+
+    @pytest.fixture
+    def client(self):
+        app.config['TESTING'] = True
+        with app.test_client() as client:
+            yield client
+
+    @pytest.fixture
+    def loaded(self, leader, follower):
+        events = make_snapshot([make_event(number) for number in range(1, 30)], generation=1)
+        leader.publish(events, "epoch")
+        events.derived["events.json"] = follower.read().payload("events.json")
+        return events
+
+    @patch('app.feed.get_events')
+    def test_body_and_variants_are_sent(self, mock_get_events, client, loaded):
+        """Test that mapped bodies go out whole, compressed as accepted, and revalidate."""
+        mock_get_events.return_value = loaded
+        plain = client.get('/events')
+        compressed = client.get('/events', headers={'Accept-Encoding': 'gzip'})
+
+        assert plain.data == bytes(loaded.derived["events.json"].body)
+        assert all(type(chunk) is bytes for chunk in plain.response) # WSGI servers such as Gunicorn only write bytes
+        assert plain.content_length == len(plain.data)
+        assert gzip.decompress(compressed.data) == plain.data
+        assert client.get('/events', headers={'If-None-Match': plain.headers['ETag']}).status_code == 304